@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地 API 服务器
+在静态文件服务的基础上提供按需查询的 JSON 接口，前端和脚本无需下载完整数据文件再自行筛选
+
+接口：
+    GET /api/draws?from=26001&to=26021&limit=30   开奖数据（期号降序，参数均可选）
+    GET /api/draws/{period}                       单期开奖数据
+    GET /api/predictions                          当期 AI 预测（data/ai_predictions.json）
+    GET /api/predictions/{period}                 指定期号的预测（已归档的含开奖结果和命中结果）
+    GET /api/history?offset=0&limit=20            分页的历史预测对比（期号降序）
+    GET /api/leaderboard                          各模型历史成绩排行
+    其他路径                                       按原样提供项目目录下的静态文件
+
+实现：
+- 数据文件只在启动时和文件变化后加载一次，构建期号索引和排行榜后整体替换为新快照，
+  请求线程只读取快照，不会读到加载一半的数据
+- 每次请求最多每秒检查一次文件的修改时间和大小，变化后自动重新加载
+- 响应体按 (数据版本, 路径, 查询参数) 缓存，ETag 为响应体哈希；If-None-Match 命中时返回 304
+- 客户端支持时对超过 1KB 的响应使用 gzip 压缩
+
+使用方法：
+    python3 api_server.py
+    python3 api_server.py --port 8080 --host 127.0.0.1
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+import prize_engine
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+LOTTERY_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "lottery_history.json")
+AI_PREDICTIONS_FILE = os.path.join(SCRIPT_DIR, "data", "ai_predictions.json")
+PREDICTIONS_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "predictions_history.json")
+
+RELOAD_CHECK_INTERVAL = 1.0
+GZIP_MIN_SIZE = 1024
+RESPONSE_CACHE_SIZE = 256
+HISTORY_PAGE_SIZE = 20
+
+
+class ApiError(Exception):
+    """返回给客户端的错误（状态码 + 说明）"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _load_json(path: str, default: Dict[str, Any]) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_leaderboard(history_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """按模型汇总历史成绩：平均每期最佳命中、每注平均命中、奖级分布与奖金"""
+    prizes = prize_engine.score_history(history_data)
+    stats: Dict[str, Dict[str, Any]] = {}
+    for record in history_data.get("predictions_history", []):
+        for model in record.get("models", []):
+            entry = stats.setdefault(model.get("model_name"), {
+                "model_name": model.get("model_name"),
+                "model_id": model.get("model_id"),
+                "periods": 0, "best_hits_total": 0, "best_hit_count": 0, "hits_total": 0
+            })
+            entry["periods"] += 1
+            entry["best_hits_total"] += model.get("best_hit_count", 0)
+            entry["best_hit_count"] = max(entry["best_hit_count"], model.get("best_hit_count", 0))
+            entry["hits_total"] += sum(p.get("hit_result", {}).get("total_hits", 0) for p in model.get("predictions", []))
+
+    rows = []
+    for name, entry in stats.items():
+        prize = prizes.get(name, {"tickets": 0, "tier_counts": [0] * 7, "winnings": 0, "cost": 0})
+        rows.append({
+            "model_name": name,
+            "model_id": entry["model_id"],
+            "periods": entry["periods"],
+            "tickets": prize["tickets"],
+            "avg_best_hits": round(entry["best_hits_total"] / entry["periods"], 3),
+            "avg_hits_per_ticket": round(entry["hits_total"] / prize["tickets"], 3) if prize["tickets"] else 0.0,
+            "best_hit_count": entry["best_hit_count"],
+            "prize_counts": {prize_engine.PRIZE_TIERS[level][0]: prize["tier_counts"][level]
+                             for level in prize_engine.PRIZE_TIERS},
+            "winnings": prize["winnings"],
+            "cost": prize["cost"]
+        })
+    rows.sort(key=lambda r: (-r["avg_best_hits"], -r["periods"], r["model_name"]))
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    return rows
+
+
+class DataSnapshot:
+    """一次加载的全部数据及其索引（构建后只读）"""
+
+    def __init__(self, lottery_data: Dict[str, Any], predictions: Dict[str, Any],
+                 history_data: Dict[str, Any], version: str):
+        self.version = version
+        self.lottery_meta = {k: v for k, v in lottery_data.items() if k != "data"}
+        self.draws = sorted(lottery_data.get("data", []), key=lambda d: d["period"], reverse=True)
+        self.draw_by_period = {d["period"]: d for d in self.draws}
+        # 升序期号列表，用于二分查找范围
+        self.periods_asc = [d["period"] for d in reversed(self.draws)]
+
+        self.current_predictions = predictions
+        self.history = history_data.get("predictions_history", [])
+        self.predictions_by_period = {r["target_period"]: r for r in history_data.get("predictions_history", [])}
+        if predictions.get("target_period") and predictions["target_period"] not in self.predictions_by_period:
+            self.predictions_by_period[predictions["target_period"]] = predictions
+        self.leaderboard = build_leaderboard(history_data)
+
+    def draws_between(self, from_period: Optional[str], to_period: Optional[str]) -> List[Dict[str, Any]]:
+        """期号范围内的开奖数据（期号降序）"""
+        lo = bisect_left(self.periods_asc, from_period) if from_period else 0
+        hi = bisect_right(self.periods_asc, to_period) if to_period else len(self.periods_asc)
+        return [self.draw_by_period[p] for p in reversed(self.periods_asc[lo:hi])]
+
+
+class DataStore:
+    """按文件修改时间自动重新加载的数据仓库"""
+
+    def __init__(self, lottery_file: str = LOTTERY_HISTORY_FILE, predictions_file: str = AI_PREDICTIONS_FILE,
+                 history_file: str = PREDICTIONS_HISTORY_FILE):
+        self.files = (lottery_file, predictions_file, history_file)
+        self._lock = threading.Lock()
+        self._signature = None
+        self._checked_at = 0.0
+        self._snapshot: Optional[DataSnapshot] = None
+        self.reload_count = 0
+
+    def _file_signature(self) -> Tuple:
+        signature = []
+        for path in self.files:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def snapshot(self) -> DataSnapshot:
+        """当前数据快照，文件变化时先重新加载"""
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < RELOAD_CHECK_INTERVAL:
+            return self._snapshot
+
+        with self._lock:
+            self._checked_at = now
+            signature = self._file_signature()
+            if self._snapshot is None or signature != self._signature:
+                lottery_file, predictions_file, history_file = self.files
+                version = hashlib.sha1(repr(signature).encode()).hexdigest()[:12]
+                try:
+                    self._snapshot = DataSnapshot(
+                        _load_json(lottery_file, {"data": []}),
+                        _load_json(predictions_file, {}),
+                        _load_json(history_file, {"predictions_history": []}),
+                        version
+                    )
+                except (OSError, ValueError) as e:
+                    # 文件正在写入时可能解析失败，保留旧快照，下次检查时再加载
+                    if self._snapshot is None:
+                        raise
+                    print(f"  ⚠️  重新加载数据失败，继续使用旧数据: {e}")
+                    return self._snapshot
+                self._signature = signature
+                self.reload_count += 1
+                print(f"  🔄 已加载数据（版本 {version}，{len(self._snapshot.draws)} 期开奖，"
+                      f"{len(self._snapshot.predictions_by_period)} 期预测）")
+            return self._snapshot
+
+
+def _int_param(query: Dict[str, List[str]], name: str, default: Optional[int]) -> Optional[int]:
+    """读取非负整数查询参数，缺省时返回 default"""
+    if name not in query:
+        return default
+    try:
+        return max(int(query[name][0]), 0)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} 必须是整数")
+
+
+def route(snapshot: DataSnapshot, path: str, query: Dict[str, List[str]]) -> Any:
+    """根据路径和查询参数生成响应数据"""
+    parts = [p for p in path.split("/") if p][1:]
+
+    if parts == ["draws"]:
+        from_period = query.get("from", [None])[0]
+        to_period = query.get("to", [None])[0]
+        draws = snapshot.draws_between(from_period, to_period)
+        limit = _int_param(query, "limit", None)
+        if limit is not None:
+            draws = draws[:limit]
+        return {**snapshot.lottery_meta, "count": len(draws), "data": draws}
+
+    if len(parts) == 2 and parts[0] == "draws":
+        draw = snapshot.draw_by_period.get(parts[1])
+        if not draw:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"期号 {parts[1]} 没有开奖数据")
+        return draw
+
+    if parts == ["predictions"]:
+        return snapshot.current_predictions
+
+    if len(parts) == 2 and parts[0] == "predictions":
+        record = snapshot.predictions_by_period.get(parts[1])
+        if not record:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"期号 {parts[1]} 没有预测数据")
+        return record
+
+    if parts == ["history"]:
+        offset = _int_param(query, "offset", 0)
+        limit = _int_param(query, "limit", HISTORY_PAGE_SIZE)
+        records = snapshot.history[offset:offset + limit]
+        return {"total": len(snapshot.history), "offset": offset, "count": len(records),
+                "predictions_history": records}
+
+    if parts == ["leaderboard"]:
+        return {"version": snapshot.version, "models": snapshot.leaderboard}
+
+    raise ApiError(HTTPStatus.NOT_FOUND, f"未知接口: {path}")
+
+
+class ApiRequestHandler(SimpleHTTPRequestHandler):
+    """/api/ 开头的请求走 JSON 接口，其余按静态文件处理"""
+
+    store: DataStore = None
+    cache: Dict[Tuple, Tuple[bytes, Optional[bytes], str]] = {}
+    cache_lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=SCRIPT_DIR, **kwargs)
+
+    def do_GET(self):
+        if self.path.startswith("/api/"):
+            self.handle_api(send_body=True)
+        else:
+            super().do_GET()
+
+    def do_HEAD(self):
+        if self.path.startswith("/api/"):
+            self.handle_api(send_body=False)
+        else:
+            super().do_HEAD()
+
+    def handle_api(self, send_body: bool):
+        url = urlsplit(self.path)
+        try:
+            snapshot = self.store.snapshot()
+            body, gzipped, etag = self.cached_response(snapshot, url.path, url.query)
+        except ApiError as e:
+            self.send_json_error(e.status, e.message, send_body)
+            return
+        except Exception as e:
+            self.send_json_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}", send_body)
+            return
+
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        use_gzip = gzipped is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        payload = gzipped if use_gzip else body
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(payload)
+
+    def cached_response(self, snapshot: DataSnapshot, path: str, query: str) -> Tuple[bytes, Optional[bytes], str]:
+        """序列化后的响应体、gzip 压缩体和 ETag，按数据版本缓存"""
+        key = (snapshot.version, path, query)
+        with self.cache_lock:
+            cached = self.cache.get(key)
+        if cached:
+            return cached
+
+        data = route(snapshot, path, parse_qs(query))
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        gzipped = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        with self.cache_lock:
+            # 数据版本变化或缓存过多时整体清空
+            if len(self.cache) >= RESPONSE_CACHE_SIZE or any(k[0] != snapshot.version for k in self.cache):
+                self.cache.clear()
+            self.cache[key] = (body, gzipped, etag)
+        return body, gzipped, etag
+
+    def send_json_error(self, status: int, message: str, send_body: bool = True):
+        body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+def start_api_server(host: str = "", port: int = 8000, store: DataStore = None) -> ThreadingHTTPServer:
+    """创建服务器（调用方负责 serve_forever/shutdown），port=0 时自动选择端口"""
+    handler = type("BoundApiRequestHandler", (ApiRequestHandler,), {
+        "store": store or DataStore(),
+        "cache": {},
+        "cache_lock": threading.Lock()
+    })
+    handler.store.snapshot()
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="双色球数据本地 API 服务器（同时提供静态页面）")
+    parser.add_argument("--host", default="", help="监听地址（默认所有地址）")
+    parser.add_argument("--port", type=int, default=8000, help="端口")
+    args = parser.parse_args(argv)
+
+    server = start_api_server(args.host, args.port)
+    print(f"📡 服务器地址: http://localhost:{server.server_address[1]}")
+    print("🔌 API: /api/draws  /api/predictions/{period}  /api/history  /api/leaderboard")
+    print("💡 提示: 按 Ctrl+C 停止服务器")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 服务器已停止")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
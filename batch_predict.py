@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+双色球 AI 预测批量回测脚本
+对一段已开奖的历史期号逐期预测（每期只使用该期之前的开奖数据），
+按 (期号 × 模型) 并发调用模型，计算命中结果并以历史预测记录格式保存；
+每期的全部模型结束后立即原子写入输出文件，中途中断后重新运行相同命令只补跑未保存的期号
+
+使用方法：
+    python3 batch_predict.py --from 26001 --to 26021
+    python3 batch_predict.py --from 25140 --to 25151 --models "GPT-5,Gemini 2.5" --concurrency 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import generate_ai_prediction as gap
+from telemetry import PipelineTelemetry
+
+BACKTEST_HISTORY_FILE = os.path.join(gap.SCRIPT_DIR, "data", "backtest_history.json")
+CACHE_DIR = os.path.join(gap.SCRIPT_DIR, ".cache", "batch_predictions")
+HISTORY_WINDOW = 30
+
+
+def build_period_jobs(draws: List[Dict[str, Any]], from_period: str, to_period: str,
+                      window: int) -> List[Dict[str, Any]]:
+    """
+    为范围内每个已开奖期号构建回测任务
+
+    Args:
+        draws: 全部开奖数据（任意顺序）
+        from_period: 起始期号（含）
+        to_period: 结束期号（含）
+        window: 每期使用的历史期数
+
+    Returns:
+        按期号升序排列的任务列表，每项包含目标开奖结果和之前的 window 期历史
+    """
+    ordered = sorted(draws, key=lambda d: d["period"], reverse=True)
+    jobs = []
+    for index, draw in enumerate(ordered):
+        if not from_period <= draw["period"] <= to_period:
+            continue
+        # 走步窗口：只使用目标期之前的开奖数据
+        history = ordered[index + 1:index + 1 + window]
+        if not history:
+            print(f"  ⚠️  期号 {draw['period']} 之前没有历史数据，跳过")
+            continue
+        jobs.append({"actual_result": draw, "history": history})
+    jobs.reverse()
+    return jobs
+
+
+def format_display_date(date: str) -> str:
+    """2025-10-21 -> 2025年10月21日"""
+    try:
+        return datetime.strptime(date, "%Y-%m-%d").strftime("%Y年%m月%d日")
+    except ValueError:
+        return date
+
+
+def cache_path(model_config: Dict[str, str], prompt: str) -> str:
+    """缓存键：模型 + 完整 Prompt，Prompt 或历史窗口变化都会使缓存失效"""
+    digest = hashlib.sha256(f"{model_config['id']}\n{prompt}".encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.json")
+
+
+def load_backtest_records(output_file: str) -> Dict[str, Dict[str, Any]]:
+    """加载已有回测结果，按期号索引（用于断点续跑）"""
+    if not os.path.exists(output_file):
+        return {}
+    with open(output_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {r["target_period"]: r for r in data.get("predictions_history", [])}
+
+
+def save_backtest_records(records: Dict[str, Dict[str, Any]], output_file: str):
+    """按期号降序保存，格式与 predictions_history.json 相同"""
+    history_data = {
+        "历史预测记录": "本文件保存批量回测生成的AI预测数据，每期只使用该期之前的开奖数据",
+        "predictions_history": sorted(records.values(), key=lambda r: r["target_period"], reverse=True)
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(history_data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, output_file)
+
+
+def run_job(client, limiter, model_config: Dict[str, str], prompt: str, expected: Dict[str, str],
+            use_cache: bool, metrics: PipelineTelemetry, samples: int = 1) -> Dict[str, Any]:
+    """执行单个 (期号 × 模型) 任务，优先读取缓存"""
+    path = cache_path(model_config, prompt)
+    if use_cache and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    prediction, _ = gap.call_ai_model(client, model_config, prompt, metrics, limiter, samples, expected)
+    with metrics.stage("validate", model=model_config['name']) as event:
+        prediction, fixes = gap.validate_and_repair_prediction(prediction, expected)
+        if fixes:
+            event["fixes"] = fixes
+        if prediction is None:
+            event["status"] = "failed"
+            event["error"] = "预测数据验证未通过且无法修复"
+            raise ValueError(f"{model_config['name']} 预测数据验证未通过且无法修复")
+        if fixes:
+            event["repaired"] = True
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(prediction, f, ensure_ascii=False, indent=2)
+    return prediction
+
+
+def run_batch(from_period: str, to_period: str, models: List[Dict[str, str]], concurrency: int = 4,
+              window: int = HISTORY_WINDOW, output_file: str = BACKTEST_HISTORY_FILE,
+              use_cache: bool = True, metrics: PipelineTelemetry = None,
+              samples: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """执行批量回测，每期的任务全部结束后立即保存结果（中途中断不丢失已完成的期号）"""
+    metrics = metrics or PipelineTelemetry()
+
+    with metrics.stage("load", target="prompt"):
+        prefix_template, suffix_template = gap.split_prompt_template(gap.load_prompt_template())
+    with metrics.stage("load", target="lottery_history"):
+        lottery_data = gap.load_lottery_history()
+
+    period_jobs = build_period_jobs(lottery_data.get("data", []), from_period, to_period, window)
+    if not period_jobs:
+        print(f"❌ 范围 {from_period}-{to_period} 内没有可回测的已开奖期号")
+        return {}
+
+    # 断点续跑：跳过输出文件中已有的 (期号, 模型)
+    records = load_backtest_records(output_file)
+    jobs = []
+    for period_job in period_jobs:
+        draw = period_job["actual_result"]
+        done = {m["model_id"] for m in records.get(draw["period"], {}).get("models", [])}
+        pending = [m for m in models if m["model_id"] not in done]
+        if not pending:
+            continue
+
+        with metrics.stage("prompt_build", target=draw["period"]):
+            history_json = json.dumps(period_job["history"], ensure_ascii=False, indent=2)
+            prompt_prefix = gap.build_prompt_prefix(prefix_template, history_json)
+        for model_config in pending:
+            expected = {
+                "prediction_date": draw["date"],
+                "target_period": draw["period"],
+                "model_id": model_config['model_id'],
+                "model_name": model_config['name']
+            }
+            prompt = gap.build_prompt(prompt_prefix, suffix_template,
+                                      target_date=format_display_date(draw["date"]), **expected)
+            jobs.append((draw, model_config, prompt, expected))
+
+    total = len(period_jobs) * len(models)
+    print(f"🎯 回测范围: {period_jobs[0]['actual_result']['period']} - {period_jobs[-1]['actual_result']['period']} "
+          f"({len(period_jobs)} 期 × {len(models)} 个模型)")
+    print(f"📝 历史窗口: {window} 期，并发数: {concurrency}")
+    print(f"⏭️  已完成 {total - len(jobs)} 个任务，待执行 {len(jobs)} 个\n")
+    if not jobs:
+        return records
+
+    # 线程数只决定排队任务的上限，每个服务商的实际并发和速率由限流调度器控制
+    clients = gap.get_openai_clients(models)
+    scheduler = gap.create_scheduler()
+    # 各期模型顺序与配置一致
+    order = {m["model_id"]: i for i, m in enumerate(gap.get_roster()[1])}
+    remaining = Counter(draw["period"] for draw, _, _, _ in jobs)
+    failed = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(run_job, clients[model_config['provider']], scheduler.limiter_for(model_config),
+                                   model_config, prompt, expected, use_cache, metrics,
+                                   samples or model_config.get('samples') or gap.DEFAULT_SAMPLES): (draw, model_config)
+                   for draw, model_config, prompt, expected in jobs}
+        for future in as_completed(futures):
+            draw, model_config = futures[future]
+            remaining[draw["period"]] -= 1
+            try:
+                prediction = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"  ✗ {draw['period']} {model_config['name']} 失败: {type(e).__name__}: {e}")
+            else:
+                record = records.setdefault(draw["period"], {
+                    "prediction_date": draw["date"],
+                    "target_period": draw["period"],
+                    "actual_result": draw,
+                    "models": []
+                })
+                record["models"].append(gap.score_model_predictions(prediction, draw))
+                print(f"  ✓ {draw['period']} {model_config['name']} 完成")
+
+            # 该期所有模型都已结束（成功或失败）时原子写入输出文件
+            if not remaining[draw["period"]] and draw["period"] in records:
+                records[draw["period"]]["models"].sort(key=lambda m: order.get(m["model_id"], len(order)))
+                with metrics.stage("save", target=draw["period"]):
+                    save_backtest_records(records, output_file)
+
+    print(f"\n✅ 完成 {len(jobs) - failed}/{len(jobs)} 个任务，结果已保存到: {output_file}")
+    scheduler.print_summary()
+    if failed:
+        print(f"💡 重新运行相同命令即可只补跑失败的 {failed} 个任务\n")
+    print_backtest_summary(records, from_period, to_period)
+    return records
+
+
+def print_backtest_summary(records: Dict[str, Dict[str, Any]], from_period: str, to_period: str):
+    """打印各模型在回测范围内的平均命中"""
+    stats: Dict[str, List[int]] = {}
+    for period, record in records.items():
+        if not from_period <= period <= to_period:
+            continue
+        for model in record["models"]:
+            stats.setdefault(model["model_name"], []).append(model["best_hit_count"])
+
+    if not stats:
+        return
+    print("📋 回测摘要（每期最佳组命中数）:")
+    for name, hits in stats.items():
+        print(f"    - {name}: {len(hits)} 期，平均 {sum(hits) / len(hits):.2f}，最高 {max(hits)}")
+    print()
+
+
+def main(argv=None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description="双色球 AI 预测批量回测")
+    parser.add_argument("--from", dest="from_period", required=True, help="起始期号（含）")
+    parser.add_argument("--to", dest="to_period", required=True, help="结束期号（含）")
+    parser.add_argument("--models", help="只运行指定模型（逗号分隔的显示名称或 model_id）")
+    parser.add_argument("--concurrency", type=int, default=4, help="线程数（各服务商的并发与速率上限见 models.json）")
+    parser.add_argument("--window", type=int, default=HISTORY_WINDOW, help="每期使用的历史期数")
+    parser.add_argument("--output", default=BACKTEST_HISTORY_FILE, help="回测结果文件")
+    parser.add_argument("--no-cache", action="store_true", help="忽略已缓存的模型响应")
+    parser.add_argument("--samples", type=int, default=None, help="每个任务一次取回的候选数，选用最佳候选")
+    parser.add_argument("--metrics-file", default=gap.METRICS_FILE, help="运行指标 JSONL 文件路径")
+    args = parser.parse_args(argv)
+
+    _, models = gap.get_roster()
+    if args.models:
+        wanted = {name.strip() for name in args.models.split(",")}
+        models = [m for m in models if m["name"] in wanted or m["model_id"] in wanted]
+        if not models:
+            parser.error(f"未找到模型: {args.models}")
+
+    metrics = PipelineTelemetry()
+    try:
+        run_batch(args.from_period, args.to_period, models, args.concurrency, args.window,
+                  args.output, not args.no_cache, metrics, args.samples)
+    finally:
+        metrics.write_jsonl(args.metrics_file)
+        metrics.print_summary()
+
+
+if __name__ == "__main__":
+    main()
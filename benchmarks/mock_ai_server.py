@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地 OpenAI 兼容模拟服务器
+
+功能：
+1. 实现 POST /v1/chat/completions 接口，回放录制好的预测结果
+2. 根据 Prompt 后缀中的期号、日期、模型信息改写回放内容，使其能通过验证
+3. 可配置延迟、抖动、服务端错误率、限流率和返回畸形 JSON 的比例
+4. 模拟前缀缓存：相同静态前缀第二次出现时在 usage 中报告 cached_tokens
+
+使用方法：
+    python3 benchmarks/mock_ai_server.py --port 8765 --latency-ms 300 --error-rate 0.1
+
+    然后：
+    AI_API_KEY=mock AI_BASE_URL=http://127.0.0.1:8765/v1 python3 generate_ai_prediction.py
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESPONSES_FILE = os.path.join(SCRIPT_DIR, "..", "data", "ai_predictions.json")
+
+# 与 doc/prompt2.0.md 中的分隔标记后的「本次任务」段落对应
+SUFFIX_HEADING = "## 本次任务"
+TASK_FIELD_PATTERNS = {
+    "target_period": re.compile(r"目标期号：\**(\w+)\**"),
+    "prediction_date": re.compile(r"预测日期：(\S+)"),
+    "model_id": re.compile(r"模型 ID：(\S+)"),
+    "model_name": re.compile(r"模型名称：(.+)")
+}
+
+
+class MockConfig:
+    """模拟服务器的故障注入配置"""
+
+    def __init__(self, latency_ms=100.0, jitter_ms=0.0, error_rate=0.0,
+                 rate_limit_rate=0.0, malformed_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.seed = seed
+
+    def describe(self):
+        return (f"latency={self.latency_ms:.0f}±{self.jitter_ms:.0f}ms "
+                f"error={self.error_rate:.0%} 429={self.rate_limit_rate:.0%} malformed={self.malformed_rate:.0%}")
+
+
+def load_recorded_responses(path):
+    """
+    加载录制的预测结果
+
+    支持两种格式：
+    - ai_predictions.json 格式（包含 models 列表）
+    - JSONL，每行一个单模型预测
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    if isinstance(data, dict) and "models" in data:
+        return data["models"]
+    if isinstance(data, list):
+        return data
+    return [data]
+
+
+class MockAIServer(ThreadingHTTPServer):
+    """带回放数据和故障注入配置的 HTTP 服务器"""
+
+    daemon_threads = True
+
+    def __init__(self, address, responses, config=None):
+        super().__init__(address, MockRequestHandler)
+        self.responses = responses
+        self.config = config or MockConfig()
+        self.rng = random.Random(self.config.seed)
+        self.lock = threading.Lock()
+        self.seen_prefixes = set()
+        self.request_count = 0
+
+    def reconfigure(self, config):
+        """切换故障注入配置（基准测试在不同场景间复用同一个服务器）"""
+        with self.lock:
+            self.config = config
+            self.rng = random.Random(config.seed)
+            self.seen_prefixes.clear()
+
+    def roll(self):
+        """抽取本次请求的延迟和故障类型"""
+        with self.lock:
+            self.request_count += 1
+            config = self.config
+            latency = max(0.0, self.rng.gauss(config.latency_ms, config.jitter_ms)) if config.jitter_ms else config.latency_ms
+            r = self.rng.random()
+            if r < config.error_rate:
+                fault = "error"
+            elif r < config.error_rate + config.rate_limit_rate:
+                fault = "rate_limit"
+            elif r < config.error_rate + config.rate_limit_rate + config.malformed_rate:
+                fault = "malformed"
+            else:
+                fault = None
+            return latency / 1000, fault, self.rng.random()
+
+    def roll_choice(self):
+        """n > 1 时为后续候选单独抽取是否畸形（真实模型的多个候选相互独立）"""
+        with self.lock:
+            return self.rng.random() < self.config.malformed_rate, self.rng.random()
+
+    def cached_tokens_for(self, prompt):
+        """模拟前缀缓存：静态前缀已见过时返回其 token 数"""
+        prefix = prompt.split(SUFFIX_HEADING, 1)[0]
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        with self.lock:
+            hit = digest in self.seen_prefixes
+            self.seen_prefixes.add(digest)
+        return estimate_tokens(prefix) if hit else 0
+
+    def pick_response(self, model, task):
+        """按 Prompt 中的模型 ID 选择录制结果，找不到时按请求的模型名稳定散列"""
+        for recorded in self.responses:
+            if task.get("model_id") and recorded.get("model_id") == task["model_id"]:
+                return copy.deepcopy(recorded)
+        index = int(hashlib.md5(model.encode("utf-8")).hexdigest(), 16) % len(self.responses)
+        return copy.deepcopy(self.responses[index])
+
+
+def estimate_tokens(text):
+    """粗略估算 token 数（中文约 1 字 1 token，其余约 4 字符 1 token）"""
+    cjk = sum(1 for ch in text if ord(ch) > 0x2E80)
+    return cjk + (len(text) - cjk) // 4
+
+
+def parse_task(prompt):
+    """从 Prompt 后缀中解析本次任务参数"""
+    suffix = prompt.split(SUFFIX_HEADING, 1)[-1]
+    task = {}
+    for field, pattern in TASK_FIELD_PATTERNS.items():
+        match = pattern.search(suffix)
+        if match:
+            task[field] = match.group(1).strip()
+    return task
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """处理 chat completions 请求"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self.send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+
+        server = self.server
+        latency, fault, cut = server.roll()
+        time.sleep(latency)
+
+        if fault == "error":
+            self.send_json(500, {"error": {"message": "Mock internal server error", "type": "server_error"}})
+            return
+        if fault == "rate_limit":
+            self.send_json(429, {"error": {"message": "Mock rate limit exceeded", "type": "rate_limit_error"}},
+                           headers={"Retry-After": "1", "x-ratelimit-remaining-requests": "0"})
+            return
+
+        messages = request.get("messages", [])
+        prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "user")
+        task = parse_task(prompt)
+        model = request.get("model", "mock-model")
+
+        choices = []
+        for index in range(max(1, int(request.get("n") or 1))):
+            prediction = server.pick_response(model, task)
+            prediction.update(task)
+            content = json.dumps(prediction, ensure_ascii=False, indent=2)
+            malformed = fault == "malformed"
+            if index:
+                malformed, cut = server.roll_choice()
+            if malformed:
+                # 截断 JSON，模拟输出被截断或夹带多余文字
+                content = content[:max(1, int(len(content) * cut))]
+            choices.append({
+                "index": index,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            })
+
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = sum(estimate_tokens(c["message"]["content"]) for c in choices)
+        self.send_json(200, {
+            "id": f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": choices,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": server.cached_tokens_for(prompt)}
+            }
+        })
+
+
+def start_mock_server(config=None, port=0, responses_file=DEFAULT_RESPONSES_FILE, host="127.0.0.1"):
+    """
+    在后台线程中启动模拟服务器
+
+    Returns:
+        (server, base_url)
+    """
+    server = MockAIServer((host, port), load_recorded_responses(responses_file), config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 OpenAI 兼容模拟服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--responses", default=DEFAULT_RESPONSES_FILE, help="录制的预测结果（JSON 或 JSONL）")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="平均响应延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="延迟标准差（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 500 的比例")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="返回 429 的比例")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="返回截断 JSON 的比例")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency_ms, args.jitter_ms, args.error_rate,
+                        args.rate_limit_rate, args.malformed_rate, args.seed)
+    server = MockAIServer((args.host, args.port), load_recorded_responses(args.responses), config)
+    print(f"📡 模拟服务器已启动: http://{args.host}:{args.port}/v1")
+    print(f"⚙️  {config.describe()}")
+    print(f"📼 回放数据: {len(server.responses)} 条")
+    print("💡 提示: 按 Ctrl+C 停止服务器")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n服务器已停止")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预测流水线端到端基准测试
+
+功能：
+1. 在后台启动本地模拟服务器（benchmarks/mock_ai_server.py），无需真实 API Key
+2. 在临时目录中复制数据文件，完整运行 generate_predictions + save_predictions
+3. 对多种延迟/错误率/畸形 JSON 配置分别运行多次
+4. 报告每种配置的吞吐量（成功预测数/秒）和模型调用的尾延迟（p50/p95/p99）
+
+使用方法：
+    python3 benchmarks/pipeline_benchmark.py
+    python3 benchmarks/pipeline_benchmark.py --runs 5 --scenario flaky --scenario malformed
+    python3 benchmarks/pipeline_benchmark.py --latency-ms 800 --error-rate 0.2 --runs 3
+    python3 benchmarks/pipeline_benchmark.py --scenario malformed --samples 3
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, SCRIPT_DIR)
+
+from mock_ai_server import MockConfig, start_mock_server
+
+# 预置场景
+SCENARIOS = {
+    "baseline": MockConfig(latency_ms=50),
+    "slow": MockConfig(latency_ms=600, jitter_ms=250),
+    "flaky": MockConfig(latency_ms=100, jitter_ms=30, error_rate=0.2, rate_limit_rate=0.1),
+    "malformed": MockConfig(latency_ms=100, jitter_ms=30, malformed_rate=0.25)
+}
+
+DATA_FILES = ["lottery_history.json", "ai_predictions.json", "predictions_history.json", "ticket_index.json"]
+
+
+def percentile(values, pct):
+    """最近秩法计算百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def prepare_workspace(gap, workdir):
+    """复制数据文件到临时目录，并让流水线读写临时目录"""
+    data_dir = os.path.join(workdir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    for name in DATA_FILES:
+        src = os.path.join(PROJECT_DIR, "data", name)
+        if os.path.exists(src):
+            shutil.copy2(src, data_dir)
+    gap.LOTTERY_HISTORY_FILE = os.path.join(data_dir, "lottery_history.json")
+    gap.AI_PREDICTIONS_FILE = os.path.join(data_dir, "ai_predictions.json")
+    gap.PREDICTIONS_HISTORY_FILE = os.path.join(data_dir, "predictions_history.json")
+    gap.TICKET_INDEX_FILE = os.path.join(data_dir, "ticket_index.json")
+    gap.CHECKPOINT_DIR = os.path.join(data_dir, "checkpoints")
+
+
+def run_scenario(gap, server, name, config, runs, verbose=False, samples=None):
+    """在一种配置下运行多次完整流程并汇总"""
+    from telemetry import PipelineTelemetry
+
+    server.reconfigure(config)
+    call_latencies = []
+    run_seconds = []
+    succeeded = 0
+    attempted = 0
+    retries = 0
+    cached_tokens = 0
+    prompt_tokens = 0
+
+    for _ in range(runs):
+        metrics = PipelineTelemetry()
+        output = sys.stdout if verbose else io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            # force=True：每次运行都重新调用全部模型，不复用检查点
+            result = gap.generate_predictions(metrics, force=True, samples=samples)
+            if result:
+                with metrics.stage("save"):
+                    gap.save_predictions(result)
+        run_seconds.append(time.perf_counter() - start)
+
+        attempted += len(gap.get_roster()[1])
+        succeeded += len(result["models"]) if result else 0
+        for event in metrics.events:
+            if event["stage"] == "model_call":
+                call_latencies.append(event["wall_ms"])
+                retries += event.get("retries", 0)
+                cached_tokens += event.get("cached_tokens", 0)
+                prompt_tokens += event.get("prompt_tokens", 0)
+
+    total_seconds = sum(run_seconds)
+    return {
+        "scenario": name,
+        "config": config.describe(),
+        "runs": runs,
+        "success": f"{succeeded}/{attempted}",
+        "throughput": succeeded / total_seconds if total_seconds else 0.0,
+        "run_avg_s": total_seconds / runs,
+        "p50_ms": percentile(call_latencies, 50),
+        "p95_ms": percentile(call_latencies, 95),
+        "p99_ms": percentile(call_latencies, 99),
+        "retries": retries,
+        "cache_hit": cached_tokens / prompt_tokens if prompt_tokens else 0.0
+    }
+
+
+def print_report(rows):
+    print("\n📊 基准测试结果:")
+    header = f"  {'scenario':<12}{'runs':>5}{'success':>9}{'pred/s':>9}{'run_avg_s':>11}{'p50_ms':>9}{'p95_ms':>9}{'p99_ms':>9}{'retries':>9}{'cache':>8}"
+    print(header)
+    print("  " + "-" * (len(header) - 2))
+    for row in rows:
+        print(f"  {row['scenario']:<12}{row['runs']:>5}{row['success']:>9}{row['throughput']:>9.2f}"
+              f"{row['run_avg_s']:>11.2f}{row['p50_ms']:>9.0f}{row['p95_ms']:>9.0f}{row['p99_ms']:>9.0f}"
+              f"{row['retries']:>9}{row['cache_hit']:>8.0%}")
+    print()
+    for row in rows:
+        print(f"  {row['scenario']}: {row['config']}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预测流水线端到端基准测试（使用本地模拟服务器）")
+    parser.add_argument("--runs", type=int, default=3, help="每种配置运行次数")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="只运行指定场景（可重复）")
+    parser.add_argument("--latency-ms", type=float, help="自定义场景：平均延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="自定义场景：延迟标准差")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="自定义场景：500 错误比例")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="自定义场景：429 比例")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="自定义场景：畸形 JSON 比例")
+    parser.add_argument("--retry-delay", type=float, default=0.1, help="重试退避基数（秒），默认缩短以加快测试")
+    parser.add_argument("--seed", type=int, default=42, help="故障注入随机种子")
+    parser.add_argument("--samples", type=int, default=None, help="每个模型的候选数（对比多候选采样的成功率）")
+    parser.add_argument("--json", dest="json_output", help="同时将结果写入 JSON 文件")
+    parser.add_argument("--verbose", action="store_true", help="显示流水线原始输出")
+    args = parser.parse_args()
+
+    scenarios = []
+    if args.latency_ms is not None:
+        scenarios.append(("custom", MockConfig(args.latency_ms, args.jitter_ms, args.error_rate,
+                                               args.rate_limit_rate, args.malformed_rate, args.seed)))
+    for name in args.scenario or ([] if scenarios else sorted(SCENARIOS)):
+        config = SCENARIOS[name]
+        config.seed = args.seed
+        scenarios.append((name, config))
+
+    server, base_url = start_mock_server()
+    os.environ["AI_API_KEY"] = "mock-key"
+    os.environ["AI_BASE_URL"] = base_url
+    print(f"📡 模拟服务器: {base_url}")
+
+    import generate_ai_prediction as gap
+    gap.BASE_URL = base_url
+    gap.API_KEY = "mock-key"
+    gap.RETRY_DELAY = args.retry_delay
+
+    rows = []
+    workdir = tempfile.mkdtemp(prefix="ssq_bench_")
+    try:
+        prepare_workspace(gap, workdir)
+        for name, config in scenarios:
+            print(f"⏳ 运行场景 {name} ({config.describe()}) × {args.runs}...")
+            rows.append(run_scenario(gap, server, name, config, args.runs, args.verbose, args.samples))
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(rows)
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"💾 结果已保存到: {args.json_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据处理函数规模基准测试
+
+用合成数据模拟数据文件长期增长后的规模，分别测量各数据处理函数的耗时和峰值内存，
+并与保存的基线比较，超出阈值时标记为回归
+
+测量的函数：
+    parse_lottery_data        解析大型开奖历史 HTML 页面（需要 bs4，未安装时跳过）
+    merge_with_existing_data  向大型 lottery_data.json 合并 100 期新数据
+    archive_old_prediction    向大型 predictions_history.json 归档一期预测
+    calculate_hit_result      对全部历史预测组逐组计算命中结果
+    save_predictions          保存预测（含读取旧文件创建备份）
+
+规模（--scale）：
+    full   10000 期开奖、100000 组历史预测（5000 期 × 4 个模型 × 5 组）、10000 行 HTML
+    small  1000 期开奖、10000 组历史预测、1000 行 HTML（用于快速检查）
+
+耗时取多次运行的中位数；峰值内存在单独一次运行中用 tracemalloc 测量，不影响计时
+
+使用方法：
+    python3 benchmarks/scaling_benchmark.py                     # 运行并与基线比较
+    python3 benchmarks/scaling_benchmark.py --save-baseline     # 更新基线
+    python3 benchmarks/scaling_benchmark.py --scale small --case archive_old_prediction
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_DIR, "fetch_history"))
+
+BASELINE_FILE = os.path.join(SCRIPT_DIR, "baselines", "scaling_baseline.json")
+
+SCALES = {
+    "full": {"draws": 10000, "history_periods": 5000, "html_rows": 10000},
+    "small": {"draws": 1000, "history_periods": 500, "html_rows": 1000}
+}
+MODELS_PER_PERIOD = 4
+GROUPS_PER_MODEL = 5
+STRATEGIES = ["热号追随者", "冷号逆向者", "平衡策略师", "周期理论家", "综合决策者"]
+
+# 回归判定：超过基线的比例，耗时波动较大因此阈值更宽；
+# 同时要求绝对差值超过下限，避免极小的基线值因噪声被误判
+TIME_THRESHOLD = 0.30
+MEMORY_THRESHOLD = 0.15
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA = 1.0
+
+
+# ---------------------------------------------------------------- 合成数据
+
+def synthetic_draws(count, seed=1):
+    """生成 count 期开奖数据（期号降序），期号按每年 153 期递增"""
+    rng = random.Random(seed)
+    draws = []
+    day = date(2000, 1, 4)
+    year, number = 0, 1
+    for _ in range(count):
+        reds = sorted(rng.sample(range(1, 34), 6))
+        draws.append({
+            "period": f"{year:02d}{number:03d}",
+            "red_balls": [f"{n:02d}" for n in reds],
+            "blue_ball": f"{rng.randint(1, 16):02d}",
+            "date": day.isoformat()
+        })
+        day += timedelta(days=2 if day.weekday() in (1, 3) else 3)
+        number += 1
+        if number > 153:
+            year, number = year + 1, 1
+    draws.reverse()
+    return draws
+
+
+def synthetic_model(rng, index, target_period, prediction_date):
+    return {
+        "prediction_date": prediction_date,
+        "target_period": target_period,
+        "model_id": f"model-{index}",
+        "model_name": f"Model {index}",
+        "predictions": [{
+            "group_id": g,
+            "strategy": STRATEGIES[g - 1],
+            "red_balls": [f"{n:02d}" for n in sorted(rng.sample(range(1, 34), 6))],
+            "blue_ball": f"{rng.randint(1, 16):02d}",
+            "description": "合成数据：按策略规则随机生成的号码组合，用于规模基准测试。"
+        } for g in range(1, GROUPS_PER_MODEL + 1)]
+    }
+
+
+def synthetic_predictions(draw, seed=2):
+    """一期的 AI 预测（ai_predictions.json 格式）"""
+    rng = random.Random(seed)
+    return {
+        "prediction_date": draw["date"],
+        "target_period": draw["period"],
+        "models": [synthetic_model(rng, i, draw["period"], draw["date"]) for i in range(MODELS_PER_PERIOD)]
+    }
+
+
+def synthetic_history(draws, seed=3):
+    """为每期开奖生成已计分的历史预测记录（predictions_history.json 格式）"""
+    import generate_ai_prediction as gap
+
+    rng = random.Random(seed)
+    records = []
+    for draw in draws:
+        models = [gap.score_model_predictions(synthetic_model(rng, i, draw["period"], draw["date"]), draw)
+                  for i in range(MODELS_PER_PERIOD)]
+        records.append({
+            "prediction_date": draw["date"],
+            "target_period": draw["period"],
+            "actual_result": draw,
+            "models": models
+        })
+    return {"历史预测记录": "合成数据", "predictions_history": records}
+
+
+def synthetic_html(draws):
+    """模拟 500 彩票网历史开奖页面（每行 16 列）"""
+    rows = []
+    for d in draws:
+        reds = "".join(f'<td class="t_cfont2">{b}</td>' for b in d["red_balls"])
+        rows.append(f'<tr class="t_tr1"><!--<td>2</td>--><td>{d["period"]}</td>{reds}'
+                    f'<td class="t_cfont4">{d["blue_ball"]}</td><td class="t_cfont4">&nbsp;</td>'
+                    f'<td>1,234,567,890</td><td>5</td><td>6,000,000</td><td>120</td><td>150,000</td>'
+                    f'<td>380,000,000</td><td>{d["date"]}</td></tr>')
+    return ('<html><head><meta charset="gb2312"><title>双色球历史开奖</title></head><body>'
+            '<table id="tablelist"><thead><tr><th>期号</th></tr></thead><tbody id="tdata">'
+            + "\n".join(rows) + '</tbody></table></body></html>')
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# ---------------------------------------------------------------- 测试用例
+
+class Workspace:
+    """临时目录中的合成数据文件（所有用例共享，每次运行前恢复）"""
+
+    def __init__(self, scale):
+        import generate_ai_prediction as gap
+
+        self.gap = gap
+        self.dir = tempfile.mkdtemp(prefix="ssq_scaling_")
+        sizes = SCALES[scale]
+
+        # 最新一期作为待归档的目标期号，历史预测覆盖其之前的 history_periods 期
+        self.draws = synthetic_draws(sizes["draws"])
+        self.lottery_data = {"last_updated": "2026-01-01T00:00:00Z", "data": self.draws}
+        self.history = synthetic_history(self.draws[1:1 + sizes["history_periods"]])
+        self.predictions = synthetic_predictions(self.draws[0])
+        self.html = synthetic_html(self.draws[:sizes["html_rows"]])
+        self.groups = [(g, r["actual_result"]) for r in self.history["predictions_history"]
+                       for m in r["models"] for g in m["predictions"]]
+
+        self.pristine = {
+            "lottery_data.json": os.path.join(self.dir, "pristine_lottery_data.json"),
+            "predictions_history.json": os.path.join(self.dir, "pristine_predictions_history.json"),
+            "ai_predictions.json": os.path.join(self.dir, "pristine_ai_predictions.json"),
+        }
+        write_json(self.pristine["lottery_data.json"], self.draws[100:])
+        write_json(self.pristine["predictions_history.json"], self.history)
+        write_json(self.pristine["ai_predictions.json"], self.predictions)
+
+        self.files = {name: os.path.join(self.dir, name) for name in self.pristine}
+        gap.PREDICTIONS_HISTORY_FILE = self.files["predictions_history.json"]
+        gap.AI_PREDICTIONS_FILE = self.files["ai_predictions.json"]
+        gap.TICKET_INDEX_FILE = os.path.join(self.dir, "ticket_index.json")
+        gap.CHECKPOINT_DIR = os.path.join(self.dir, "checkpoints")
+
+        # 预先建立指纹索引，使归档时只做增量更新
+        import ticket_index
+        ticket_index.save_index(ticket_index.build_index(self.history["predictions_history"]),
+                                gap.TICKET_INDEX_FILE)
+        self.index_pristine = gap.TICKET_INDEX_FILE + ".pristine"
+        shutil.copy2(gap.TICKET_INDEX_FILE, self.index_pristine)
+
+    def restore(self, *names):
+        for name in names:
+            shutil.copy2(self.pristine[name], self.files[name])
+        for path in os.listdir(self.dir):
+            if "_backup_" in path:
+                os.remove(os.path.join(self.dir, path))
+        shutil.copy2(self.index_pristine, self.gap.TICKET_INDEX_FILE)
+
+    def cleanup(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def sizes(self):
+        return {name: os.path.getsize(path) for name, path in self.pristine.items()}
+
+
+def build_cases(ws):
+    """用例：名称 -> (准备函数, 被测函数)；准备函数返回被测函数的参数，返回 None 表示跳过"""
+    gap = ws.gap
+
+    def prepare_parse():
+        try:
+            from bs4 import BeautifulSoup
+        except ImportError:
+            return None
+        from fetch_lottery_history import LotteryDataFetcher
+        return LotteryDataFetcher(), BeautifulSoup(ws.html, "html.parser")
+
+    def run_parse(fetcher, soup):
+        parsed = fetcher.parse_lottery_data(soup)
+        assert len(parsed) == len(ws.html.split("<tr class")) - 1
+
+    def prepare_merge():
+        from fetch_lottery_history import LotteryDataFetcher
+        ws.restore("lottery_data.json")
+        return LotteryDataFetcher(), ws.draws[:100], ws.files["lottery_data.json"]
+
+    def run_merge(fetcher, new_data, existing_file):
+        merged = fetcher.merge_with_existing_data(new_data, existing_file)
+        assert len(merged) == len(ws.draws)
+
+    def prepare_archive():
+        ws.restore("predictions_history.json", "ai_predictions.json")
+        return (ws.lottery_data,)
+
+    def run_archive(lottery_data):
+        gap.archive_old_prediction(lottery_data)
+
+    def run_hits():
+        for group, actual in ws.groups:
+            gap.calculate_hit_result(group, actual)
+
+    def prepare_save():
+        ws.restore("ai_predictions.json")
+        return (ws.predictions,)
+
+    def run_save(predictions):
+        gap.save_predictions(predictions)
+
+    return {
+        "parse_lottery_data": (prepare_parse, run_parse),
+        "merge_with_existing_data": (prepare_merge, run_merge),
+        "archive_old_prediction": (prepare_archive, run_archive),
+        "calculate_hit_result": (lambda: (), run_hits),
+        "save_predictions": (prepare_save, run_save)
+    }
+
+
+def measure(prepare, func, repeats):
+    """返回 (中位耗时秒, 峰值内存 MB)；prepare 返回 None 时返回 None"""
+    timings = []
+    for _ in range(repeats):
+        args = prepare()
+        if args is None:
+            return None
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(*args)
+            timings.append(time.perf_counter() - start)
+
+    args = prepare()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(timings), peak / 1024 / 1024
+
+
+# ---------------------------------------------------------------- 基线
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(results, baseline, time_threshold, memory_threshold):
+    """与基线比较，返回 {用例: [回归说明]}"""
+    regressions = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not result or not base:
+            continue
+        notes = []
+        if (result["seconds"] > base["seconds"] * (1 + time_threshold)
+                and result["seconds"] - base["seconds"] > MIN_TIME_DELTA):
+            notes.append(f"耗时 {result['seconds'] / base['seconds']:.2f}x")
+        if (result["peak_mb"] > base["peak_mb"] * (1 + memory_threshold)
+                and result["peak_mb"] - base["peak_mb"] > MIN_MEMORY_DELTA):
+            notes.append(f"内存 {result['peak_mb'] / base['peak_mb']:.2f}x")
+        if notes:
+            regressions[name] = notes
+    return regressions
+
+
+def print_report(results, baseline, regressions):
+    print(f"\n📊 规模基准测试结果:")
+    header = f"  {'function':<28}{'time_s':>10}{'base_s':>10}{'peak_MB':>10}{'base_MB':>10}  status"
+    print(header)
+    print("  " + "-" * (len(header) - 2))
+    for name, result in results.items():
+        if result is None:
+            print(f"  {name:<28}{'-':>10}{'-':>10}{'-':>10}{'-':>10}  ⏭️  跳过（缺少依赖）")
+            continue
+        base = baseline.get(name, {})
+        status = "❌ " + "，".join(regressions[name]) if name in regressions else ("✓" if base else "（无基线）")
+        print(f"  {name:<28}{result['seconds']:>10.3f}{base.get('seconds', float('nan')):>10.3f}"
+              f"{result['peak_mb']:>10.1f}{base.get('peak_mb', float('nan')):>10.1f}  {status}")
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="数据处理函数规模基准测试（合成数据）")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="full", help="数据规模")
+    parser.add_argument("--case", action="append", help="只运行指定函数（可重复）")
+    parser.add_argument("--repeats", type=int, default=3, help="计时运行次数（取中位数）")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="基线文件")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD, help="耗时回归阈值（比例）")
+    parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD, help="内存回归阈值（比例）")
+    args = parser.parse_args(argv)
+
+    print(f"⏳ 生成 {args.scale} 规模合成数据...")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ws = Workspace(args.scale)
+    sizes = ", ".join(f"{name} {size / 1024 / 1024:.1f}MB" for name, size in ws.sizes().items())
+    print(f"  ✓ 耗时 {time.perf_counter() - start:.1f} 秒（{sizes}）")
+
+    results = {}
+    try:
+        cases = build_cases(ws)
+        for name in args.case or list(cases):
+            if name not in cases:
+                parser.error(f"未知函数: {name}")
+            print(f"⏳ {name}...")
+            measured = measure(*cases[name], args.repeats)
+            results[name] = {"seconds": round(measured[0], 4), "peak_mb": round(measured[1], 2)} if measured else None
+    finally:
+        ws.cleanup()
+
+    baseline_data = load_baseline(args.baseline)
+    baseline = baseline_data.get("scales", {}).get(args.scale, {})
+    regressions = compare(results, baseline, args.time_threshold, args.memory_threshold)
+    print_report(results, baseline, regressions)
+
+    if args.save_baseline:
+        scales = baseline_data.get("scales", {})
+        merged = dict(scales.get(args.scale, {}))
+        merged.update({name: result for name, result in results.items() if result})
+        scales[args.scale] = merged
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        write_json(args.baseline, {
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "scales": scales
+        })
+        print(f"💾 基线已保存到: {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"❌ {len(regressions)} 个函数相对基线出现回归")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+双色球 AI 预测统一命令行入口
+
+子命令：
+    fetch      从 500 彩票网获取最新开奖数据并同步到 data/lottery_history.json
+    archive    将已开奖的 ai_predictions.json 归档到 predictions_history.json
+    predict    调用 AI 模型生成下期预测（参数同 generate_ai_prediction.py）
+    batch      批量回测历史期号（参数同 batch_predict.py）
+    rescore    按当前计分规则重新计算 predictions_history.json 中的命中结果
+    validate   验证预测文件格式
+    export     导出开奖数据/预测/历史预测为 CSV 或 JSON
+    optimize   基于当期模型预测选择投注组合（参数同 ticket_optimizer.py）
+    prize      奖级概率、期望奖金与历史预测奖级汇总（参数同 prize_engine.py）
+    serve      启动本地 API 服务器（静态页面 + /api 接口，参数同 api_server.py）
+    index      投注指纹索引：重复/近似重复投注查询（参数同 ticket_index.py）
+    baseline   随机投注蒙特卡洛基线，给出各模型的百分位和 p 值（参数同 random_baseline.py，需要 numpy）
+    stats      开奖统计状态：查看、校验、重建（参数同 draw_stats.py）
+    import     批量导入外部预测到历史记录（参数同 import_predictions.py）
+    prerender  把首屏内容预渲染到 index.html（参数同 prerender.py）
+    pipeline   单进程流水线：获取开奖 → 归档 → 预测 → 导出（参数同 pipeline.py）
+
+各子命令只在执行时才导入所需模块，openai、requests、bs4 等依赖只有联网子命令需要；
+离线子命令（archive、rescore、validate、export、optimize、prize、stats、import、prerender）无需 API Key 也无需安装网络库
+
+使用方法：
+    python3 cli.py validate
+    python3 cli.py export history --format csv -o history.csv
+    python3 cli.py predict --force
+"""
+
+import argparse
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def cmd_fetch(args):
+    """获取最新开奖数据"""
+    sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+    from fetch_lottery_history import LotteryDataFetcher
+
+    output_file = args.output or os.path.join(SCRIPT_DIR, "fetch_history", "lottery_data.json")
+    if not LotteryDataFetcher().fetch_and_save(output_file):
+        print("\n✗ 数据获取失败")
+        return 1
+    print("\n✓ 数据获取完成！")
+    return 0
+
+
+def cmd_archive(args):
+    """归档已开奖的预测"""
+    import generate_ai_prediction as gap
+
+    gap.archive_old_prediction(gap.load_lottery_history())
+    return 0
+
+
+def cmd_predict(args):
+    """生成下期预测"""
+    import generate_ai_prediction as gap
+
+    gap.main(args.args)
+    return 0
+
+
+def cmd_batch(args):
+    """批量回测"""
+    import batch_predict
+
+    batch_predict.main(args.args)
+    return 0
+
+
+def cmd_optimize(args):
+    """投注组合优化"""
+    import ticket_optimizer
+
+    ticket_optimizer.main(args.args)
+    return 0
+
+
+def cmd_prize(args):
+    """奖级与期望奖金"""
+    import prize_engine
+
+    prize_engine.main(args.args)
+    return 0
+
+
+def cmd_serve(args):
+    """本地 API 服务器"""
+    import api_server
+
+    api_server.main(args.args)
+    return 0
+
+
+def cmd_index(args):
+    """投注指纹索引"""
+    import ticket_index
+
+    return ticket_index.main(args.args)
+
+
+def cmd_baseline(args):
+    """随机投注基线"""
+    import random_baseline
+
+    return random_baseline.main(args.args)
+
+
+def cmd_stats(args):
+    """开奖统计状态"""
+    import draw_stats
+
+    return draw_stats.main(args.args)
+
+
+def cmd_import(args):
+    """批量导入外部预测"""
+    import import_predictions
+
+    return import_predictions.main(args.args)
+
+
+def cmd_prerender(args):
+    """首屏预渲染"""
+    import prerender
+
+    return prerender.main(args.args)
+
+
+def cmd_pipeline(args):
+    """单进程流水线"""
+    import pipeline
+
+    return pipeline.main(args.args)
+
+
+def cmd_rescore(args):
+    """重新计算历史预测的命中结果"""
+    import json
+    import generate_ai_prediction as gap
+    import prize_engine
+
+    history_file = args.file or gap.PREDICTIONS_HISTORY_FILE
+    with open(history_file, 'r', encoding='utf-8') as f:
+        history_data = json.load(f)
+
+    changed = 0
+    records = history_data.get("predictions_history", [])
+    for record in records:
+        rescored = prize_engine.score_models(record.get("models", []), record["actual_result"])
+        if rescored != record.get("models"):
+            record["models"] = rescored
+            changed += 1
+
+    print(f"📊 共 {len(records)} 期，更新 {changed} 期")
+    if changed and not args.dry_run:
+        with open(history_file, 'w', encoding='utf-8') as f:
+            json.dump(history_data, f, ensure_ascii=False, indent=2)
+        print(f"  ✓ 已保存到: {history_file}")
+    return 0
+
+
+def cmd_validate(args):
+    """验证预测文件"""
+    import json
+    import generate_ai_prediction as gap
+    import prediction_validator
+
+    path = args.file or gap.AI_PREDICTIONS_FILE
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    models = data.get("models", [data]) if isinstance(data, dict) else data
+    expected = {"target_period": data["target_period"]} if isinstance(data, dict) and "models" in data else None
+    invalid = 0
+    for model_data in models:
+        issues = prediction_validator.validate(model_data, expected)
+        name = model_data.get("model_name", "未知") if isinstance(model_data, dict) else "未知"
+        if issues:
+            invalid += 1
+            print(f"  ✗ {name}: {len(issues)} 个问题")
+            for issue in issues:
+                print(f"    ⚠️  {issue}")
+        else:
+            print(f"  ✓ {name}")
+
+    print(f"\n{'✅' if not invalid else '❌'} {len(models) - invalid}/{len(models)} 个模型验证通过")
+    return 1 if invalid else 0
+
+
+def _export_rows(kind):
+    """生成导出的表头和数据行"""
+    import json
+    import generate_ai_prediction as gap
+
+    if kind == "draws":
+        data = gap.load_lottery_history().get("data", [])
+        header = ["period", "date"] + [f"red_{i}" for i in range(1, 7)] + ["blue"]
+        rows = [[d["period"], d["date"], *d["red_balls"], d["blue_ball"]] for d in data]
+        return header, rows, data
+
+    if kind == "predictions":
+        with open(gap.AI_PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        header = ["target_period", "model_id", "model_name", "group_id", "strategy", "red_balls", "blue_ball"]
+        rows = [[data["target_period"], m.get("model_id"), m.get("model_name"), g.get("group_id"),
+                 g.get("strategy"), " ".join(g.get("red_balls", [])), g.get("blue_ball")]
+                for m in data.get("models", []) for g in m.get("predictions", [])]
+        return header, rows, data
+
+    with open(gap.PREDICTIONS_HISTORY_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    header = ["target_period", "model_id", "model_name", "group_id", "strategy", "red_balls", "blue_ball",
+              "red_hit_count", "blue_hit", "total_hits", "prize_level", "prize_name"]
+    rows = []
+    for record in data.get("predictions_history", []):
+        for m in record.get("models", []):
+            for g in m.get("predictions", []):
+                hit = g.get("hit_result", {})
+                rows.append([record["target_period"], m.get("model_id"), m.get("model_name"), g.get("group_id"),
+                             g.get("strategy"), " ".join(g.get("red_balls", [])), g.get("blue_ball"),
+                             hit.get("red_hit_count"), hit.get("blue_hit"), hit.get("total_hits"),
+                             hit.get("prize_level"), hit.get("prize_name")])
+    return header, rows, data
+
+
+def cmd_export(args):
+    """导出数据"""
+    import csv
+    import json
+
+    header, rows, data = _export_rows(args.kind)
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            json.dump(data, out, ensure_ascii=False, indent=2)
+            out.write("\n")
+        else:
+            writer = csv.writer(out)
+            writer.writerow(header)
+            writer.writerows(rows)
+    finally:
+        if args.output:
+            out.close()
+            print(f"💾 已导出 {len(rows)} 行到: {args.output}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="双色球 AI 预测统一命令行工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("fetch", help="获取最新开奖数据")
+    p.add_argument("output", nargs="?", help="原始数据文件（默认 fetch_history/lottery_data.json）")
+    p.set_defaults(func=cmd_fetch)
+
+    p = subparsers.add_parser("archive", help="归档已开奖的预测")
+    p.set_defaults(func=cmd_archive)
+
+    # predict/batch 的参数原样转发给对应脚本的 main
+    p = subparsers.add_parser("predict", help="生成下期预测", add_help=False)
+    p.set_defaults(func=cmd_predict, passthrough=True)
+
+    p = subparsers.add_parser("batch", help="批量回测历史期号", add_help=False)
+    p.set_defaults(func=cmd_batch, passthrough=True)
+
+    p = subparsers.add_parser("optimize", help="选择投注组合", add_help=False)
+    p.set_defaults(func=cmd_optimize, passthrough=True)
+
+    p = subparsers.add_parser("prize", help="奖级概率与期望奖金", add_help=False)
+    p.set_defaults(func=cmd_prize, passthrough=True)
+
+    p = subparsers.add_parser("serve", help="启动本地 API 服务器", add_help=False)
+    p.set_defaults(func=cmd_serve, passthrough=True)
+
+    p = subparsers.add_parser("index", help="投注指纹索引与重复投注查询", add_help=False)
+    p.set_defaults(func=cmd_index, passthrough=True)
+
+    p = subparsers.add_parser("baseline", help="随机投注基线与显著性检验", add_help=False)
+    p.set_defaults(func=cmd_baseline, passthrough=True)
+
+    p = subparsers.add_parser("stats", help="开奖统计状态（频率、遗漏、分布）", add_help=False)
+    p.set_defaults(func=cmd_stats, passthrough=True)
+
+    p = subparsers.add_parser("import", help="批量导入外部预测到历史记录", add_help=False)
+    p.set_defaults(func=cmd_import, passthrough=True)
+
+    p = subparsers.add_parser("prerender", help="把首屏内容预渲染到 index.html", add_help=False)
+    p.set_defaults(func=cmd_prerender, passthrough=True)
+
+    p = subparsers.add_parser("pipeline", help="获取开奖 → 归档 → 预测 → 导出", add_help=False)
+    p.set_defaults(func=cmd_pipeline, passthrough=True)
+
+    p = subparsers.add_parser("rescore", help="重新计算历史预测的命中结果")
+    p.add_argument("--file", help="历史预测文件（默认 data/predictions_history.json）")
+    p.add_argument("--dry-run", action="store_true", help="只统计不保存")
+    p.set_defaults(func=cmd_rescore)
+
+    p = subparsers.add_parser("validate", help="验证预测文件格式")
+    p.add_argument("file", nargs="?", help="预测文件（默认 data/ai_predictions.json）")
+    p.set_defaults(func=cmd_validate)
+
+    p = subparsers.add_parser("export", help="导出数据")
+    p.add_argument("kind", choices=["draws", "predictions", "history"], help="导出内容")
+    p.add_argument("--format", choices=["csv", "json"], default="csv")
+    p.add_argument("-o", "--output", help="输出文件（默认输出到终端）")
+    p.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if getattr(args, "passthrough", False):
+        args.args = extra
+    elif extra:
+        parser.error(f"无法识别的参数: {' '.join(extra)}")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
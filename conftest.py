@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+测试共用的夹具：用假的 OpenAI 客户端代替真实模型调用
+
+- make_client: FakeClient 类，测试直接把客户端传给 gap.call_ai_model 时使用
+- fake_ai: 通过 monkeypatch 把 gap 的模型客户端换成同一个 FakeClient，限流调度器不限速，
+  测试结束后自动恢复
+"""
+
+import json
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import generate_ai_prediction as gap
+import rate_limiter
+
+sys.path.insert(0, os.path.join(gap.SCRIPT_DIR, "benchmarks"))
+from mock_ai_server import parse_task
+
+with open(os.path.join(gap.SCRIPT_DIR, "data", "ai_predictions.json"), "r", encoding="utf-8") as f:
+    TEMPLATE = json.load(f)["models"][0]
+
+
+def task_reply(prompt):
+    """按 Prompt 中「本次任务」的字段改写模板预测，得到能通过验证的回复"""
+    return json.dumps({**TEMPLATE, **parse_task(prompt)}, ensure_ascii=False)
+
+
+class FakeClient:
+    """
+    记录每次请求并由 reply(prompt) 生成回复内容的 OpenAI 客户端替身
+
+    Args:
+        reply: Prompt -> 回复内容，默认 task_reply；抛出的异常原样传给调用方
+        max_choices: 每次最多返回的候选数，模拟忽略 n 参数的网关
+    """
+
+    def __init__(self, reply=task_reply, max_choices=None):
+        self.reply = reply
+        self.max_choices = max_choices
+        self.requests = []
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=self))
+
+    @property
+    def prompts(self):
+        return [request["messages"][-1]["content"] for request in self.requests]
+
+    @property
+    def tasks(self):
+        """每次请求的任务字段（target_period、model_id 等）"""
+        return [parse_task(prompt) for prompt in self.prompts]
+
+    def create(self, **kwargs):
+        with self.lock:
+            self.requests.append(kwargs)
+        n = kwargs.get("n", 1)
+        n = min(n, self.max_choices or n)
+        prompt = kwargs["messages"][-1]["content"]
+        choices = [SimpleNamespace(message=SimpleNamespace(content=self.reply(prompt))) for _ in range(n)]
+        response = SimpleNamespace(choices=choices, usage=None)
+        return SimpleNamespace(parse=lambda: response, headers={})
+
+
+@pytest.fixture
+def make_client():
+    """FakeClient 类（不替换 gap 中的客户端）"""
+    return FakeClient
+
+
+@pytest.fixture
+def fake_ai(monkeypatch):
+    """gap 创建的所有模型客户端都替换为返回的 FakeClient，调度器不限速"""
+    client = FakeClient()
+    providers, _ = gap.get_roster()
+    monkeypatch.setattr(gap, "get_openai_clients", lambda models: {m["provider"]: client for m in models})
+    monkeypatch.setattr(gap, "create_scheduler", lambda: rate_limiter.RateLimitScheduler(
+        {name: {**config, "requests_per_minute": rate_limiter.UNLIMITED_RPM} for name, config in providers.items()}))
+    return client
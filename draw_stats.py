@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+开奖统计增量状态
+持久化保存号码频率、遗漏和分布统计，每开出一期只做 O(33+16) 的增量更新，
+由 fetch_history/fetch_lottery_history.py 在合并开奖数据后调用
+
+读取方：
+- 前端分析页（js/app.js getAllTimeStats）：频率图表和统计卡片使用 all_time 与 histograms.sum，
+  状态文件与开奖数据不同步时改为现场统计
+- 本脚本的 show / verify 命令：其余统计（windows、omission、奇偶比和三区比）目前只在这里查看
+
+状态内容：
+- windows: 最近 5/10/20/30 期红球、蓝球出现次数（滑动窗口）
+- all_time: 全部期数的出现次数
+- omission: 每个号码的当前遗漏期数（距上次出现的期数，从未出现为总期数）
+- histograms: 红球和值、奇偶比（奇:偶）、三区比（01-11:12-22:23-33）的分布
+- recent: 最近 30 期开奖（窗口滑出时用于扣减）
+
+实现：
+- 新开奖按期号升序逐期应用：窗口加新一期、减滑出的一期，遗漏全部加一后命中号码归零
+- 合并后的数据只在最前面新增了更晚的期号时增量更新；补录旧期号、修改已有开奖或状态缺失时全量重建
+- verify 从开奖数据全量重建并与状态文件比较
+
+使用方法：
+    python3 draw_stats.py show              # 显示当前统计
+    python3 draw_stats.py verify            # 校验状态文件，不一致时以非零状态退出
+    python3 draw_stats.py rebuild           # 从 data/lottery_history.json 全量重建
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, Any, List, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+LOTTERY_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "lottery_history.json")
+STATS_FILE = os.path.join(SCRIPT_DIR, "data", "draw_stats.json")
+
+STATS_VERSION = 1
+RED_TOTAL = 33
+BLUE_TOTAL = 16
+WINDOWS = (5, 10, 20, 30)
+ZONE_SIZE = 11
+
+
+def _balls(draw: Dict[str, Any]) -> Tuple[List[int], int]:
+    return [int(ball) for ball in draw["red_balls"]], int(draw["blue_ball"])
+
+
+def _compact(draw: Dict[str, Any]) -> Dict[str, Any]:
+    """recent 中保存的精简开奖记录"""
+    return {"period": draw["period"], "red_balls": list(draw["red_balls"]), "blue_ball": draw["blue_ball"]}
+
+
+def shape_keys(red: List[int]) -> Tuple[str, str, str]:
+    """一期红球的 (和值, 奇偶比, 三区比) 直方图键"""
+    odd = sum(ball % 2 for ball in red)
+    zones = [0, 0, 0]
+    for ball in red:
+        zones[(ball - 1) // ZONE_SIZE] += 1
+    return str(sum(red)), f"{odd}:{len(red) - odd}", ":".join(map(str, zones))
+
+
+def empty_state() -> Dict[str, Any]:
+    return {
+        "version": STATS_VERSION,
+        "latest_period": None,
+        "total_draws": 0,
+        "windows": {str(w): {"red": [0] * RED_TOTAL, "blue": [0] * BLUE_TOTAL} for w in WINDOWS},
+        "all_time": {"red": [0] * RED_TOTAL, "blue": [0] * BLUE_TOTAL},
+        "omission": {"red": [0] * RED_TOTAL, "blue": [0] * BLUE_TOTAL},
+        "histograms": {"sum": {}, "odd_even": {}, "zone": {}},
+        "recent": []
+    }
+
+
+def apply_draw(state: Dict[str, Any], draw: Dict[str, Any]):
+    """将一期新开奖（期号必须晚于 latest_period）应用到状态，O(33+16)"""
+    red, blue = _balls(draw)
+    recent = state["recent"]
+
+    for window in WINDOWS:
+        counts = state["windows"][str(window)]
+        for ball in red:
+            counts["red"][ball - 1] += 1
+        counts["blue"][blue - 1] += 1
+        # 第 window+1 新的一期滑出窗口（recent 按期号升序，末尾为最新一期）
+        if len(recent) >= window:
+            old_red, old_blue = _balls(recent[-window])
+            for ball in old_red:
+                counts["red"][ball - 1] -= 1
+            counts["blue"][old_blue - 1] -= 1
+
+    for ball in red:
+        state["all_time"]["red"][ball - 1] += 1
+    state["all_time"]["blue"][blue - 1] += 1
+
+    omission = state["omission"]
+    omission["red"] = [0 if i + 1 in red else value + 1 for i, value in enumerate(omission["red"])]
+    omission["blue"] = [0 if i + 1 == blue else value + 1 for i, value in enumerate(omission["blue"])]
+
+    for name, key in zip(("sum", "odd_even", "zone"), shape_keys(red)):
+        histogram = state["histograms"][name]
+        histogram[key] = histogram.get(key, 0) + 1
+
+    recent.append(_compact(draw))
+    del recent[:-max(WINDOWS)]
+    state["latest_period"] = draw["period"]
+    state["total_draws"] += 1
+
+
+def build_stats(draws: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """从全部开奖数据（任意顺序）全量构建状态"""
+    state = empty_state()
+    for draw in sorted(draws, key=lambda d: d["period"]):
+        apply_draw(state, draw)
+    return state
+
+
+def update_stats(state: Optional[Dict[str, Any]], draws: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], str, int]:
+    """
+    根据合并后的全部开奖数据更新状态
+
+    Args:
+        state: 现有状态，None 表示没有状态文件
+        draws: 合并后的开奖数据（按期号降序）
+
+    Returns:
+        (新状态, "incremental" / "rebuild" / "unchanged", 应用的期数)
+    """
+    if not state or state.get("version") != STATS_VERSION or not state.get("latest_period"):
+        return build_stats(draws), "rebuild", len(draws)
+
+    # 降序数据中排在最新已统计期号之前的就是新开奖
+    new_draws = []
+    for draw in draws:
+        if draw["period"] <= state["latest_period"]:
+            break
+        new_draws.append(draw)
+
+    # 期数对不上（补录了旧期号或删除了数据）或最新一期被修改时无法增量更新
+    known = draws[len(new_draws)] if len(new_draws) < len(draws) else None
+    if (state["total_draws"] + len(new_draws) != len(draws) or known is None
+            or _compact(known) != state["recent"][-1]):
+        return build_stats(draws), "rebuild", len(draws)
+
+    if not new_draws:
+        return state, "unchanged", 0
+    for draw in reversed(new_draws):
+        apply_draw(state, draw)
+    return state, "incremental", len(new_draws)
+
+
+def load_stats(path: str = STATS_FILE) -> Optional[Dict[str, Any]]:
+    """加载状态文件，不存在或无法解析时返回 None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_stats(state: Dict[str, Any], path: str = STATS_FILE):
+    """原子写入状态文件（每个计数数组一行，文件保持很小）"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    text = json.dumps(state, ensure_ascii=False, indent=2)
+    # 把多行展开的数字数组压缩到一行
+    lines, buffer = [], None
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if buffer is not None:
+            buffer += " " + stripped if buffer.endswith(",") else stripped
+            if stripped.startswith("]"):
+                lines.append(buffer)
+                buffer = None
+        elif stripped.endswith("[") and not stripped.startswith('"recent"'):
+            buffer = line
+        else:
+            lines.append(line)
+    tmp_file = path + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+    os.replace(tmp_file, path)
+
+
+def update_stats_file(draws: List[Dict[str, Any]], path: str = STATS_FILE) -> Tuple[str, int]:
+    """加载、更新并保存状态文件，返回 (更新方式, 应用的期数)"""
+    state, mode, applied = update_stats(load_stats(path), draws)
+    if mode != "unchanged":
+        save_stats(state, path)
+    return mode, applied
+
+
+def verify_stats(draws: List[Dict[str, Any]], path: str = STATS_FILE) -> List[str]:
+    """全量重建并与状态文件比较，返回不一致的字段"""
+    state = load_stats(path)
+    if state is None:
+        return ["状态文件不存在或无法解析"]
+    expected = build_stats(draws)
+    return [key for key in expected if state.get(key) != expected[key]]
+
+
+def hottest(counts: List[int], top: int = 5) -> List[Tuple[str, int]]:
+    """出现次数最多的号码 [(号码, 次数)]，次数相同时号码小的在前"""
+    ranked = sorted(range(len(counts)), key=lambda i: (-counts[i], i))[:top]
+    return [(f"{i + 1:02d}", counts[i]) for i in ranked]
+
+
+def print_stats(state: Dict[str, Any]):
+    """打印当前统计摘要"""
+    print(f"📊 开奖统计（截至 {state['latest_period']}，共 {state['total_draws']} 期）\n")
+    for window in WINDOWS:
+        counts = state["windows"][str(window)]
+        red = " ".join(f"{ball}×{n}" for ball, n in hottest(counts["red"]))
+        blue = " ".join(f"{ball}×{n}" for ball, n in hottest(counts["blue"], 3))
+        print(f"  近 {window:>2} 期  热号: {red}  |  蓝球: {blue}")
+
+    red_omission = hottest(state["omission"]["red"])
+    blue_omission = hottest(state["omission"]["blue"], 3)
+    print(f"\n  红球遗漏最长: {' '.join(f'{ball}({n}期)' for ball, n in red_omission)}")
+    print(f"  蓝球遗漏最长: {' '.join(f'{ball}({n}期)' for ball, n in blue_omission)}")
+
+    histograms = state["histograms"]
+    sums = histograms["sum"]
+    total = sum(sums.values()) or 1
+    average = sum(int(key) * n for key, n in sums.items()) / total
+    print(f"\n  平均和值: {average:.1f}")
+    for name, title in (("odd_even", "奇偶比"), ("zone", "三区比")):
+        top = sorted(histograms[name].items(), key=lambda item: -item[1])[:3]
+        print(f"  {title}: " + "  ".join(f"{key} {n / total:.0%}" for key, n in top))
+    print()
+
+
+def load_draws(path: str) -> List[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("data", [])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="开奖统计增量状态")
+    parser.add_argument("command", choices=["show", "verify", "rebuild"], nargs="?", default="show")
+    parser.add_argument("--lottery", default=LOTTERY_HISTORY_FILE, help="开奖数据文件")
+    parser.add_argument("--stats", default=STATS_FILE, help="状态文件")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        state = build_stats(load_draws(args.lottery))
+        save_stats(state, args.stats)
+        print(f"✅ 已重建统计状态: {state['total_draws']} 期，截至 {state['latest_period']}")
+        return 0
+
+    if args.command == "verify":
+        mismatched = verify_stats(load_draws(args.lottery), args.stats)
+        if mismatched:
+            print(f"❌ 统计状态与开奖数据不一致: {', '.join(mismatched)}")
+            print("   运行 python3 draw_stats.py rebuild 重建")
+            return 1
+        print("✅ 统计状态与开奖数据一致")
+        return 0
+
+    state = load_stats(args.stats)
+    if state is None:
+        print("❌ 统计状态不存在，请先运行 python3 draw_stats.py rebuild")
+        return 1
+    print_stats(state)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
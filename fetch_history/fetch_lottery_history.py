@@ -16,8 +16,6 @@
     lottery_data.json - 包含所有开奖数据的 JSON 文件
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
 import time
 import sys
@@ -35,8 +33,17 @@ class LotteryDataFetcher:
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self._session = None
+
+    @property
+    def session(self):
+        """HTTP 会话（首次联网时才导入 requests，离线功能无需安装网络库）"""
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+            self._session.headers.update(self.headers)
+        return self._session
     
     def fetch_page(self, url, retry=3):
         """
@@ -49,6 +56,9 @@ class LotteryDataFetcher:
         Returns:
             BeautifulSoup 对象或 None
         """
+        import requests
+        from bs4 import BeautifulSoup
+
         for attempt in range(retry):
             try:
                 print(f"正在获取数据... (尝试 {attempt + 1}/{retry})")
@@ -158,6 +168,22 @@ class LotteryDataFetcher:
             except Exception as e:
                 print(f"加载现有数据时出错: {e}")
 
+        merged_data, new_count = self.merge_data(existing_data, new_data)
+        print(f"合并完成: 新增 {new_count} 期, 总计 {len(merged_data)} 期")
+
+        return merged_data
+
+    def merge_data(self, existing_data, new_data):
+        """
+        在内存中合并新旧数据（新数据覆盖同期号的旧数据），不读写文件
+
+        Args:
+            existing_data: 现有数据列表
+            new_data: 新获取的数据列表
+
+        Returns:
+            (按期号降序排列的合并数据, 新增期数)
+        """
         # 使用期号作为键来去重
         data_dict = {}
 
@@ -176,9 +202,7 @@ class LotteryDataFetcher:
         merged_data = list(data_dict.values())
         merged_data.sort(key=lambda x: x['period'], reverse=True)
 
-        print(f"合并完成: 新增 {new_count} 期, 总计 {len(merged_data)} 期")
-
-        return merged_data
+        return merged_data, new_count
 
     def backup_existing_file(self, filename):
         """
@@ -295,22 +319,8 @@ class LotteryDataFetcher:
                 # 合并数据
                 merged_data = self.merge_with_existing_data(data, filename)
 
-                # 保存合并后的数据
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(merged_data, f, ensure_ascii=False, indent=2)
-                print(f"\n数据已成功保存到 {filename}")
-                print(f"共保存 {len(merged_data)} 期数据")
-
-                # 同时更新到 ../data/lottery_history.json
-                try:
-                    web_data_path = os.path.join(os.path.dirname(filename), '..', 'data', 'lottery_history.json')
-                    formatted_data = self.format_for_web(merged_data)
-
-                    with open(web_data_path, 'w', encoding='utf-8') as f:
-                        json.dump(formatted_data, f, ensure_ascii=False, indent=2)
-                    print(f"✓ 已同步到网页数据文件: {web_data_path}")
-                except Exception as e:
-                    print(f"⚠️  同步到网页数据失败: {e}")
+                # 保存合并后的数据并同步网页数据和统计状态
+                self.write_merged(merged_data, filename)
 
             else:
                 # 直接保存新数据
@@ -321,6 +331,59 @@ class LotteryDataFetcher:
         except Exception as e:
             print(f"保存文件时出错: {e}")
     
+    def write_merged(self, merged_data, filename="lottery_data.json"):
+        """
+        写入合并后的数据，同步到 ../data/lottery_history.json 并增量更新统计状态
+
+        Args:
+            merged_data: 合并后的全部数据（按期号降序）
+            filename: 爬虫数据文件名
+
+        Returns:
+            网页数据（含 next_draw）；同步失败时返回 None
+        """
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(merged_data, f, ensure_ascii=False, indent=2)
+        print(f"\n数据已成功保存到 {filename}")
+        print(f"共保存 {len(merged_data)} 期数据")
+
+        # 同时更新到 ../data/lottery_history.json
+        try:
+            web_data_path = os.path.join(os.path.dirname(filename), '..', 'data', 'lottery_history.json')
+            formatted_data = self.format_for_web(merged_data)
+
+            with open(web_data_path, 'w', encoding='utf-8') as f:
+                json.dump(formatted_data, f, ensure_ascii=False, indent=2)
+            print(f"✓ 已同步到网页数据文件: {web_data_path}")
+        except Exception as e:
+            print(f"⚠️  同步到网页数据失败: {e}")
+            return None
+
+        self.update_draw_stats(merged_data, os.path.join(os.path.dirname(web_data_path), 'draw_stats.json'))
+        return formatted_data
+
+    def update_draw_stats(self, merged_data, stats_file):
+        """
+        增量更新开奖统计状态（只应用新开出的期号，每期 O(33+16)）
+
+        Args:
+            merged_data: 合并后的全部数据（按期号降序）
+            stats_file: 统计状态文件路径
+        """
+        try:
+            project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            if project_dir not in sys.path:
+                sys.path.insert(0, project_dir)
+            import draw_stats
+
+            mode, applied = draw_stats.update_stats_file(merged_data, stats_file)
+            if mode == "incremental":
+                print(f"✓ 统计状态增量更新 {applied} 期")
+            elif mode == "rebuild":
+                print(f"✓ 统计状态已全量重建（{applied} 期）")
+        except Exception as e:
+            print(f"⚠️  更新统计状态失败: {e}")
+
     def fetch_and_save(self, output_file="lottery_data.json", preserve_history=True):
         """
         获取并保存数据的主函数
@@ -4,35 +4,65 @@
 自动调用 AI 模型生成下期预测数据
 """
 
+import argparse
 import json
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from openai import OpenAI
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Optional, TYPE_CHECKING
+
+import history_stream
+import model_roster
+import prediction_validator
+import prize_engine
+import rate_limiter
+import ticket_index
+from telemetry import PipelineTelemetry
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 # ==================== 配置区 ====================
-# API 配置（通过环境变量设置）
-BASE_URL = os.environ.get("AI_BASE_URL") or "https://aihubmix.com/v1"
-API_KEY = os.environ.get("AI_API_KEY")
-if not API_KEY:
-    print("❌ 请设置环境变量 AI_API_KEY")
-    sys.exit(1)
-
-# 模型配置列表
-MODELS = [
-    {"id": "gpt-4o", "name": "GPT-5", "model_id": "SSB-Team-001"},
-    {"id": "claude-3-5-sonnet-20241022", "name": "Claude 4.5", "model_id": "team_alpha_arena_v1"},
-    {"id": "gemini-2.5-flash", "name": "Gemini 2.5", "model_id": "Gemini2.5"},
-    {"id": "deepseek-chat", "name": "DeepSeek R1", "model_id": "DeepseekR1"}
-]
+# API 配置（服务商的地址和密钥环境变量见 models.json，首次调用模型时才解析，离线功能无需配置）
+# 模块变量非空时覆盖所有服务商（基准测试用来指向模拟服务器）
+BASE_URL = None
+API_KEY = None
+
+# API 调用失败时的重试次数与退避间隔（秒）
+MAX_RETRIES = int(os.environ.get("AI_MAX_RETRIES") or 2)
+RETRY_DELAY = 2
+
+# 验证失败时最多打印的问题数
+MAX_PRINTED_ISSUES = 10
+
+# 每个模型默认的候选数（命令行 --samples 和 models.json 中模型的 samples 字段优先）
+DEFAULT_SAMPLES = int(os.environ.get("AI_SAMPLES") or 1)
+# 候选优先级：通过验证 > 可自动修复 > 无法修复 > JSON 无法解析
+CANDIDATE_RANK = {"valid": 0, "repairable": 1, "invalid": 2, "unparsable": 3}
+
+# 服务商与模型配置（models.json，环境变量 AI_MODELS_CONFIG 可指定其他文件），首次需要时才由 get_roster 加载
+_ROSTER = None
 
 # 文件路径
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 LOTTERY_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "lottery_history.json")
 AI_PREDICTIONS_FILE = os.path.join(SCRIPT_DIR, "data", "ai_predictions.json")
 PREDICTIONS_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "predictions_history.json")
+TICKET_INDEX_FILE = os.path.join(SCRIPT_DIR, "data", "ticket_index.json")
 PROMPT_FILE = os.path.join(SCRIPT_DIR, "doc", "prompt2.0.md")
+METRICS_FILE = os.path.join(SCRIPT_DIR, "logs", "prediction_metrics.jsonl")
+PROFILE_DIR = os.path.join(SCRIPT_DIR, "logs")
+CHECKPOINT_DIR = os.path.join(SCRIPT_DIR, "data", "checkpoints")
+CANDIDATES_FILE = os.path.join(SCRIPT_DIR, "logs", "prediction_candidates.jsonl")
+
+# Prompt 模板中静态前缀与动态后缀的分隔标记
+# 前缀（策略规则 + 历史数据）在同一次运行的所有模型间保持字节一致，以命中服务端前缀缓存；
+# 后缀只包含期号、日期、模型等每次变化的变量
+PROMPT_SUFFIX_MARKER = "<!-- PROMPT_SUFFIX -->"
+
+SYSTEM_PROMPT = "你是一个专业的彩票数据分析师，擅长基于历史数据进行模式分析和预测。请严格按照要求返回 JSON 格式数据，不要有任何额外的解释或说明。"
 
 # ==================== 工具函数 ====================
 
@@ -45,6 +75,26 @@ def load_prompt_template() -> str:
         print(f"❌ 加载 Prompt 文件失败: {str(e)}")
         raise
 
+def split_prompt_template(prompt_template: str) -> Tuple[str, str]:
+    """
+    将 Prompt 模板拆分为静态前缀模板和动态后缀模板
+
+    Returns:
+        (前缀模板, 后缀模板)，前缀只包含 {lottery_history} 占位符
+    """
+    prefix, marker, suffix = prompt_template.partition(PROMPT_SUFFIX_MARKER)
+    if not marker:
+        raise ValueError(f"Prompt 模板缺少分隔标记 {PROMPT_SUFFIX_MARKER}")
+    return prefix, suffix.lstrip("\n")
+
+def build_prompt_prefix(prefix_template: str, history_json: str) -> str:
+    """构建静态前缀（每次运行只构建一次，所有模型共用）"""
+    return prefix_template.format(lottery_history=history_json)
+
+def build_prompt(prompt_prefix: str, suffix_template: str, **variables) -> str:
+    """在静态前缀后拼接每个模型/每期的动态后缀"""
+    return prompt_prefix + suffix_template.format(**variables)
+
 def load_lottery_history() -> Dict[str, Any]:
     """加载历史开奖数据"""
     try:
@@ -80,9 +130,61 @@ def get_next_draw_date() -> str:
     # 理论上不会到这里
     return today.strftime("%Y-%m-%d")
 
-def get_openai_client() -> OpenAI:
-    """获取 OpenAI 客户端"""
-    return OpenAI(api_key=API_KEY, base_url=BASE_URL)
+def get_roster() -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    加载并缓存服务商与模型配置（离线功能不调用，缺少配置文件也能运行）
+
+    Returns:
+        (服务商名称 -> 服务商配置, 模型列表)
+    """
+    global _ROSTER
+    if _ROSTER is None:
+        _ROSTER = model_roster.load_roster()
+    return _ROSTER
+
+def get_api_config(provider: Optional[str] = None) -> Tuple[str, str]:
+    """
+    解析服务商的 API 配置，模块变量优先于环境变量
+
+    Args:
+        provider: 服务商名称，默认为配置中的第一个服务商
+
+    Returns:
+        (base_url, api_key)
+    """
+    providers, _ = get_roster()
+    config = providers[provider or next(iter(providers))]
+    base_url, api_key = model_roster.resolve_endpoint(config)
+    base_url = BASE_URL or base_url
+    api_key = API_KEY or api_key
+    if not api_key:
+        print(f"❌ 请设置环境变量 {config['api_key_env']}")
+        sys.exit(1)
+    return base_url, api_key
+
+def get_openai_client(provider: Optional[str] = None) -> "OpenAI":
+    """获取服务商的 OpenAI 客户端（关闭 SDK 内置重试，由 call_ai_model 统一重试并计数）"""
+    from openai import OpenAI
+
+    base_url, api_key = get_api_config(provider)
+    return OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+
+def get_openai_clients(models: List[Dict[str, str]]) -> Dict[str, "OpenAI"]:
+    """为模型涉及的每个服务商创建一个客户端"""
+    return {provider: get_openai_client(provider) for provider in dict.fromkeys(m['provider'] for m in models)}
+
+def create_scheduler() -> rate_limiter.RateLimitScheduler:
+    """按 models.json 中的并发和速率配置创建限流调度器"""
+    return rate_limiter.RateLimitScheduler(get_roster()[0])
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """是否为 429 限流错误（openai.RateLimitError 或带 429 状态码的 API 错误）"""
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+def error_headers(error: Exception):
+    """API 错误附带的响应头"""
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None)
 
 def extract_json_from_response(response_text: str) -> str:
     """从 AI 响应中提取 JSON 内容"""
@@ -101,36 +203,223 @@ def extract_json_from_response(response_text: str) -> str:
 
     return text
 
-def call_ai_model(client: OpenAI, model_config: Dict[str, str], prompt: str) -> Dict[str, Any]:
-    """调用 AI 模型获取预测"""
-    try:
-        print(f"  ⏳ 正在调用 {model_config['name']} 模型...")
-
-        response = client.chat.completions.create(
-            model=model_config['id'],
-            messages=[
-                {
-                    "role": "system",
-                    "content": "你是一个专业的彩票数据分析师，擅长基于历史数据进行模式分析和预测。请严格按照要求返回 JSON 格式数据，不要有任何额外的解释或说明。"
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.8
-        )
+def extract_usage(response) -> Dict[str, int]:
+    """
+    从响应中提取 token 用量，包括前缀缓存命中的 token 数
 
-        response_text = response.choices[0].message.content.strip()
+    OpenAI 兼容接口在 usage.prompt_tokens_details.cached_tokens 中返回缓存命中数，
+    部分 Claude 兼容网关使用 usage.cache_read_input_tokens
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
 
-        # 提取 JSON
-        json_text = extract_json_from_response(response_text)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached_tokens is None:
+        cached_tokens = getattr(usage, "cache_read_input_tokens", None)
 
-        # 解析 JSON
-        prediction_data = json.loads(json_text)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", None) or 0,
+        "total_tokens": getattr(usage, "total_tokens", None) or 0,
+        "cached_tokens": cached_tokens or 0
+    }
+
+def request_completion(client: "OpenAI", model_config: Dict[str, str], prompt: str, n: int,
+                       limiter: rate_limiter.ProviderLimiter) -> Tuple[Any, Dict[str, float]]:
+    """
+    发送一次请求（失败时重试），n > 1 时在同一次请求中要求 n 个候选
+
+    Returns:
+        (响应, 调用统计 retries / throttle_ms / rate_limited)
+    """
+    stats = {"retries": 0, "throttle_ms": 0.0, "rate_limited": 0}
+    sampling = {"n": n} if n > 1 else {}
+    for attempt in range(MAX_RETRIES + 1):
+        stats["retries"] = attempt
+        try:
+            with limiter.slot() as waited:
+                stats["throttle_ms"] += waited * 1000
+                # with_raw_response 保留响应头，供限流器读取剩余额度
+                raw_response = client.chat.completions.with_raw_response.create(
+                    model=model_config['id'],
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": SYSTEM_PROMPT
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0.8,
+                    **sampling
+                )
+            response = raw_response.parse()
+            limiter.on_success(raw_response.headers)
+            return response, stats
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            if rate_limited:
+                # 暂停由限流器统一处理，同一服务商的其他请求也会等待
+                stats["rate_limited"] += 1
+                limiter.on_rate_limited(error_headers(e))
+            if attempt >= MAX_RETRIES:
+                raise
+            if rate_limited:
+                print(f"  ⚠️  {model_config['name']} 被限流 (429)，等待限流器放行后重试...")
+                continue
+            delay = RETRY_DELAY * (attempt + 1)
+            print(f"  ⚠️  {model_config['name']} 第 {attempt + 1} 次调用失败 ({type(e).__name__})，{delay} 秒后重试...")
+            time.sleep(delay)
+
+def evaluate_candidate(response_text: str, expected: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    解析并验证单个候选（不打印问题）
+
+    Returns:
+        {"status": valid / repairable / invalid / unparsable, "prediction", "fixes", "issues", "response"}
+    """
+    candidate = {"status": "unparsable", "prediction": None, "fixes": [], "issues": [], "response": response_text}
+    try:
+        candidate["prediction"] = json.loads(extract_json_from_response(response_text))
+    except json.JSONDecodeError as e:
+        candidate["issues"] = [f"JSON 解析失败: {e}"]
+        return candidate
+
+    issues = prediction_validator.validate(candidate["prediction"], expected)
+    if not issues:
+        candidate["status"] = "valid"
+        return candidate
+    _, fixes, remaining = prediction_validator.repair(candidate["prediction"], expected)
+    candidate["status"] = "invalid" if remaining else "repairable"
+    candidate["fixes"] = fixes
+    candidate["issues"] = [str(issue) for issue in (remaining or issues)]
+    return candidate
+
+def sample_candidates(client: "OpenAI", model_config: Dict[str, str], prompt: str, samples: int,
+                      limiter: rate_limiter.ProviderLimiter, expected: Optional[Dict[str, str]],
+                      metrics: PipelineTelemetry) -> Tuple[List[Dict[str, Any]], Dict[str, int], Dict[str, float]]:
+    """
+    获取 samples 个候选并逐个验证
 
+    服务商支持 n 参数时一次请求取回全部候选；不支持（supports_n 为 false）或网关忽略 n 时，
+    用并行请求补足。每个请求在自己的线程中收到响应后立即验证，与仍在进行的请求重叠，
+    总耗时约为一次往返。
+
+    Returns:
+        (候选列表, 合计 token 用量, 合计调用统计)
+    """
+    def sample(n):
+        response, stats = request_completion(client, model_config, prompt, n, limiter)
+        with metrics.stage("extract", model=model_config['name']) as event:
+            candidates = [evaluate_candidate((choice.message.content or "").strip(), expected)
+                          for choice in response.choices[:n]]
+            if all(c["status"] == "unparsable" for c in candidates):
+                event["status"] = "failed"
+                event["error"] = candidates[0]["issues"][0] if candidates else "响应中没有候选"
+        return candidates, extract_usage(response), stats
+
+    def sample_parallel(count):
+        """并行发送 count 个单候选请求，部分失败时只保留成功的"""
+        results, errors = [], []
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            for future in [executor.submit(sample, 1) for _ in range(count)]:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+        if errors:
+            print(f"  ⚠️  {model_config['name']} {len(errors)}/{count} 个候选请求失败 ({type(errors[0]).__name__})")
+            if not results:
+                raise errors[0]
+        return results
+
+    supports_n = get_roster()[0].get(model_config.get('provider'), {}).get('supports_n', True)
+    if samples == 1 or supports_n:
+        results = [sample(samples)]
+        missing = samples - len(results[0][0])
+        if missing > 0 and samples > 1:
+            print(f"  ℹ️  {model_config['name']} 只返回 {len(results[0][0])} 个候选，并行补足 {missing} 个")
+            try:
+                results += sample_parallel(missing)
+            except Exception:
+                # 已有候选可用，补足失败不影响本次调用
+                pass
+    else:
+        results = sample_parallel(samples)
+
+    candidates, usage, stats = [], {}, {}
+    for result_candidates, result_usage, result_stats in results:
+        candidates += result_candidates
+        for key, value in result_usage.items():
+            usage[key] = usage.get(key, 0) + value
+        for key, value in result_stats.items():
+            stats[key] = stats.get(key, 0) + value
+    return candidates, usage, stats
+
+def call_ai_model(client: "OpenAI", model_config: Dict[str, str], prompt: str,
+                  metrics: Optional[PipelineTelemetry] = None,
+                  limiter: Optional[rate_limiter.ProviderLimiter] = None,
+                  samples: int = 1, expected: Optional[Dict[str, str]] = None,
+                  candidates: Optional[List[Dict[str, Any]]] = None) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    调用 AI 模型获取预测
+
+    Args:
+        client: OpenAI 客户端
+        model_config: 模型配置
+        prompt: 完整 Prompt
+        metrics: 指标收集器，记录调用与 JSON 提取两个阶段
+        limiter: 模型所属服务商的限流器，为 None 时不限流
+        samples: 候选数，大于 1 时一次取回多个候选，选用最好的一个
+                 （通过验证 > 可自动修复 > 无法修复，同级取第一个）
+        expected: 本次任务的期号、模型等字段，用于验证候选
+        candidates: 传入列表时追加全部候选的评估结果（用于多样性分析）
+
+    Returns:
+        (预测数据, token 用量)
+    """
+    metrics = metrics or PipelineTelemetry()
+    limiter = limiter or rate_limiter.ProviderLimiter(model_config['name'], 1, rate_limiter.UNLIMITED_RPM)
+    samples = max(1, samples)
+    response_text = ""
+    try:
+        print(f"  ⏳ 正在调用 {model_config['name']} 模型{f'（{samples} 个候选）' if samples > 1 else ''}...")
+
+        with metrics.stage("model_call", model=model_config['name']) as event:
+            found, usage, stats = sample_candidates(client, model_config, prompt, samples, limiter, expected, metrics)
+            event["retries"] = stats.get("retries", 0)
+            if stats.get("throttle_ms"):
+                event["throttle_ms"] = round(stats["throttle_ms"], 2)
+            if stats.get("rate_limited"):
+                event["rate_limited"] = stats["rate_limited"]
+            if samples > 1:
+                event["samples"] = len(found)
+                event["usable_samples"] = sum(c["status"] in ("valid", "repairable") for c in found)
+            event.update(usage)
+
+        if not found:
+            raise ValueError(f"{model_config['name']} 响应中没有候选")
+        best_index = min(range(len(found)), key=lambda i: (CANDIDATE_RANK[found[i]["status"]], i))
+        best = found[best_index]
+        if candidates is not None:
+            candidates.extend({"index": i, "selected": i == best_index, **c} for i, c in enumerate(found))
+
+        response_text = best["response"]
+        if best["status"] == "unparsable":
+            # 所有候选都无法解析，重新解析第一个以抛出原始错误
+            json.loads(extract_json_from_response(response_text))
+
+        if samples > 1:
+            usable = event["usable_samples"]
+            print(f"  🎲 {model_config['name']} {usable}/{len(found)} 个候选可用，选用第 {best_index + 1} 个")
         print(f"  ✅ {model_config['name']} 预测成功")
-        return prediction_data
+        if usage:
+            print(f"  📦 Token: 输入 {usage['prompt_tokens']}（缓存命中 {usage['cached_tokens']}）/ 输出 {usage['completion_tokens']}")
+        return best["prediction"], usage
 
     except json.JSONDecodeError as e:
         print(f"  ❌ {model_config['name']} JSON 解析失败: {str(e)}")
@@ -144,47 +433,184 @@ def call_ai_model(client: OpenAI, model_config: Dict[str, str], prompt: str) ->
         print(f"  详细堆栈:\n{traceback.format_exc()}")
         raise
 
-def validate_prediction(prediction: Dict[str, Any]) -> bool:
-    """验证预测数据格式"""
-    try:
-        # 检查必需字段
-        required_fields = ["prediction_date", "target_period", "model_id", "model_name", "predictions"]
-        for field in required_fields:
-            if field not in prediction:
-                print(f"    ⚠️  缺少字段: {field}")
-                return False
-
-        # 检查预测组数量
-        if len(prediction["predictions"]) != 5:
-            print(f"    ⚠️  预测组数量不正确: {len(prediction['predictions'])}")
-            return False
-
-        # 检查每组预测
-        for group in prediction["predictions"]:
-            # 检查红球
-            if len(group["red_balls"]) != 6:
-                print(f"    ⚠️  红球数量不正确: {len(group['red_balls'])}")
-                return False
-
-            # 检查红球是否排序
-            sorted_reds = sorted(group["red_balls"])
-            if group["red_balls"] != sorted_reds:
-                print(f"    ⚠️  红球未排序: {group['red_balls']}")
-                return False
-
-            # 检查蓝球
-            if not group["blue_ball"]:
-                print(f"    ⚠️  蓝球为空")
-                return False
-
-        return True
+def validate_prediction(prediction: Dict[str, Any], expected: Optional[Dict[str, str]] = None) -> bool:
+    """
+    验证预测数据格式
 
-    except Exception as e:
-        print(f"    ⚠️  验证出错: {str(e)}")
-        return False
+    检查必需字段、预测组数量、group_id 连续性，以及每组号码的数量、范围（红球 01-33，蓝球 01-16）、
+    补零、重复和排序；传入 expected 时还会检查期号、模型等字段是否与本次任务一致
+    """
+    issues = prediction_validator.validate(prediction, expected)
+    for issue in issues[:MAX_PRINTED_ISSUES]:
+        print(f"    ⚠️  {issue}")
+    if len(issues) > MAX_PRINTED_ISSUES:
+        print(f"    ⚠️  ... 共 {len(issues)} 个问题")
+    return not issues
+
+def validate_and_repair_prediction(prediction: Dict[str, Any],
+                                   expected: Optional[Dict[str, str]] = None) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    验证预测数据，不通过时尝试确定性修复（排序、补零、去重补号等），无需重新调用模型
+
+    Returns:
+        (可用的预测数据，无法修复时为 None, 已应用的修复错误码)
+    """
+    if validate_prediction(prediction, expected):
+        return prediction, []
+
+    repaired, fixes, remaining = prediction_validator.repair(prediction, expected)
+    if remaining:
+        for issue in remaining[:MAX_PRINTED_ISSUES]:
+            print(f"    ✗ 无法修复: {issue}")
+        return None, fixes
+
+    print(f"    🔧 已自动修复: {', '.join(fixes)}")
+    return repaired, fixes
+
+def get_checkpoint_file(target_period: str) -> str:
+    """获取目标期号对应的检查点文件路径"""
+    return os.path.join(CHECKPOINT_DIR, f"prediction_{target_period}.json")
+
+def load_checkpoint(target_period: str) -> Dict[str, Any]:
+    """
+    加载目标期号的检查点
+
+    检查点不存在时，如果 ai_predictions.json 已经是同一期的预测，则以其中的模型作为已完成项，
+    这样在全新的检出目录中重新运行也只会补调缺失的模型
+    """
+    checkpoint_file = get_checkpoint_file(target_period)
+    if os.path.exists(checkpoint_file):
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    checkpoint = {"target_period": target_period, "prediction_date": None, "models": {}}
+    if os.path.exists(AI_PREDICTIONS_FILE):
+        try:
+            with open(AI_PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            if existing.get("target_period") == target_period:
+                checkpoint["prediction_date"] = existing.get("prediction_date")
+                for model_data in existing.get("models", []):
+                    checkpoint["models"][model_data.get("model_id")] = {
+                        "status": "ok",
+                        "prediction": model_data
+                    }
+        except Exception as e:
+            print(f"  ⚠️  读取现有预测失败，忽略: {str(e)}")
+    return checkpoint
+
+def save_checkpoint(checkpoint: Dict[str, Any]):
+    """原子写入检查点（先写临时文件再替换），中途崩溃不会留下损坏的文件"""
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    checkpoint_file = get_checkpoint_file(checkpoint["target_period"])
+    tmp_file = checkpoint_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, checkpoint_file)
+
+def record_checkpoint(checkpoint: Dict[str, Any], model_config: Dict[str, str],
+                      prediction: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+    """记录单个模型的结果并立即落盘"""
+    entry = {"status": "ok" if prediction is not None else "failed",
+             "updated_at": datetime.now().isoformat(timespec="seconds")}
+    if prediction is not None:
+        entry["prediction"] = prediction
+    else:
+        entry["error"] = error
+    checkpoint["models"][model_config['model_id']] = entry
+    save_checkpoint(checkpoint)
+
+def predict_model(client: "OpenAI", limiter: rate_limiter.ProviderLimiter, model_config: Dict[str, str],
+                  prompt_prefix: str, suffix_template: str, task: Dict[str, str],
+                  metrics: PipelineTelemetry, samples: int = 1) -> Dict[str, Any]:
+    """
+    为单个模型构建 Prompt、调用模型并验证（在线程池中执行，不修改共享状态）
+
+    Args:
+        task: target_period / target_date / prediction_date
+        samples: 候选数
+
+    Returns:
+        {"prediction": 可用的预测数据或 None, "usage": token 用量, "fixes": 修复错误码,
+         "invalid": 是否未通过验证, "candidates": 全部候选的评估结果}
+    """
+    # 构建 prompt（静态前缀 + 动态后缀）
+    with metrics.stage("prompt_build", model=model_config['name']):
+        prompt = build_prompt(
+            prompt_prefix,
+            suffix_template,
+            target_period=task["target_period"],
+            target_date=task["target_date"],
+            prediction_date=task["prediction_date"],
+            model_id=model_config['model_id'],
+            model_name=model_config['name']
+        )
+
+    expected = {
+        "prediction_date": task["prediction_date"],
+        "target_period": task["target_period"],
+        "model_id": model_config['model_id'],
+        "model_name": model_config['name']
+    }
+
+    # 调用模型（多个候选时选用最好的一个）
+    candidates = []
+    prediction, usage = call_ai_model(client, model_config, prompt, metrics, limiter,
+                                      samples, expected, candidates)
+
+    # 验证数据，可恢复的问题直接修复
+    with metrics.stage("validate", model=model_config['name']) as event:
+        checked, fixes = validate_and_repair_prediction(prediction, expected)
+        if checked is not prediction:
+            event["fixes"] = fixes
+        if checked is None:
+            event["status"] = "failed"
+            event["error"] = "预测数据验证未通过且无法修复"
+        elif fixes:
+            event["repaired"] = True
+
+    return {"prediction": checked, "usage": usage, "fixes": fixes, "invalid": checked is not prediction,
+            "candidates": candidates}
+
+def save_candidates(path: str, run_id: str, target_period: str, model_config: Dict[str, str],
+                    candidates: List[Dict[str, Any]]):
+    """将一个模型的全部候选追加写入 JSONL（每行一个候选），用于分析同一模型多次采样的差异"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for candidate in candidates:
+            line = {
+                "run_id": run_id,
+                "target_period": target_period,
+                "model_id": model_config['model_id'],
+                "model_name": model_config['name'],
+                "index": candidate["index"],
+                "selected": candidate["selected"],
+                "status": candidate["status"],
+                "fixes": candidate["fixes"],
+                "issues": candidate["issues"][:MAX_PRINTED_ISSUES]
+            }
+            if candidate["prediction"] is not None:
+                line["prediction"] = candidate["prediction"]
+            else:
+                line["response"] = candidate["response"][:500]
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+def generate_predictions(metrics: Optional[PipelineTelemetry] = None, force: bool = False,
+                         samples: Optional[int] = None, candidates_file: Optional[str] = None,
+                         lottery_data: Optional[Dict[str, Any]] = None, archive: bool = True) -> Dict[str, Any]:
+    """
+    生成所有模型的预测
+
+    Args:
+        metrics: 指标收集器
+        force: 忽略检查点，重新调用全部模型
+        samples: 每个模型的候选数，None 时使用模型配置的 samples 或 DEFAULT_SAMPLES
+        candidates_file: 非空时把全部候选追加写入该 JSONL 文件
+        lottery_data: 已在内存中的开奖数据，None 时从 lottery_history.json 加载
+        archive: 是否先归档已开奖的旧预测（流水线会在单独的阶段中归档）
+    """
+    metrics = metrics or PipelineTelemetry()
 
-def generate_predictions() -> Dict[str, Any]:
-    """生成所有模型的预测"""
     print("\n" + "="*50)
     print("🤖 双色球 AI 预测自动生成")
     print("="*50 + "\n")
@@ -192,18 +618,23 @@ def generate_predictions() -> Dict[str, Any]:
     # 加载 Prompt 模板
     print("📄 加载 Prompt 模板...")
     try:
-        prompt_template = load_prompt_template()
+        with metrics.stage("load", target="prompt"):
+            prompt_template = load_prompt_template()
         print(f"  ✓ Prompt 模板加载成功 ({len(prompt_template)} 字符)\n")
     except Exception as e:
         print(f"  ✗ Prompt 模板加载失败: {str(e)}\n")
         return None
 
     # 加载历史数据
-    print("📊 加载历史开奖数据...")
-    lottery_data = load_lottery_history()
+    if lottery_data is None:
+        print("📊 加载历史开奖数据...")
+        with metrics.stage("load", target="lottery_history"):
+            lottery_data = load_lottery_history()
 
     # 归档旧预测（如果已开奖）
-    archive_old_prediction(lottery_data)
+    if archive:
+        with metrics.stage("archive"):
+            archive_old_prediction(lottery_data)
 
     # 获取下期信息
     next_draw = lottery_data.get("next_draw", {})
@@ -222,45 +653,80 @@ def generate_predictions() -> Dict[str, Any]:
     history_data = lottery_data.get("data", [])[:30]
     history_json = json.dumps(history_data, ensure_ascii=False, indent=2)
 
-    # 预测日期：根据开奖规则计算下期开奖日期
-    prediction_date = get_next_draw_date()
+    # 静态前缀只构建一次，所有模型共用同一字节序列
+    with metrics.stage("prompt_build", target="prefix"):
+        prefix_template, suffix_template = split_prompt_template(prompt_template)
+        prompt_prefix = build_prompt_prefix(prefix_template, history_json)
+
+    # 加载检查点：只调用尚未成功的模型
+    _, models = get_roster()
+    if force:
+        checkpoint = {"target_period": target_period, "prediction_date": None, "models": {}}
+    else:
+        checkpoint = load_checkpoint(target_period)
+    pending_models = [m for m in models
+                      if checkpoint["models"].get(m['model_id'], {}).get("status") != "ok"]
+    completed = len(models) - len(pending_models)
+    if completed:
+        print(f"♻️  检查点: 已完成 {completed} 个模型，待调用 {len(pending_models)} 个")
+
+    # 预测日期：目标期号的开奖日期，缺失时按开奖规则计算（续跑时沿用检查点中的日期）
+    prediction_date = checkpoint.get("prediction_date") or next_draw.get("next_date") or get_next_draw_date()
+    checkpoint["prediction_date"] = prediction_date
     print(f"📅 预测日期: {prediction_date}\n")
 
-    # 初始化 OpenAI 客户端
-    client = get_openai_client()
-
     # 存储所有模型的预测
-    all_predictions = []
-
-    # 逐个调用模型
-    print("🔮 开始生成预测...\n")
-    for model_config in MODELS:
-        try:
-            # 构建 prompt
-            prompt = prompt_template.format(
-                target_period=target_period,
-                target_date=target_date,
-                lottery_history=history_json,
-                prediction_date=prediction_date,
-                model_id=model_config['model_id'],
-                model_name=model_config['name']
-            )
-
-            # 调用模型
-            prediction = call_ai_model(client, model_config, prompt)
-
-            # 验证数据
-            if validate_prediction(prediction):
-                all_predictions.append(prediction)
-                print(f"  ✓ 验证通过\n")
-            else:
-                print(f"  ✗ 验证失败，跳过该模型\n")
-
-        except Exception as e:
-            print(f"  ✗ 处理 {model_config['name']} 时失败")
-            print(f"  错误类型: {type(e).__name__}")
-            print(f"  错误信息: {str(e)}\n")
-            continue
+    token_usage = []
+    invalid_count = 0
+    repaired_count = 0
+
+    # 并发调用模型：线程数为涉及服务商的并发上限之和，每个服务商的请求由限流调度器放行
+    if pending_models:
+        clients = get_openai_clients(pending_models)
+        scheduler = create_scheduler()
+        task = {"target_period": target_period, "target_date": target_date, "prediction_date": prediction_date}
+        workers = scheduler.total_concurrency([m['provider'] for m in pending_models])
+        print(f"🔮 开始生成预测（{len(pending_models)} 个模型，并发 {min(workers, len(pending_models))}）...\n")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(predict_model, clients[m['provider']], scheduler.limiter_for(m), m,
+                                       prompt_prefix, suffix_template, task, metrics,
+                                       samples or m.get('samples') or DEFAULT_SAMPLES): m
+                       for m in pending_models}
+            for future in as_completed(futures):
+                model_config = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    record_checkpoint(checkpoint, model_config, error=f"{type(e).__name__}: {str(e)}")
+                    print(f"  ✗ 处理 {model_config['name']} 时失败")
+                    print(f"  错误类型: {type(e).__name__}")
+                    print(f"  错误信息: {str(e)}\n")
+                    continue
+
+                if candidates_file and outcome["candidates"]:
+                    save_candidates(candidates_file, metrics.run_id, target_period, model_config, outcome["candidates"])
+                if outcome["usage"]:
+                    token_usage.append({"model_id": model_config['model_id'], "model_name": model_config['name'],
+                                        **outcome["usage"]})
+                if outcome["invalid"]:
+                    invalid_count += 1
+                if outcome["prediction"] is not None:
+                    if outcome["fixes"]:
+                        repaired_count += 1
+                    record_checkpoint(checkpoint, model_config, prediction=outcome["prediction"])
+                    print(f"  ✓ {model_config['name']} 验证通过{'（已修复）' if outcome['fixes'] else ''}\n")
+                else:
+                    record_checkpoint(checkpoint, model_config, error="预测数据验证未通过且无法修复")
+                    print(f"  ✗ {model_config['name']} 验证失败，跳过该模型\n")
+        scheduler.print_summary()
+
+    # 合并检查点中所有成功的模型（按配置中的模型顺序，其余已完成模型排在后面）
+    order = {m['model_id']: i for i, m in enumerate(models)}
+    succeeded = sorted(((model_id, entry) for model_id, entry in checkpoint["models"].items()
+                        if entry.get("status") == "ok"),
+                       key=lambda item: order.get(item[0], len(order)))
+    all_predictions = [entry["prediction"] for _, entry in succeeded]
 
     # 构建最终输出
     if not all_predictions:
@@ -272,44 +738,66 @@ def generate_predictions() -> Dict[str, Any]:
         "target_period": target_period,
         "models": all_predictions
     }
-
-    print(f"✅ 成功生成 {len(all_predictions)}/{len(MODELS)} 个模型的预测\n")
+    if token_usage:
+        result["token_usage"] = sorted(token_usage, key=lambda u: order.get(u["model_id"], len(order)))
+
+    print(f"✅ 成功生成 {len(all_predictions)}/{len(models)} 个模型的预测\n")
+    failed_models = [m['name'] for m in models if m in pending_models
+                     and checkpoint["models"].get(m['model_id'], {}).get("status") != "ok"]
+    if failed_models:
+        print(f"💡 失败的模型: {', '.join(failed_models)}，重新运行脚本将只调用这些模型\n")
+    if invalid_count:
+        print(f"🔧 {invalid_count} 个模型输出未通过验证，修复 {repaired_count} 个 (修复率 {repaired_count / invalid_count * 100:.0f}%)\n")
+    if token_usage:
+        prompt_tokens = sum(u["prompt_tokens"] for u in token_usage)
+        cached_tokens = sum(u["cached_tokens"] for u in token_usage)
+        hit_rate = cached_tokens / prompt_tokens * 100 if prompt_tokens else 0
+        print(f"📦 输入 Token 合计 {prompt_tokens}，前缀缓存命中 {cached_tokens} ({hit_rate:.1f}%)\n")
     return result
 
 def calculate_hit_result(prediction_group: Dict[str, Any], actual_result: Dict[str, Any]) -> Dict[str, Any]:
-    """计算单组预测的命中结果"""
-    red_hits = [b for b in prediction_group["red_balls"] if b in actual_result["red_balls"]]
-    blue_hit = prediction_group["blue_ball"] == actual_result["blue_ball"]
+    """计算单组预测的命中结果（含奖级）"""
+    return prize_engine.hit_result(prediction_group, actual_result["red_balls"], actual_result["blue_ball"])
 
-    return {
-        "red_hits": red_hits,
-        "red_hit_count": len(red_hits),
-        "blue_hit": blue_hit,
-        "total_hits": len(red_hits) + (1 if blue_hit else 0)
-    }
+def score_model_predictions(model_data: Dict[str, Any], actual_result: Dict[str, Any]) -> Dict[str, Any]:
+    """为单个模型的所有预测组计算命中结果，返回历史记录中的模型条目"""
+    return prize_engine.score_models([model_data], actual_result)[0]
 
-def archive_old_prediction(lottery_data: Dict[str, Any]):
-    """将旧预测归档到历史记录（如果已开奖）"""
+def archive_old_prediction(lottery_data: Dict[str, Any],
+                           old_predictions: Optional[Dict[str, Any]] = None,
+                           raise_errors: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    将旧预测归档到历史记录（如果已开奖）
+
+    Args:
+        lottery_data: 开奖数据
+        old_predictions: 已在内存中的旧预测，None 时从 ai_predictions.json 读取
+        raise_errors: 归档出错时抛出异常，而不是打印后返回 None（流水线据此区分失败和无需归档）
+
+    Returns:
+        新归档的历史记录；无需归档或归档失败时返回 None
+    """
     try:
-        # 检查是否存在旧预测文件
-        if not os.path.exists(AI_PREDICTIONS_FILE):
-            print("  ℹ️  没有旧预测需要归档\n")
-            return
+        if old_predictions is None:
+            # 检查是否存在旧预测文件
+            if not os.path.exists(AI_PREDICTIONS_FILE):
+                print("  ℹ️  没有旧预测需要归档\n")
+                return None
 
-        # 读取旧预测
-        with open(AI_PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
-            old_predictions = json.load(f)
+            # 读取旧预测
+            with open(AI_PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
+                old_predictions = json.load(f)
 
         old_target_period = old_predictions.get("target_period")
         if not old_target_period:
             print("  ⚠️  旧预测文件格式异常，跳过归档\n")
-            return
+            return None
 
         # 检查该期号是否已开奖
         latest_period = lottery_data.get("data", [{}])[0].get("period")
         if not latest_period or int(old_target_period) > int(latest_period):
             print(f"  ℹ️  旧预测期号 {old_target_period} 尚未开奖，无需归档\n")
-            return
+            return None
 
         print(f"  📦 旧预测期号 {old_target_period} 已开奖，开始归档...")
 
@@ -322,42 +810,15 @@ def archive_old_prediction(lottery_data: Dict[str, Any]):
 
         if not actual_result:
             print(f"  ⚠️  找不到期号 {old_target_period} 的开奖结果，跳过归档\n")
-            return
-
-        # 读取历史记录文件
-        history_data = {"predictions_history": []}
-        if os.path.exists(PREDICTIONS_HISTORY_FILE):
-            with open(PREDICTIONS_HISTORY_FILE, 'r', encoding='utf-8') as f:
-                history_data = json.load(f)
-
-        # 检查该期号是否已存在
-        existing_record = next((r for r in history_data["predictions_history"]
-                               if r["target_period"] == old_target_period), None)
+            return None
 
-        if existing_record:
+        # 检查该期号是否已存在（流式查找；归档总是插入到最前，历史记录按期号降序，遇到更早的期号即停止）
+        if history_stream.find_record(PREDICTIONS_HISTORY_FILE, old_target_period, newest_first=True):
             print(f"  ℹ️  期号 {old_target_period} 已存在于历史记录中\n")
-            return
+            return None
 
         # 为每个模型计算命中结果
-        models_with_hits = []
-        for model_data in old_predictions.get("models", []):
-            # 为每组预测计算命中
-            predictions_with_hits = []
-            for pred_group in model_data.get("predictions", []):
-                pred_with_hit = pred_group.copy()
-                pred_with_hit["hit_result"] = calculate_hit_result(pred_group, actual_result)
-                predictions_with_hits.append(pred_with_hit)
-
-            # 找出最佳预测组
-            best_pred = max(predictions_with_hits, key=lambda p: p["hit_result"]["total_hits"])
-
-            models_with_hits.append({
-                "model_id": model_data.get("model_id"),
-                "model_name": model_data.get("model_name"),
-                "predictions": predictions_with_hits,
-                "best_group": best_pred["group_id"],
-                "best_hit_count": best_pred["hit_result"]["total_hits"]
-            })
+        models_with_hits = prize_engine.score_models(old_predictions.get("models", []), actual_result)
 
         # 创建新的历史记录
         new_record = {
@@ -367,19 +828,30 @@ def archive_old_prediction(lottery_data: Dict[str, Any]):
             "models": models_with_hits
         }
 
-        # 插入到历史记录顶部
-        history_data["predictions_history"].insert(0, new_record)
-
-        # 保存历史记录
-        with open(PREDICTIONS_HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(history_data, f, ensure_ascii=False, indent=2)
+        # 插入到历史记录顶部（已有记录按块原样复制，不加载到内存）
+        history_stream.prepend_record(PREDICTIONS_HISTORY_FILE, new_record)
 
         print(f"  ✅ 已将期号 {old_target_period} 的预测归档到历史记录")
-        print(f"  📊 归档模型数: {len(models_with_hits)}\n")
+        print(f"  📊 归档模型数: {len(models_with_hits)}")
+
+        # 增量更新投注指纹索引（索引文件缺失时会从全部历史重建）
+        try:
+            if os.path.exists(TICKET_INDEX_FILE):
+                added = ticket_index.append_records([new_record], TICKET_INDEX_FILE)
+            else:
+                added = ticket_index.update_index(history_stream.iter_records(PREDICTIONS_HISTORY_FILE),
+                                                  TICKET_INDEX_FILE)
+            print(f"  🔎 投注指纹索引新增 {added} 组\n")
+        except Exception as e:
+            print(f"  ⚠️  更新投注指纹索引失败: {str(e)}\n")
+        return new_record
 
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"  ⚠️  归档旧预测时出错: {str(e)}")
         print(f"  继续生成新预测...\n")
+        return None
 
 def save_predictions(predictions: Dict[str, Any]):
     """保存预测数据到文件"""
@@ -405,15 +877,17 @@ def save_predictions(predictions: Dict[str, Any]):
         print(f"❌ 保存失败: {str(e)}")
         raise
 
-def main():
-    """主函数"""
+def run(metrics: PipelineTelemetry, force: bool = False, samples: Optional[int] = None,
+        candidates_file: Optional[str] = None):
+    """执行一次完整的预测生成流程"""
     try:
         # 生成预测
-        predictions = generate_predictions()
+        predictions = generate_predictions(metrics, force, samples, candidates_file)
 
         if predictions:
             # 保存预测
-            save_predictions(predictions)
+            with metrics.stage("save"):
+                save_predictions(predictions)
 
             print("="*50)
             print("🎉 预测生成完成！")
@@ -434,5 +908,50 @@ def main():
         print(f"\n❌ 程序执行出错: {str(e)}")
         raise
 
+def run_with_profile(metrics: PipelineTelemetry, profile_file: str, force: bool = False,
+                     samples: Optional[int] = None, candidates_file: Optional[str] = None):
+    """在 cProfile 下执行流程，并保存统计结果"""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(run, metrics, force, samples, candidates_file)
+    finally:
+        os.makedirs(os.path.dirname(os.path.abspath(profile_file)), exist_ok=True)
+        profiler.dump_stats(profile_file)
+        print(f"🔬 性能分析结果已保存到: {profile_file}")
+        print(f"   查看: python3 -m pstats {profile_file}\n")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+
+def main(argv=None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description="双色球 AI 预测自动生成")
+    parser.add_argument("--metrics-file", default=METRICS_FILE,
+                        help="运行指标 JSONL 文件路径（追加写入）")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="FILE",
+                        help="使用 cProfile 运行并保存统计结果（默认保存到 logs/profile_<run_id>.prof）")
+    parser.add_argument("--force", action="store_true",
+                        help="忽略检查点，重新调用全部模型")
+    parser.add_argument("--samples", type=int, default=None,
+                        help="每个模型一次取回的候选数，选用通过验证的最佳候选（默认 1）")
+    parser.add_argument("--save-candidates", nargs="?", const=CANDIDATES_FILE, default=None, metavar="FILE",
+                        help=f"将全部候选追加写入 JSONL 文件（默认 {os.path.relpath(CANDIDATES_FILE, SCRIPT_DIR)}）")
+    args = parser.parse_args(argv)
+    if args.samples is not None and args.samples < 1:
+        parser.error("--samples 必须大于等于 1")
+
+    metrics = PipelineTelemetry()
+    try:
+        if args.profile is not None:
+            profile_file = args.profile or os.path.join(PROFILE_DIR, f"profile_{metrics.run_id}.prof")
+            run_with_profile(metrics, profile_file, args.force, args.samples, args.save_candidates)
+        else:
+            run(metrics, args.force, args.samples, args.save_candidates)
+    finally:
+        metrics.write_jsonl(args.metrics_file)
+        metrics.print_summary()
+        print(f"📈 运行指标已追加到: {args.metrics_file}\n")
+
 if __name__ == "__main__":
     main()
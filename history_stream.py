@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+predictions_history.json 流式读写
+归档和查找只需要一条记录，不必把整个历史文件解析为 Python 对象
+
+实现：
+- 定位数组：按字节扫描顶层对象，找到 "predictions_history" 对应的 '[' 的字节偏移
+  （结构字符都是 ASCII，UTF-8 多字节字符中不会出现，因此可以直接在字节上扫描）
+- 逐条读取：从 '[' 之后按块读入文本，用 JSONDecoder.raw_decode 依次解码数组元素，
+  内存中只保留当前块和当前记录
+- 插入到最前：写入 '[' 之前的头部 + 新记录 + 原文件剩余部分（按块复制），不解析已有记录；
+  先写临时文件再原子替换，新记录的格式与 json.dump(indent=2) 完全一致
+- 更新单条记录：逐条复制记录原文，只重新序列化被修改的记录
+- 批量合并：一次遍历中修改已有期号的记录，并把新期号按降序插入到对应位置，整个批次只写一次文件
+
+使用方法：
+    from history_stream import iter_records, find_record, prepend_record
+    for record in iter_records(path): ...
+"""
+
+import io
+import json
+import os
+import shutil
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+HISTORY_KEY = "predictions_history"
+CHUNK_SIZE = 1 << 20
+WHITESPACE = " \t\r\n"
+WHITESPACE_BYTES = b" \t\r\n"
+
+
+def _skip_ws(data: bytes, i: int) -> int:
+    while i < len(data) and data[i] in WHITESPACE_BYTES:
+        i += 1
+    return i
+
+
+def _string_end(data: bytes, i: int) -> Optional[int]:
+    """data[i] 为引号，返回字符串结束后的位置；数据不完整时返回 None"""
+    i += 1
+    while i < len(data):
+        c = data[i]
+        if c == 0x5C:  # 反斜杠转义
+            i += 2
+            continue
+        if c == 0x22:
+            return i + 1
+        i += 1
+    return None
+
+
+def _value_end(data: bytes, i: int) -> Optional[int]:
+    """跳过一个任意 JSON 值，返回其后的位置；数据不完整时返回 None"""
+    if data[i] == 0x22:
+        return _string_end(data, i)
+    depth = 0
+    while i < len(data):
+        c = data[i]
+        if c == 0x22:
+            end = _string_end(data, i)
+            if end is None:
+                return None
+            i = end
+            continue
+        if c in b"[{":
+            depth += 1
+        elif c in b"]}":
+            if depth == 0:
+                return i
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        elif c == 0x2C and depth == 0:
+            return i
+        i += 1
+    return None
+
+
+def _scan_head(data: bytes, key: str) -> Optional[int]:
+    """在顶层对象中查找 key 对应数组的 '[' 偏移；数据不完整时返回 None"""
+    i = _skip_ws(data, 0)
+    if i >= len(data):
+        return None
+    if data[i] != 0x7B:
+        raise ValueError("历史文件顶层不是 JSON 对象")
+    i += 1
+    while True:
+        i = _skip_ws(data, i)
+        if i >= len(data):
+            return None
+        if data[i] == 0x2C:
+            i += 1
+            continue
+        if data[i] == 0x7D:
+            raise ValueError(f"历史文件中没有 {key} 数组")
+        if data[i] != 0x22:
+            raise ValueError(f"历史文件格式错误（偏移 {i}）")
+        end = _string_end(data, i)
+        if end is None:
+            return None
+        name = json.loads(data[i:end].decode("utf-8"))
+        i = _skip_ws(data, end)
+        if i >= len(data):
+            return None
+        if data[i] != 0x3A:
+            raise ValueError(f"历史文件格式错误（偏移 {i}）")
+        i = _skip_ws(data, i + 1)
+        if i >= len(data):
+            return None
+        if name == key:
+            if data[i] != 0x5B:
+                raise ValueError(f"{key} 不是数组")
+            return i
+        i = _value_end(data, i)
+        if i is None:
+            return None
+
+
+def find_array_start(f, key: str = HISTORY_KEY, chunk_size: int = CHUNK_SIZE) -> int:
+    """二进制文件中 key 数组 '[' 的字节偏移（只读取数组之前的头部）"""
+    f.seek(0)
+    data = b""
+    while True:
+        chunk = f.read(chunk_size)
+        data += chunk
+        offset = _scan_head(data, key)
+        if offset is not None:
+            return offset
+        if not chunk:
+            raise ValueError("历史文件不完整")
+
+
+class ArrayReader:
+    """从 '[' 之后逐个解码数组元素，记录元素之间的空白以便原样写回"""
+
+    def __init__(self, text_file, chunk_size: int = CHUNK_SIZE):
+        self.file = text_file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.leading_ws = None   # 第一个元素前的空白（决定缩进）
+        self.trailing_ws = ""    # 最后一个元素与 ']' 之间的空白
+        self.tail = None         # 从 ']' 开始的剩余文本（与 file 中未读部分相接）
+
+    def _fill(self, keep_from: int) -> bool:
+        """读入下一块，丢弃 keep_from 之前已消费的文本"""
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[keep_from:] + chunk
+        self.pos -= keep_from
+        return True
+
+    def __iter__(self) -> Iterator[Tuple[Dict[str, Any], str]]:
+        """依次产出 (记录, 记录原文)"""
+        while True:
+            start = self.pos
+            while True:
+                while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                    self.pos += 1
+                if self.pos < len(self.buffer):
+                    break
+                if not self._fill(start):
+                    raise ValueError("历史文件不完整：数组没有结束")
+                start = 0
+            whitespace = self.buffer[start:self.pos]
+
+            c = self.buffer[self.pos]
+            if c == "]":
+                self.trailing_ws = whitespace
+                self.tail = self.buffer[self.pos:]
+                return
+            if c == ",":
+                self.pos += 1
+                continue
+            if self.leading_ws is None:
+                self.leading_ws = whitespace
+
+            while True:
+                try:
+                    record, end = self.decoder.raw_decode(self.buffer, self.pos)
+                    break
+                except json.JSONDecodeError:
+                    if not self._fill(self.pos):
+                        raise
+            yield record, self.buffer[self.pos:end]
+            self.pos = end
+
+
+def iter_records(path: str, key: str = HISTORY_KEY, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """逐条读取历史记录（文件不存在时不产出任何记录）"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        f.seek(find_array_start(f, key, chunk_size) + 1)
+        for record, _ in ArrayReader(io.TextIOWrapper(f, encoding="utf-8"), chunk_size):
+            yield record
+
+
+def find_record(path: str, period: str, key: str = HISTORY_KEY,
+                newest_first: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    查找指定期号的记录
+
+    Args:
+        newest_first: 记录按期号降序排列时，遇到更早的期号即可停止
+    """
+    for record in iter_records(path, key):
+        if record.get("target_period") == period:
+            return record
+        if newest_first and record.get("target_period", "") < period:
+            return None
+    return None
+
+
+def _indent_record(record: Dict[str, Any], indent: str) -> str:
+    """按 json.dump(indent=2) 的格式序列化嵌套在数组中的记录"""
+    return json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n" + indent)
+
+
+def _atomic_write(path: str, write: Callable):
+    tmp_file = path + ".tmp"
+    try:
+        with open(tmp_file, "wb") as out:
+            write(out)
+        os.replace(tmp_file, path)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def prepend_record(path: str, record: Dict[str, Any], key: str = HISTORY_KEY,
+                   chunk_size: int = CHUNK_SIZE, default_header: Optional[Dict[str, Any]] = None):
+    """
+    将记录插入到数组最前面，已有记录按块原样复制
+
+    Args:
+        default_header: 文件不存在时，新文件中数组之前的其他字段
+    """
+    if not os.path.exists(path):
+        data = dict(default_header or {})
+        data[key] = [record]
+        _atomic_write(path, lambda out: out.write(json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")))
+        return
+
+    with open(path, "rb") as f:
+        offset = find_array_start(f, key, chunk_size)
+        f.seek(0)
+        head = f.read(offset + 1)
+        peek = f.read(256)
+        stripped = peek.lstrip(WHITESPACE_BYTES)
+        leading = peek[:len(peek) - len(stripped)].decode("utf-8")
+        # '[' 所在行的缩进，即数组字段的缩进
+        line = head[head.rfind(b"\n", 0, offset) + 1:offset]
+        key_indent = " " * (len(line) - len(line.lstrip(b" ")))
+
+        def write(out):
+            out.write(head)
+            if stripped.startswith(b"]"):
+                # 空数组：[] -> [\n    {...}\n  ]
+                indent = key_indent + "  "
+                out.write(("\n" + indent + _indent_record(record, indent) + "\n" + key_indent).encode("utf-8"))
+                f.seek(offset + 1 + len(peek) - len(stripped))
+            else:
+                indent = leading.rsplit("\n", 1)[-1]
+                out.write((leading + _indent_record(record, indent) + ",").encode("utf-8"))
+                f.seek(offset + 1)
+            shutil.copyfileobj(f, out, chunk_size)
+
+        _atomic_write(path, write)
+
+
+def update_record(path: str, period: str, update: Callable[[Dict[str, Any]], bool],
+                  key: str = HISTORY_KEY, chunk_size: int = CHUNK_SIZE) -> bool:
+    """
+    流式修改指定期号的记录
+
+    Args:
+        update: 接收记录并原地修改，返回 True 表示有修改
+
+    Returns:
+        是否找到并修改了记录（未修改时不重写文件）
+    """
+    if not os.path.exists(path):
+        return False
+
+    changed = False
+    with open(path, "rb") as f:
+        offset = find_array_start(f, key, chunk_size)
+        f.seek(0)
+        head = f.read(offset + 1)
+        text = io.TextIOWrapper(f, encoding="utf-8")
+
+        def write(out):
+            nonlocal changed
+            out.write(head)
+            reader = ArrayReader(text, chunk_size)
+            for i, (record, original) in enumerate(reader):
+                if record.get("target_period") == period and update(record):
+                    changed = True
+                    original = _indent_record(record, reader.leading_ws.rsplit("\n", 1)[-1])
+                out.write(("," if i else "").encode("utf-8") + (reader.leading_ws + original).encode("utf-8"))
+            out.write((reader.trailing_ws + reader.tail).encode("utf-8"))
+            while True:
+                chunk = text.read(chunk_size)
+                if not chunk:
+                    break
+                out.write(chunk.encode("utf-8"))
+
+        tmp_file = path + ".tmp"
+        try:
+            with open(tmp_file, "wb") as out:
+                write(out)
+            # 没有修改时保留原文件
+            if changed:
+                os.replace(tmp_file, path)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+    return changed
+
+
+def merge_records(path: str, records: List[Dict[str, Any]], merge: Callable[[Dict[str, Any], Dict[str, Any]], bool],
+                  key: str = HISTORY_KEY, chunk_size: int = CHUNK_SIZE,
+                  default_header: Optional[Dict[str, Any]] = None) -> Tuple[int, int]:
+    """
+    一次写入合并多条记录（历史记录按期号降序排列）
+
+    Args:
+        records: 待合并的记录，每个期号最多一条
+        merge: 期号已存在时调用 merge(已有记录, 新记录)，原地修改已有记录，返回 True 表示有修改
+        default_header: 文件不存在时，新文件中数组之前的其他字段
+
+    Returns:
+        (插入的记录数, 修改的记录数)，都为 0 时不重写文件
+    """
+    pending = sorted(records, key=lambda r: r["target_period"], reverse=True)
+    if not os.path.exists(path):
+        if not pending:
+            return 0, 0
+        data = dict(default_header or {})
+        data[key] = pending
+        _atomic_write(path, lambda out: out.write(json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")))
+        return len(pending), 0
+
+    inserted = updated = 0
+    with open(path, "rb") as f:
+        offset = find_array_start(f, key, chunk_size)
+        f.seek(0)
+        head = f.read(offset + 1)
+        line = head[head.rfind(b"\n", 0, offset) + 1:offset]
+        key_indent = " " * (len(line) - len(line.lstrip(b" ")))
+        text = io.TextIOWrapper(f, encoding="utf-8")
+
+        def write(out):
+            nonlocal inserted, updated
+            out.write(head)
+            reader = ArrayReader(text, chunk_size)
+            count = 0
+
+            def emit(original: str):
+                nonlocal count
+                leading = reader.leading_ws if reader.leading_ws is not None else "\n" + key_indent + "  "
+                out.write(("," if count else "").encode("utf-8") + (leading + original).encode("utf-8"))
+                count += 1
+
+            def emit_new(record: Dict[str, Any]):
+                nonlocal inserted
+                leading = reader.leading_ws if reader.leading_ws is not None else "\n" + key_indent + "  "
+                emit(_indent_record(record, leading.rsplit("\n", 1)[-1]))
+                inserted += 1
+
+            for record, original in reader:
+                period = record.get("target_period", "")
+                while pending and pending[0]["target_period"] > period:
+                    emit_new(pending.pop(0))
+                if pending and pending[0]["target_period"] == period and merge(record, pending.pop(0)):
+                    updated += 1
+                    original = _indent_record(record, reader.leading_ws.rsplit("\n", 1)[-1])
+                emit(original)
+            was_empty = reader.leading_ws is None
+            for record in pending:
+                emit_new(record)
+            # 原来是空数组时，']' 换行到数组字段的缩进处
+            trailing = "\n" + key_indent if was_empty and count else reader.trailing_ws
+            out.write((trailing + reader.tail).encode("utf-8"))
+            while True:
+                chunk = text.read(chunk_size)
+                if not chunk:
+                    break
+                out.write(chunk.encode("utf-8"))
+
+        tmp_file = path + ".tmp"
+        try:
+            with open(tmp_file, "wb") as out:
+                write(out)
+            if inserted or updated:
+                os.replace(tmp_file, path)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+    return inserted, updated
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导入外部预测
+把外部生成的预测（任意模型、任意期号）批量验证、计分后写入 predictions_history.json，
+取代为单个模型、单个期号编写的一次性导入脚本
+
+支持的输入：
+- 单个模型的预测（ai_predictions.json 中 models 元素的格式，带 prediction_date、target_period）
+- 多模型预测文件（与 ai_predictions.json 相同，顶层为 target_period 和 models）
+- 以上对象组成的 JSON 数组，或每行一个对象的 JSONL；文件名为 - 时读取标准输入
+- 对象中可带 actual_result，开奖数据中没有该期时使用
+
+实现：
+- 先读入并展开全部输入，批量验证（--repair 时先做确定性修复），任何一条不通过时整批不写入
+- 开奖结果按期号建字典，每条预测只查一次；尚未开奖的期号跳过
+- 按期号分组，prize_engine.score_models 每期一次批量计分
+- history_stream.merge_records 一次遍历写入：已有期号追加模型，新期号按降序插入到对应位置
+- 投注指纹索引：只新增期号时追加，已有期号新增模型时全量重建
+
+使用方法：
+    python3 import_predictions.py gpt5_25121.json
+    python3 import_predictions.py predictions/*.json --repair
+    cat predictions.jsonl | python3 import_predictions.py - --dry-run
+    python3 import_predictions.py predictions.jsonl --replace     # 覆盖已有的同期同模型预测
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Any, List, Tuple
+
+import history_stream
+import prediction_validator
+import prize_engine
+import ticket_index
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+LOTTERY_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "lottery_history.json")
+PREDICTIONS_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "predictions_history.json")
+TICKET_INDEX_FILE = os.path.join(SCRIPT_DIR, "data", "ticket_index.json")
+
+# 验证失败时最多打印的问题数
+MAX_PRINTED_ISSUES = 10
+
+
+def read_source(path: str) -> List[Tuple[str, Any]]:
+    """
+    读取一个输入文件，整体是 JSON 时返回一个对象，否则按 JSONL 逐行解析
+
+    Returns:
+        [(来源标记, 对象)]
+
+    Raises:
+        ValueError: 既不是 JSON 也不是 JSONL
+    """
+    label = "<stdin>" if path == "-" else path
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+
+    try:
+        return [(label, json.loads(text))]
+    except json.JSONDecodeError:
+        pass
+
+    objects = []
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            objects.append((f"{label}:{number}", json.loads(line)))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{label}:{number} 不是有效的 JSON: {e}")
+    return objects
+
+
+def expand(label: str, obj: Any) -> List[Tuple[str, Dict[str, Any]]]:
+    """把输入对象展开为单个模型的预测，多模型文件的顶层期号和日期下放到每个模型"""
+    if isinstance(obj, list):
+        items = []
+        for i, item in enumerate(obj):
+            items.extend(expand(f"{label}[{i}]", item))
+        return items
+
+    if isinstance(obj, dict) and isinstance(obj.get("models"), list):
+        shared = {field: obj[field] for field in ("prediction_date", "target_period", "actual_result") if field in obj}
+        return [(f"{label} {model.get('model_name', i) if isinstance(model, dict) else i}",
+                 {**shared, **model} if isinstance(model, dict) else model)
+                for i, model in enumerate(obj["models"])]
+    return [(label, obj)]
+
+
+def load_predictions(paths: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """读取并展开全部输入"""
+    items = []
+    for path in paths:
+        for label, obj in read_source(path):
+            items.extend(expand(label, obj))
+    return items
+
+
+def validate_all(items: List[Tuple[str, Dict[str, Any]]], repair: bool = False
+                 ) -> Tuple[List[Tuple[str, Dict[str, Any]]], List[Tuple[str, List[Any]]]]:
+    """
+    批量验证（可选修复）全部预测，同一期号同一模型只能出现一次
+
+    Returns:
+        (通过验证的预测, [(来源标记, 问题列表)])
+    """
+    valid, errors = [], []
+    seen: Dict[Tuple[str, str], str] = {}
+    for label, prediction in items:
+        if repair:
+            prediction, fixed_codes, issues = prediction_validator.repair(prediction)
+            if fixed_codes and not issues:
+                print(f"  🔧 {label}: 已修复 {', '.join(sorted(set(fixed_codes)))}")
+        else:
+            issues = prediction_validator.validate(prediction)
+        if issues:
+            errors.append((label, issues))
+            continue
+
+        key = (prediction["target_period"], prediction["model_id"])
+        if key in seen:
+            errors.append((label, [f"与 {seen[key]} 重复（期号 {key[0]}，模型 {key[1]}）"]))
+            continue
+        seen[key] = label
+        valid.append((label, prediction))
+    return valid, errors
+
+
+def load_draws(path: str = LOTTERY_HISTORY_FILE) -> Dict[str, Dict[str, Any]]:
+    """开奖数据：期号 -> 开奖结果"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return {draw["period"]: draw for draw in json.load(f).get("data", [])}
+
+
+def group_by_period(predictions: List[Tuple[str, Dict[str, Any]]], draws: Dict[str, Dict[str, Any]]
+                    ) -> Tuple[Dict[str, Dict[str, Any]], List[str], List[Tuple[str, List[Any]]]]:
+    """
+    查找开奖结果并按期号分组
+
+    Returns:
+        (期号 -> {actual_result, prediction_date, models}, 尚未开奖的来源标记, [(来源标记, 问题列表)])
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    pending, errors = [], []
+    for label, prediction in predictions:
+        period = prediction["target_period"]
+        embedded = prediction.get("actual_result")
+        actual = draws.get(period) or embedded
+        if not actual:
+            pending.append(label)
+            continue
+        if embedded and (embedded.get("red_balls") != actual["red_balls"]
+                         or embedded.get("blue_ball") != actual["blue_ball"]):
+            errors.append((label, [f"actual_result 与期号 {period} 的开奖数据不一致"]))
+            continue
+
+        group = groups.setdefault(period, {
+            "actual_result": actual,
+            "prediction_date": prediction["prediction_date"],
+            "models": []
+        })
+        group["models"].append(prediction)
+    return groups, pending, errors
+
+
+def score_groups(groups: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """每期一次批量计分，返回历史记录格式的记录（期号降序）"""
+    return [{
+        "prediction_date": group["prediction_date"],
+        "target_period": period,
+        "actual_result": group["actual_result"],
+        "models": prize_engine.score_models(group["models"], group["actual_result"])
+    } for period, group in sorted(groups.items(), reverse=True)]
+
+
+def write_records(records: List[Dict[str, Any]], history_file: str, index_file: str,
+                  replace: bool = False) -> Dict[str, Any]:
+    """
+    一次写入历史记录并更新投注指纹索引
+
+    Args:
+        replace: 已有同期同模型的预测时覆盖，否则跳过
+
+    Returns:
+        {"inserted", "updated", "added_models", "skipped_models", "index_added", "index_rebuilt"}
+    """
+    result = {"added_models": 0, "skipped_models": [], "index_added": 0, "index_rebuilt": False}
+    existing_periods = set()
+
+    def merge(existing: Dict[str, Any], incoming: Dict[str, Any]) -> bool:
+        existing_periods.add(existing["target_period"])
+        positions = {m.get("model_id"): i for i, m in enumerate(existing["models"])}
+        changed = False
+        for model in incoming["models"]:
+            position = positions.get(model["model_id"])
+            if position is None:
+                existing["models"].append(model)
+            elif replace and existing["models"][position] != model:
+                existing["models"][position] = model
+            else:
+                result["skipped_models"].append((existing["target_period"], model["model_name"]))
+                continue
+            result["added_models"] += 1
+            changed = True
+        return changed
+
+    inserted, updated = history_stream.merge_records(history_file, records, merge)
+    result["inserted"], result["updated"] = inserted, updated
+    result["added_models"] += sum(len(r["models"]) for r in records if r["target_period"] not in existing_periods)
+
+    # 已有期号的条目已在索引中，追加模型后只能重建；只新增期号时追加即可
+    if updated or not os.path.exists(index_file):
+        index = ticket_index.build_index(history_stream.iter_records(history_file))
+        ticket_index.save_index(index, index_file)
+        result["index_added"] = len(index.entries)
+        result["index_rebuilt"] = True
+    elif inserted:
+        new_records = [r for r in records if r["target_period"] not in existing_periods]
+        result["index_added"] = ticket_index.append_records(new_records, index_file)
+    return result
+
+
+def print_errors(errors: List[Tuple[str, List[Any]]]):
+    for label, issues in errors:
+        print(f"  ✗ {label}: {len(issues)} 个问题")
+        for issue in issues[:MAX_PRINTED_ISSUES]:
+            print(f"    ⚠️  {issue}")
+        if len(issues) > MAX_PRINTED_ISSUES:
+            print(f"    ... 另有 {len(issues) - MAX_PRINTED_ISSUES} 个问题")
+
+
+def print_records(records: List[Dict[str, Any]]):
+    """打印各期各模型的最佳组命中"""
+    for record in records:
+        actual = record["actual_result"]
+        print(f"  📅 {record['target_period']} 开奖 {' '.join(actual['red_balls'])} + {actual['blue_ball']}")
+        for model in record["models"]:
+            best = model["predictions"][model["best_group"] - 1]["hit_result"]
+            print(f"    - {model['model_name']}: 最佳第 {model['best_group']} 组，"
+                  f"命中 {model['best_hit_count']} 个（{best['prize_name']}）")
+
+
+def import_predictions(paths: List[str], history_file: str = PREDICTIONS_HISTORY_FILE,
+                       lottery_file: str = LOTTERY_HISTORY_FILE, index_file: str = TICKET_INDEX_FILE,
+                       repair: bool = False, replace: bool = False, dry_run: bool = False) -> int:
+    """
+    批量导入预测，返回退出码（0 成功，1 输入有误未写入）
+    """
+    print("📥 读取预测...")
+    try:
+        items = load_predictions(paths)
+    except (OSError, ValueError) as e:
+        print(f"❌ 读取失败: {e}")
+        return 1
+    print(f"  ✓ 共 {len(items)} 个模型预测\n")
+
+    print("🔍 批量验证...")
+    predictions, errors = validate_all(items, repair)
+    groups, pending, result_errors = group_by_period(predictions, load_draws(lottery_file))
+    errors += result_errors
+    if errors:
+        print_errors(errors)
+        print(f"\n❌ {len(errors)}/{len(items)} 个预测未通过验证，未写入任何记录")
+        if not repair:
+            print("💡 可加 --repair 自动修复格式问题")
+        return 1
+    for label in pending:
+        print(f"  ⏭️  {label}: 尚未开奖，跳过")
+    print(f"  ✓ {len(predictions)} 个预测通过验证\n")
+
+    records = score_groups(groups)
+    if not records:
+        print("ℹ️  没有已开奖的预测需要导入")
+        return 0
+    print(f"📊 计分完成: {len(records)} 期，{sum(len(r['models']) for r in records)} 个模型")
+    print_records(records)
+    print()
+
+    if dry_run:
+        print("ℹ️  --dry-run：未写入历史记录")
+        return 0
+
+    result = write_records(records, history_file, index_file, replace)
+    for period, name in result["skipped_models"]:
+        print(f"  ⚠️  {period} 已有 {name} 的预测，跳过（--replace 可覆盖）")
+    print(f"✅ 已写入 {history_file}: 新增 {result['inserted']} 期，更新 {result['updated']} 期，"
+          f"导入 {result['added_models']} 个模型")
+    if result["index_rebuilt"]:
+        print(f"🔎 投注指纹索引已重建: {result['index_added']} 组\n")
+    else:
+        print(f"🔎 投注指纹索引新增 {result['index_added']} 组\n")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量导入外部预测到历史记录")
+    parser.add_argument("inputs", nargs="+", help="预测文件（JSON 或 JSONL，- 表示标准输入）")
+    parser.add_argument("--history", default=PREDICTIONS_HISTORY_FILE, help="历史预测文件")
+    parser.add_argument("--lottery", default=LOTTERY_HISTORY_FILE, help="开奖数据文件")
+    parser.add_argument("--index", default=TICKET_INDEX_FILE, help="投注指纹索引文件")
+    parser.add_argument("--repair", action="store_true", help="先自动修复格式问题再验证")
+    parser.add_argument("--replace", action="store_true", help="覆盖已有的同期同模型预测")
+    parser.add_argument("--dry-run", action="store_true", help="只验证和计分，不写入")
+    args = parser.parse_args(argv)
+
+    return import_predictions(args.inputs, args.history, args.lottery, args.index,
+                              args.repair, args.replace, args.dry_run)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,22 +6,41 @@
 let appData = {
     lotteryHistory: null,
     aiPredictions: null,
-    predictionsHistory: null
+    predictionsHistory: null,
+    drawStats: null
 };
 
+// 历史预测每页条数
+const HISTORY_PAGE_SIZE = 20;
+
+// 数据加载状态：首屏数据、按需加载的全部开奖数据与历史预测
+let dataReady = null;
+let drawsReady = null;
+let historyReady = null;
+
 // 初始化应用
 async function initApp() {
     try {
-        // 加载数据
-        await loadAllData();
+        // 构建时已预渲染首屏（prerender.py）：先响应交互，数据到达后只在内容过期时重新渲染
+        const prerendered = readPrerenderState();
+        if (prerendered) {
+            setupEventListeners();
+            renderCountdown(prerendered.next_date);
+        }
+
+        // 首屏只加载最近几期开奖和当期预测（全部开奖和历史预测在切换到对应标签时才加载）
+        dataReady = loadAllData();
+        await dataReady;
 
         // 渲染UI
-        renderHeroBanner();
-        renderModelsGrid();
-        renderHistoryTab();
+        if (!isPrerenderCurrent(prerendered)) {
+            renderHeroBanner();
+            renderLatestDraw();
+            renderModelsGrid();
+        }
 
         // 设置事件监听
-        setupEventListeners();
+        if (!prerendered) setupEventListeners();
 
         // 隐藏加载屏幕
         hideLoadingScreen();
@@ -31,24 +50,80 @@ async function initApp() {
     }
 }
 
-// 加载所有数据
+// 加载首屏所需数据
 async function loadAllData() {
     try {
-        const [lotteryHistory, aiPredictions, predictionsHistory] = await Promise.all([
-            DataLoader.loadLotteryHistory(),
+        const [lotteryHistory, aiPredictions, drawStats] = await Promise.all([
+            DataLoader.loadLatestDraws(),
             DataLoader.loadPredictions(),
-            DataLoader.loadPredictionsHistory()
+            DataLoader.loadDrawStats()
         ]);
 
         appData.lotteryHistory = lotteryHistory;
         appData.aiPredictions = aiPredictions;
-        appData.predictionsHistory = predictionsHistory;
+        appData.drawStats = drawStats;
     } catch (error) {
         console.error('数据加载失败:', error);
         throw error;
     }
 }
 
+// 按需加载全部开奖数据（图表分析和历史开奖表格使用，只加载一次）
+function ensureAllDraws() {
+    if (!drawsReady) {
+        drawsReady = Promise.all([dataReady, DataLoader.loadLotteryHistory()])
+            .then(([, lotteryHistory]) => {
+                appData.lotteryHistory = lotteryHistory;
+            })
+            .catch(error => {
+                drawsReady = null;
+                throw error;
+            });
+    }
+    return drawsReady;
+}
+
+// 按需加载第一页历史预测并渲染历史标签页（只加载一次）
+function ensureHistoryTab() {
+    if (!historyReady) {
+        historyReady = Promise.all([ensureAllDraws(), DataLoader.loadPredictionsHistoryPage(0, HISTORY_PAGE_SIZE)])
+            .then(([, page]) => {
+                appData.predictionsHistory = page;
+                renderHistoryTab();
+            })
+            .catch(error => {
+                // 失败后允许再次切换标签时重试
+                historyReady = null;
+                console.error('历史预测加载失败:', error);
+            });
+    }
+    return historyReady;
+}
+
+// 读取构建时写入的预渲染状态，页面未预渲染时返回 null
+function readPrerenderState() {
+    if (!document.body.classList.contains('prerendered')) return null;
+    const stateEl = document.getElementById('prerenderState');
+    try {
+        return stateEl && stateEl.textContent.trim() ? JSON.parse(stateEl.textContent) : null;
+    } catch (error) {
+        console.warn('预渲染状态无法解析，改为前端渲染:', error);
+        return null;
+    }
+}
+
+// 预渲染内容是否与加载到的数据一致
+function isPrerenderCurrent(state) {
+    if (!state || !appData.lotteryHistory || !appData.aiPredictions) return false;
+    const predictions = appData.aiPredictions;
+    const modelIds = predictions.models.map(model => model.model_id);
+    return state.next_period === appData.lotteryHistory.next_draw.next_period
+        && state.latest_period === (appData.lotteryHistory.data[0]?.period ?? null)
+        && state.target_period === predictions.target_period
+        && state.prediction_date === predictions.prediction_date
+        && state.model_ids.join(',') === modelIds.join(',');
+}
+
 // 渲染Hero Banner
 function renderHeroBanner() {
     if (!appData.lotteryHistory || !appData.aiPredictions) return;
@@ -72,13 +147,50 @@ function renderHeroBanner() {
     if (heroPredictionDateEl) heroPredictionDateEl.textContent = appData.aiPredictions.prediction_date;
 
     // 倒计时 (可选功能)
+    renderCountdown(nextDraw.next_date);
+}
+
+// 更新开奖倒计时（预渲染页面只有占位文字，加载后按浏览器当天日期计算）
+function renderCountdown(nextDate) {
     const heroCountdownEl = document.getElementById('heroCountdown');
-    if (heroCountdownEl) {
-        const daysUntil = calculateDaysUntil(nextDraw.next_date);
+    if (heroCountdownEl && nextDate) {
+        const daysUntil = calculateDaysUntil(nextDate);
         heroCountdownEl.textContent = daysUntil > 0 ? `距离开奖仅剩 ${daysUntil} 天` : '即将开奖';
     }
 }
 
+// 渲染上期开奖
+function renderLatestDraw() {
+    const latestDrawEl = document.getElementById('latestDraw');
+    const latestDraw = appData.lotteryHistory?.data?.[0];
+    if (!latestDrawEl) return;
+
+    latestDrawEl.innerHTML = '';
+    if (latestDraw) latestDrawEl.appendChild(createLatestDrawBanner(latestDraw));
+}
+
+// 创建上期开奖横幅
+function createLatestDrawBanner(draw) {
+    const banner = document.createElement('div');
+    banner.className = 'drawn-status-banner latest-draw-banner';
+    banner.innerHTML = `
+        <div class="drawn-status-icon">
+            <svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+                <path d="M6 9H4.5a2.5 2.5 0 0 1 0-5H6"/><path d="M18 9h1.5a2.5 2.5 0 0 0 0-5H18"/><path d="M4 22h16"/><path d="M18 2H6v7a6 6 0 0 0 12 0V2Z"/>
+            </svg>
+        </div>
+        <div class="drawn-status-content">
+            <h3 class="drawn-status-title">第 ${draw.period} 期开奖号码</h3>
+            <p class="drawn-status-subtitle">${draw.date}</p>
+        </div>
+        <div class="drawn-status-balls">
+            ${draw.red_balls.map(num => `<span class="mini-result-ball red">${num}</span>`).join('')}
+            <span class="mini-result-ball blue">${draw.blue_ball}</span>
+        </div>
+    `;
+    return banner;
+}
+
 // 渲染模型网格
 function renderModelsGrid() {
     if (!appData.aiPredictions) return;
@@ -154,6 +266,9 @@ function renderAccuracyChart() {
     const chartEl = document.getElementById('accuracyChart');
     if (!chartEl) return;
 
+    // 加载更多历史后重新渲染
+    Chart.getChart(chartEl)?.destroy();
+
     // 准备图表数据
     const chartData = prepareChartData();
 
@@ -253,6 +368,46 @@ function renderAccuracyCards() {
         const card = Components.createAccuracyCard(record);
         containerEl.appendChild(card);
     });
+    updateLoadMoreButton();
+}
+
+// 还有未加载的历史预测时显示「加载更多」按钮
+function updateLoadMoreButton() {
+    const buttonEl = document.getElementById('loadMoreHistory');
+    if (!buttonEl) return;
+
+    const { total, predictions_history: records } = appData.predictionsHistory;
+    const remaining = total - records.length;
+    buttonEl.style.display = remaining > 0 ? '' : 'none';
+    buttonEl.disabled = false;
+    buttonEl.textContent = `加载更多（还有 ${remaining} 期）`;
+}
+
+// 加载下一页历史预测，追加卡片并更新趋势图
+async function loadMoreHistory() {
+    const buttonEl = document.getElementById('loadMoreHistory');
+    const records = appData.predictionsHistory.predictions_history;
+    if (buttonEl) {
+        buttonEl.disabled = true;
+        buttonEl.textContent = '加载中...';
+    }
+
+    try {
+        const page = await DataLoader.loadPredictionsHistoryPage(records.length, HISTORY_PAGE_SIZE);
+        appData.predictionsHistory = {
+            total: page.total,
+            predictions_history: records.concat(page.predictions_history)
+        };
+
+        const containerEl = document.getElementById('accuracyCardsContainer');
+        page.predictions_history.forEach(record => {
+            containerEl?.appendChild(Components.createAccuracyCard(record));
+        });
+        renderAccuracyChart();
+    } catch (error) {
+        console.error('加载更多历史预测失败:', error);
+    }
+    updateLoadMoreButton();
 }
 
 // 渲染历史表格
@@ -272,6 +427,38 @@ function renderHistoryTable() {
     });
 }
 
+// 全部期数的号码出现次数与和值合计
+// 统计状态文件与开奖数据同步时直接读取，否则现场统计
+function getAllTimeStats() {
+    const draws = appData.lotteryHistory.data;
+    const stats = appData.drawStats;
+    const toFrequency = counts => Object.fromEntries(
+        counts.map((count, i) => [(i + 1).toString().padStart(2, '0'), count])
+    );
+
+    if (stats && stats.total_draws === draws.length && stats.latest_period === draws[0]?.period) {
+        const sumTotal = Object.entries(stats.histograms.sum)
+            .reduce((acc, [sum, count]) => acc + parseInt(sum) * count, 0);
+        return {
+            red: toFrequency(stats.all_time.red),
+            blue: toFrequency(stats.all_time.blue),
+            sumTotal
+        };
+    }
+
+    const red = new Array(33).fill(0);
+    const blue = new Array(16).fill(0);
+    let sumTotal = 0;
+    draws.forEach(draw => {
+        draw.red_balls.forEach(ball => {
+            red[parseInt(ball) - 1] += 1;
+            sumTotal += parseInt(ball);
+        });
+        blue[parseInt(draw.blue_ball) - 1] += 1;
+    });
+    return { red: toFrequency(red), blue: toFrequency(blue), sumTotal };
+}
+
 // 渲染频率图表 (分析标签页)
 function renderFrequencyChart() {
     if (!appData.lotteryHistory) return;
@@ -279,17 +466,8 @@ function renderFrequencyChart() {
     const chartEl = document.getElementById('frequencyChart');
     if (!chartEl) return;
 
-    // 计算红球频率
-    const frequency = {};
-    for (let i = 1; i <= 33; i++) {
-        frequency[i.toString().padStart(2, '0')] = 0;
-    }
-
-    appData.lotteryHistory.data.forEach(draw => {
-        draw.red_balls.forEach(ball => {
-            frequency[ball] = (frequency[ball] || 0) + 1;
-        });
-    });
+    // 红球频率
+    const frequency = getAllTimeStats().red;
 
     const labels = Object.keys(frequency).sort();
     const data = labels.map(label => frequency[label]);
@@ -330,32 +508,8 @@ function renderFrequencyChart() {
 function renderStatisticsCards() {
     if (!appData.lotteryHistory) return;
 
-    // 计算红球频率
-    const redFrequency = {};
-    for (let i = 1; i <= 33; i++) {
-        redFrequency[i.toString().padStart(2, '0')] = 0;
-    }
-
-    // 计算蓝球频率
-    const blueFrequency = {};
-    for (let i = 1; i <= 16; i++) {
-        blueFrequency[i.toString().padStart(2, '0')] = 0;
-    }
-
-    // 计算和值
-    let totalSum = 0;
-
-    appData.lotteryHistory.data.forEach(draw => {
-        // 红球
-        draw.red_balls.forEach(ball => {
-            redFrequency[ball] = (redFrequency[ball] || 0) + 1;
-        });
-        // 蓝球
-        blueFrequency[draw.blue_ball] = (blueFrequency[draw.blue_ball] || 0) + 1;
-        // 和值
-        const sum = draw.red_balls.reduce((acc, ball) => acc + parseInt(ball), 0);
-        totalSum += sum;
-    });
+    // 红球、蓝球频率与和值
+    const { red: redFrequency, blue: blueFrequency, sumTotal: totalSum } = getAllTimeStats();
 
     // 找出最热红球
     const hottestRed = Object.entries(redFrequency).sort((a, b) => b[1] - a[1])[0];
@@ -387,15 +541,8 @@ function renderBlueFrequencyChart() {
     const chartEl = document.getElementById('blueFrequencyChart');
     if (!chartEl) return;
 
-    // 计算蓝球频率
-    const frequency = {};
-    for (let i = 1; i <= 16; i++) {
-        frequency[i.toString().padStart(2, '0')] = 0;
-    }
-
-    appData.lotteryHistory.data.forEach(draw => {
-        frequency[draw.blue_ball] = (frequency[draw.blue_ball] || 0) + 1;
-    });
+    // 蓝球频率
+    const frequency = getAllTimeStats().blue;
 
     const labels = Object.keys(frequency).sort();
     const data = labels.map(label => frequency[label]);
@@ -633,6 +780,10 @@ function setupEventListeners() {
     mobileNavItems.forEach(item => {
         item.addEventListener('click', () => handleTabSwitch(item.dataset.tab, mobileNavItems));
     });
+
+    // 历史预测分页
+    const loadMoreEl = document.getElementById('loadMoreHistory');
+    if (loadMoreEl) loadMoreEl.addEventListener('click', loadMoreHistory);
 }
 
 // 处理Tab切换
@@ -666,10 +817,17 @@ function handleTabSwitch(tabName, navItems) {
         }
     });
 
-    // 如果切换到分析Tab，渲染所有图表
+    // 如果切换到分析Tab，加载全部开奖数据后渲染所有图表（预渲染页面可能在数据到达前就被点击）
     if (tabName === 'analysis') {
         // 延迟渲染以确保canvas可见
-        setTimeout(() => renderAllAnalysisCharts(), 100);
+        ensureAllDraws()
+            .then(() => setTimeout(() => renderAllAnalysisCharts(), 100))
+            .catch(error => console.error('开奖数据加载失败:', error));
+    }
+
+    // 历史回溯Tab首次打开时才加载历史预测
+    if (tabName === 'history') {
+        ensureHistoryTab();
     }
 }
 
@@ -3,6 +3,9 @@
  * 负责生成和渲染各种 UI 组件
  */
 
+// 奖级查表（与 prize_engine.PRIZE_TABLE 相同）：PRIZE_TABLE[红球命中数][蓝球命中 0/1] -> 奖级，0 为未中奖
+const PRIZE_TABLE = [[0, 6], [0, 6], [0, 6], [0, 5], [5, 4], [4, 3], [2, 1]];
+
 const Components = {
     /**
      * 创建号码球元素
@@ -57,15 +60,19 @@ const Components = {
         // 清理 model_id 以生成有效的 DOM ID（移除特殊字符）
         const safeModelId = model.model_id.replace(/[^a-zA-Z0-9-_]/g, '-');
 
-        // 计算最佳命中（如果已开奖）
+        // 计算最佳命中（如果已开奖）：与归档的 best_group 相同，命中数相同时奖级高者优先
         let bestHitCount = 0;
         let bestGroupId = null;
+        let bestRank = null;
         if (actualResult) {
             model.predictions.forEach(prediction => {
                 const hitResult = this.compareNumbers(prediction, actualResult);
-                if (hitResult && hitResult.totalHits > bestHitCount) {
+                if (!hitResult || hitResult.totalHits === 0) return;
+                const rank = this.bestGroupRank(hitResult);
+                if (!bestRank || rank[0] > bestRank[0] || (rank[0] === bestRank[0] && rank[1] > bestRank[1])) {
                     bestHitCount = hitResult.totalHits;
                     bestGroupId = prediction.group_id;
+                    bestRank = rank;
                 }
             });
         }
@@ -302,7 +309,9 @@ const Components = {
     createPredictionGroupRow(prediction) {
         const row = document.createElement('div');
         const totalHits = prediction.hit_result?.total_hits || 0;
-        const isWinning = totalHits >= 3;
+        const prizeLevel = prediction.hit_result?.prize_level;
+        // 旧数据没有奖级字段时按命中数判断
+        const isWinning = prizeLevel !== undefined ? prizeLevel > 0 : totalHits >= 3;
 
         row.className = `prediction-group-row${isWinning ? ' winning' : ''}`;
 
@@ -349,6 +358,9 @@ const Components = {
                 <span class="stat-value ${blueHit ? 'blue-hit' : 'no-hit'}">${blueHit ? 1 : 0}</span>
                 <span class="stat-label">蓝</span>
             </div>
+            ${prizeLevel > 0 ? `
+            <div class="stat-divider"></div>
+            <span class="prize-tag" title="${prediction.hit_result.prize_amount}元">${prediction.hit_result.prize_name}</span>` : ''}
         `;
         row.appendChild(stats);
 
@@ -417,7 +429,17 @@ const Components = {
             redHits: redHits,
             redHitCount: redHits.length,
             blueHit: blueHit,
-            totalHits: redHits.length + (blueHit ? 1 : 0)
+            totalHits: redHits.length + (blueHit ? 1 : 0),
+            prizeLevel: PRIZE_TABLE[redHits.length][blueHit ? 1 : 0]
         };
+    },
+
+    /**
+     * 最佳组排序键（与 prize_engine.best_group_rank 相同）
+     * @param {Object} hitResult - compareNumbers 的结果
+     * @returns {number[]} [命中数, 奖级优先级]，逐项比较，越大越好
+     */
+    bestGroupRank(hitResult) {
+        return [hitResult.totalHits, -(hitResult.prizeLevel || 7)];
     }
 };
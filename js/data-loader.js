@@ -1,20 +1,99 @@
 /**
  * 数据加载模块
- * 负责从 JSON 文件加载历史开奖数据和 AI 预测数据
+ * 负责加载历史开奖数据和 AI 预测数据
+ *
+ * 通过 api_server.py 访问时调用 /api/ 接口，只取当前需要的部分（最近几期开奖、当期预测、分页的历史预测），
+ * 服务器负责 ETag 和 gzip；部署在 GitHub Pages 等静态托管上时接口不存在，回退为读取完整的 data/*.json
  */
 
+// 首屏需要的最近开奖期数（上期开奖横幅和已开奖预测的对照）
+const LATEST_DRAWS = 5;
+
 const DataLoader = {
+    // API 是否可用（首次调用时探测一次）
+    _apiAvailable: null,
+    // 静态模式下已下载的完整文件，避免首屏和标签页重复下载
+    _staticFiles: {},
+
+    /**
+     * 探测本地 API 服务器是否可用
+     * @returns {Promise<boolean>}
+     */
+    apiAvailable() {
+        if (this._apiAvailable === null) {
+            this._apiAvailable = fetch('./api/predictions', { method: 'HEAD' })
+                .then(response => response.ok
+                    && (response.headers.get('Content-Type') || '').includes('application/json'))
+                .catch(() => false);
+        }
+        return this._apiAvailable;
+    },
+
+    /**
+     * 请求 JSON
+     * @param {string} url - 请求地址
+     * @returns {Promise<Object>}
+     */
+    async fetchJson(url) {
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return response.json();
+    },
+
     /**
-     * 加载历史开奖数据
+     * 读取完整的静态数据文件（每个文件只下载一次）
+     * @param {string} name - data 目录下的文件名
+     * @returns {Promise<Object>}
+     */
+    loadStaticFile(name) {
+        if (!this._staticFiles[name]) {
+            this._staticFiles[name] = this.fetchJson(`./data/${name}`).catch(error => {
+                // 失败后允许重试
+                delete this._staticFiles[name];
+                throw error;
+            });
+        }
+        return this._staticFiles[name];
+    },
+
+    /**
+     * 有 API 时请求接口，否则读取静态文件
+     * @param {string} apiUrl - 接口地址
+     * @param {string} fileName - 静态文件名
+     * @param {Function} [fromFile] - 从完整文件中取出所需部分
+     * @returns {Promise<Object>}
+     */
+    async load(apiUrl, fileName, fromFile = data => data) {
+        if (await this.apiAvailable()) {
+            return this.fetchJson(apiUrl);
+        }
+        return fromFile(await this.loadStaticFile(fileName));
+    },
+
+    /**
+     * 加载最近几期开奖数据（首屏使用）
+     * @returns {Promise<Object>} 与 lottery_history.json 结构相同，data 只保证包含最近几期
+     */
+    async loadLatestDraws() {
+        try {
+            const data = await this.load(`./api/draws?limit=${LATEST_DRAWS}`, 'lottery_history.json');
+            console.log('最近开奖数据加载成功', data);
+            return data;
+        } catch (error) {
+            console.error('加载最近开奖数据失败:', error);
+            throw error;
+        }
+    },
+
+    /**
+     * 加载全部历史开奖数据（图表分析和历史开奖表格使用）
      * @returns {Promise<Object>} 历史数据对象
      */
     async loadLotteryHistory() {
         try {
-            const response = await fetch('./data/lottery_history.json');
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-            const data = await response.json();
+            const data = await this.load('./api/draws', 'lottery_history.json');
             console.log('历史开奖数据加载成功', data);
             return data;
         } catch (error) {
@@ -29,11 +108,7 @@ const DataLoader = {
      */
     async loadPredictions() {
         try {
-            const response = await fetch('./data/ai_predictions.json');
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-            const data = await response.json();
+            const data = await this.load('./api/predictions', 'ai_predictions.json');
             console.log('AI 预测数据加载成功', data);
             return data;
         } catch (error) {
@@ -43,17 +118,22 @@ const DataLoader = {
     },
 
     /**
-     * 加载历史预测对比数据
-     * @returns {Promise<Object>} 历史预测对比数据对象
+     * 分页加载历史预测对比数据（期号降序）
+     * @param {number} offset - 起始位置
+     * @param {number} limit - 条数
+     * @returns {Promise<Object>} { total, offset, count, predictions_history }
      */
-    async loadPredictionsHistory() {
+    async loadPredictionsHistoryPage(offset, limit) {
         try {
-            const response = await fetch('./data/predictions_history.json');
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-            const data = await response.json();
-            console.log('历史预测对比数据加载成功', data);
+            const data = await this.load(
+                `./api/history?offset=${offset}&limit=${limit}`,
+                'predictions_history.json',
+                file => {
+                    const records = file.predictions_history.slice(offset, offset + limit);
+                    return { total: file.predictions_history.length, offset, count: records.length, predictions_history: records };
+                }
+            );
+            console.log(`历史预测对比数据加载成功 (${data.offset + data.count}/${data.total})`);
             return data;
         } catch (error) {
             console.error('加载历史预测对比数据失败:', error);
@@ -62,25 +142,20 @@ const DataLoader = {
     },
 
     /**
-     * 加载所有数据
-     * @returns {Promise<Object>} 包含历史数据和预测数据的对象
+     * 加载开奖统计状态（由数据更新脚本增量维护）
+     * @returns {Promise<Object|null>} 统计状态，文件缺失或版本不符时返回 null，图表改为现场统计
      */
-    async loadAllData() {
+    async loadDrawStats() {
         try {
-            const [lotteryData, predictionData, predictionsHistoryData] = await Promise.all([
-                this.loadLotteryHistory(),
-                this.loadPredictions(),
-                this.loadPredictionsHistory()
-            ]);
-
-            return {
-                lottery: lotteryData,
-                predictions: predictionData,
-                predictionsHistory: predictionsHistoryData
-            };
+            const response = await fetch('./data/draw_stats.json');
+            if (!response.ok) {
+                return null;
+            }
+            const data = await response.json();
+            return data.version === 1 ? data : null;
         } catch (error) {
-            console.error('加载数据失败:', error);
-            throw error;
+            console.warn('加载开奖统计状态失败，改为现场统计:', error);
+            return null;
         }
     }
 };
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型配置加载
+从 models.json 读取服务商（接口地址、密钥环境变量、并发与限流参数）和模型列表
+
+配置格式：
+    {
+      "providers": {
+        "aihubmix": {"base_url": "...", "base_url_env": "AI_BASE_URL", "api_key_env": "AI_API_KEY",
+                     "max_concurrency": 4, "requests_per_minute": 60}
+      },
+      "models": [
+        {"id": "gpt-4o", "name": "GPT-5", "model_id": "SSB-Team-001", "provider": "aihubmix"}
+      ]
+    }
+
+- 密钥只写环境变量名，不写入配置文件
+- 只有一个服务商时，模型可以省略 provider 字段
+- 环境变量 AI_MODELS_CONFIG 可指定其他配置文件
+
+使用方法：
+    python3 model_roster.py            # 检查配置并列出模型
+    python3 model_roster.py --config my_models.json
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, Any, List, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_CONFIG_FILE = os.path.join(SCRIPT_DIR, "models.json")
+
+# 服务商字段的默认值
+PROVIDER_DEFAULTS = {
+    "base_url": None,
+    "base_url_env": None,
+    "api_key_env": "AI_API_KEY",
+    "max_concurrency": 4,
+    "requests_per_minute": 60,
+    # 是否支持 n 参数一次返回多个候选，不支持时改为并行请求
+    "supports_n": True
+}
+MODEL_FIELDS = ("id", "name", "model_id")
+
+
+def get_config_file() -> str:
+    """配置文件路径，环境变量 AI_MODELS_CONFIG 优先"""
+    return os.environ.get("AI_MODELS_CONFIG") or MODELS_CONFIG_FILE
+
+
+def parse_roster(config: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    校验配置并补全默认值
+
+    Returns:
+        (服务商名称 -> 服务商配置, 模型列表)
+
+    Raises:
+        ValueError: 配置不完整或引用了不存在的服务商
+    """
+    raw_providers = config.get("providers")
+    if not isinstance(raw_providers, dict) or not raw_providers:
+        raise ValueError("模型配置缺少 providers")
+
+    providers = {}
+    for name, raw in raw_providers.items():
+        provider = {**PROVIDER_DEFAULTS, **raw, "name": name}
+        if not provider["base_url"] and not provider["base_url_env"]:
+            raise ValueError(f"服务商 {name} 缺少 base_url 或 base_url_env")
+        for field in ("max_concurrency", "requests_per_minute"):
+            if not isinstance(provider[field], (int, float)) or provider[field] <= 0:
+                raise ValueError(f"服务商 {name} 的 {field} 必须为正数")
+        providers[name] = provider
+
+    raw_models = config.get("models")
+    if not isinstance(raw_models, list) or not raw_models:
+        raise ValueError("模型配置缺少 models")
+
+    models = []
+    seen = set()
+    default_provider = next(iter(providers)) if len(providers) == 1 else None
+    for index, raw in enumerate(raw_models, 1):
+        missing = [field for field in MODEL_FIELDS if not raw.get(field)]
+        if missing:
+            raise ValueError(f"第 {index} 个模型缺少字段: {', '.join(missing)}")
+        if raw["model_id"] in seen:
+            raise ValueError(f"model_id 重复: {raw['model_id']}")
+        seen.add(raw["model_id"])
+
+        if "samples" in raw and (not isinstance(raw["samples"], int) or raw["samples"] < 1):
+            raise ValueError(f"模型 {raw['name']} 的 samples 必须为正整数")
+
+        provider = raw.get("provider") or default_provider
+        if provider not in providers:
+            raise ValueError(f"模型 {raw['name']} 引用了未定义的服务商: {provider}")
+        models.append({**raw, "provider": provider})
+    return providers, models
+
+
+def load_roster(path: Optional[str] = None) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """加载并校验模型配置文件"""
+    path = path or get_config_file()
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_roster(json.load(f))
+
+
+def resolve_endpoint(provider: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """
+    解析服务商的接口地址和密钥（环境变量优先于配置中的 base_url）
+
+    Returns:
+        (base_url, api_key)，密钥环境变量未设置时 api_key 为 None
+    """
+    base_url = (os.environ.get(provider["base_url_env"]) if provider.get("base_url_env") else None) or provider["base_url"]
+    api_key = os.environ.get(provider["api_key_env"]) if provider.get("api_key_env") else None
+    return base_url, api_key
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查模型配置")
+    parser.add_argument("--config", default=None, help="配置文件（默认 models.json 或 AI_MODELS_CONFIG）")
+    args = parser.parse_args(argv)
+
+    path = args.config or get_config_file()
+    try:
+        providers, models = load_roster(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ 模型配置无效: {e}")
+        return 1
+
+    print(f"📄 模型配置: {path}")
+    for name, provider in providers.items():
+        base_url, api_key = resolve_endpoint(provider)
+        key_status = "✓" if api_key else f"✗ 未设置 {provider['api_key_env']}"
+        print(f"\n🏢 {name}: {base_url}")
+        print(f"   并发 {provider['max_concurrency']}，每分钟 {provider['requests_per_minute']} 次，密钥 {key_status}")
+        for model in models:
+            if model["provider"] == name:
+                print(f"   - {model['name']} ({model['id']}, model_id={model['model_id']})")
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
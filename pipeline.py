@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单进程数据流水线：获取开奖 → 归档 → 预测 → 导出
+开奖数据和当期预测在进程内只加载一次，各阶段直接传递内存中的数据，
+不再经由 JSON 文件和两个独立的工作流交接；新开奖出现后同一次运行内即可生成下期预测
+
+阶段与跳过条件（由数据本身判断，不需要额外的状态文件）：
+- fetch: 抓取 500 彩票网并在内存中合并，没有新开奖时不写任何文件；网络或解析失败时沿用现有数据继续后续阶段
+- archive: 当期预测的期号已开奖且尚未归档时写入历史记录，否则跳过；已开奖却未能归档时记为失败
+- predict: ai_predictions.json 已是下期期号且覆盖全部模型时跳过；部分模型缺失时只补调缺失的模型（检查点）；
+  当期预测已开奖但尚未归档时不生成，避免覆盖还没写入历史记录的预测
+- export: 用内存中的数据预渲染 index.html，内容不变时不写入
+
+开奖当晚定时轮询先运行 --check-drawn：今天（北京时间）的开奖已在数据中且下期预测已齐全时，
+工作流跳过本轮，不再安装依赖和抓取网页
+
+使用方法：
+    python3 pipeline.py                  # 完整运行，适合在开奖当晚定时执行
+    python3 pipeline.py --skip-fetch     # 不联网抓取，只用现有开奖数据
+    python3 pipeline.py --skip-predict   # 只更新开奖数据、归档和首屏
+    python3 pipeline.py --force          # 忽略检查点，重新生成当期全部模型的预测
+    python3 pipeline.py --check-drawn    # 今晚的开奖已处理完毕时退出码为 0，否则为 1
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+import generate_ai_prediction as gap
+import history_stream
+import prerender
+from telemetry import PipelineTelemetry
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FETCH_DIR = os.path.join(SCRIPT_DIR, "fetch_history")
+FETCH_OUTPUT_FILE = os.path.join(FETCH_DIR, "lottery_data.json")
+LOTTERY_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "lottery_history.json")
+AI_PREDICTIONS_FILE = os.path.join(SCRIPT_DIR, "data", "ai_predictions.json")
+METRICS_FILE = os.path.join(SCRIPT_DIR, "logs", "prediction_metrics.jsonl")
+
+STAGES = ["fetch", "archive", "predict", "export"]
+BEIJING_TZ = timezone(timedelta(hours=8))
+
+
+def predictions_current(predictions: Optional[Dict[str, Any]], lottery: Optional[Dict[str, Any]],
+                        models: List[Dict[str, Any]]) -> bool:
+    """当期预测是否已是下期期号且覆盖全部模型"""
+    target_period = ((lottery or {}).get("next_draw") or {}).get("next_period")
+    if not predictions or not target_period or predictions.get("target_period") != target_period:
+        return False
+    done = {model.get("model_id") for model in predictions.get("models", [])}
+    return all(model["model_id"] in done for model in models)
+
+
+def draw_done(lottery: Optional[Dict[str, Any]], predictions: Optional[Dict[str, Any]],
+              models: List[Dict[str, Any]], today: str) -> bool:
+    """today 的开奖是否已在开奖数据中，且下期预测已覆盖全部模型（开奖当晚不必再轮询）"""
+    draws = (lottery or {}).get("data") or []
+    return bool(draws) and draws[0].get("date") == today and predictions_current(predictions, lottery, models)
+
+
+def archive_pending(lottery: Optional[Dict[str, Any]], predictions: Optional[Dict[str, Any]]) -> Optional[str]:
+    """当期预测的期号已开奖但历史记录中还没有时返回该期号，否则返回 None"""
+    period = (predictions or {}).get("target_period")
+    draws = (lottery or {}).get("data") or []
+    if not period or not draws or int(period) > int(draws[0]["period"]):
+        return None
+    if history_stream.find_record(gap.PREDICTIONS_HISTORY_FILE, period, newest_first=True):
+        return None
+    return period
+
+
+def fetch_stage(lottery: Optional[Dict[str, Any]], metrics: PipelineTelemetry) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    抓取最新开奖并与内存中的开奖数据合并
+
+    Returns:
+        (开奖数据, 是否有新数据)；没有新数据或抓取失败时返回原数据
+    """
+    with metrics.stage("fetch") as event:
+        if FETCH_DIR not in sys.path:
+            sys.path.insert(0, FETCH_DIR)
+        from fetch_lottery_history import LotteryDataFetcher
+
+        fetcher = LotteryDataFetcher()
+        soup = fetcher.fetch_page(fetcher.base_url)
+        draws = fetcher.parse_lottery_data(soup) if soup else []
+        if not draws:
+            event["status"] = "failed"
+            event["error"] = "获取或解析开奖数据失败"
+            print("  ⚠️  获取开奖数据失败，沿用现有数据继续\n")
+            return lottery, False
+
+        existing = (lottery or {}).get("data", [])
+        merged, new_count = fetcher.merge_data(existing, draws)
+        event["new_draws"] = new_count
+        if merged == existing:
+            event["skipped"] = "没有新开奖"
+            print(f"  ℹ️  没有新开奖数据（最新 {existing[0]['period']}）\n")
+            return lottery, False
+
+        fetcher.backup_existing_file(FETCH_OUTPUT_FILE)
+        formatted = fetcher.write_merged(merged, FETCH_OUTPUT_FILE)
+        if formatted is None:
+            event["status"] = "failed"
+            event["error"] = "同步网页数据失败"
+            return lottery, False
+        print(f"  ✅ 新增 {new_count} 期，最新 {merged[0]['period']}\n")
+        return formatted, True
+
+
+def archive_stage(lottery: Optional[Dict[str, Any]], predictions: Optional[Dict[str, Any]],
+                  metrics: PipelineTelemetry):
+    """归档已开奖的当期预测"""
+    with metrics.stage("archive") as event:
+        if not lottery or not predictions:
+            event["skipped"] = "缺少开奖数据或预测数据"
+            print("  ℹ️  缺少开奖数据或预测数据，跳过归档\n")
+            return
+        record = gap.archive_old_prediction(lottery, predictions, raise_errors=True)
+        if record:
+            event["period"] = record["target_period"]
+            return
+        pending = archive_pending(lottery, predictions)
+        if pending:
+            event["status"] = "failed"
+            event["error"] = f"期号 {pending} 已开奖但未能归档"
+        else:
+            event["skipped"] = "无需归档"
+
+
+def predict_stage(lottery: Optional[Dict[str, Any]], predictions: Optional[Dict[str, Any]],
+                  metrics: PipelineTelemetry, force: bool = False,
+                  samples: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    为下期生成预测并保存
+
+    Returns:
+        当期预测；跳过或生成失败时返回原预测
+    """
+    with metrics.stage("predict") as event:
+        if not lottery:
+            event["status"] = "failed"
+            event["error"] = "缺少开奖数据"
+            print("  ❌ 缺少开奖数据，无法生成预测\n")
+            return predictions
+        # 已开奖的预测必须先写入历史记录，否则保存新预测会把它覆盖掉（--force 也不例外）
+        pending = archive_pending(lottery, predictions)
+        if pending:
+            event["status"] = "failed"
+            event["error"] = f"期号 {pending} 的预测尚未归档，保留现有预测"
+            print(f"  ❌ 期号 {pending} 的预测已开奖但尚未归档，不生成新预测以免覆盖\n")
+            return predictions
+        if not force and predictions_current(predictions, lottery, gap.get_roster()[1]):
+            event["skipped"] = f"{predictions['target_period']} 的预测已是最新"
+            print(f"  ℹ️  期号 {predictions['target_period']} 的预测已覆盖全部模型，跳过\n")
+            return predictions
+
+        result = gap.generate_predictions(metrics, force, samples, lottery_data=lottery, archive=False)
+        if not result:
+            event["status"] = "failed"
+            event["error"] = "没有成功生成任何预测"
+            return predictions
+        gap.save_predictions(result)
+        event["period"] = result["target_period"]
+        event["models"] = len(result["models"])
+        return result
+
+
+def export_stage(lottery: Optional[Dict[str, Any]], predictions: Optional[Dict[str, Any]],
+                 metrics: PipelineTelemetry):
+    """用内存中的数据预渲染首屏"""
+    with metrics.stage("export") as event:
+        if not lottery or not predictions:
+            event["skipped"] = "缺少开奖数据或预测数据"
+            print("  ℹ️  缺少开奖数据或预测数据，跳过预渲染\n")
+            return
+        if prerender.prerender(lottery=lottery, predictions=predictions):
+            print("  ✅ 已更新 index.html 首屏内容\n")
+        else:
+            event["skipped"] = "index.html 无变化"
+            print("  ℹ️  index.html 首屏内容无变化\n")
+
+
+def run_pipeline(metrics: PipelineTelemetry, skip_fetch: bool = False, skip_predict: bool = False,
+                 force: bool = False, samples: Optional[int] = None) -> bool:
+    """
+    依次执行各阶段，单个阶段出错时记录失败并继续后续阶段
+
+    Returns:
+        所有阶段是否都成功（跳过视为成功）
+    """
+    lottery = prerender.load_json(LOTTERY_HISTORY_FILE)
+    predictions = prerender.load_json(AI_PREDICTIONS_FILE)
+
+    print("\n" + "="*50)
+    print("🚀 双色球数据流水线: fetch → archive → predict → export")
+    print("="*50 + "\n")
+
+    if not skip_fetch:
+        print("📡 [fetch] 获取最新开奖数据...")
+        try:
+            lottery, _ = fetch_stage(lottery, metrics)
+        except Exception as e:
+            print(f"  ❌ 获取开奖数据出错: {str(e)}，沿用现有数据继续\n")
+
+    print("📦 [archive] 归档已开奖的预测...")
+    try:
+        archive_stage(lottery, predictions, metrics)
+    except Exception as e:
+        print(f"  ❌ 归档出错: {str(e)}\n")
+
+    if not skip_predict:
+        print("🔮 [predict] 生成下期预测...")
+        try:
+            predictions = predict_stage(lottery, predictions, metrics, force, samples)
+        except Exception as e:
+            print(f"  ❌ 生成预测出错: {str(e)}\n")
+
+    print("🖼️  [export] 预渲染首屏...")
+    try:
+        export_stage(lottery, predictions, metrics)
+    except Exception as e:
+        print(f"  ❌ 预渲染出错: {str(e)}\n")
+
+    print("📋 阶段结果:")
+    for event in metrics.events:
+        if event["stage"] in STAGES:
+            if event["status"] != "ok":
+                outcome = f"❌ {event.get('error', event['status'])}"
+            elif event.get("skipped"):
+                outcome = f"⏭️  跳过（{event['skipped']}）"
+            else:
+                outcome = "✅ 完成"
+            print(f"  {event['stage']:<8} {outcome}  {event['wall_ms'] / 1000:.2f}s")
+    print()
+
+    return all(event["status"] == "ok" for event in metrics.events if event["stage"] in STAGES)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="双色球数据流水线：获取开奖 → 归档 → 预测 → 导出")
+    parser.add_argument("--skip-fetch", action="store_true", help="不联网抓取开奖数据")
+    parser.add_argument("--skip-predict", action="store_true", help="不生成预测")
+    parser.add_argument("--force", action="store_true",
+                        help="即使当期预测已是最新也重新生成，并忽略检查点")
+    parser.add_argument("--samples", type=int, default=None,
+                        help="每个模型一次取回的候选数（同 generate_ai_prediction.py）")
+    parser.add_argument("--metrics-file", default=METRICS_FILE,
+                        help="运行指标 JSONL 文件路径（追加写入）")
+    parser.add_argument("--check-drawn", action="store_true",
+                        help="不运行任何阶段，只检查今天（北京时间）的开奖是否已获取且下期预测已齐全")
+    args = parser.parse_args(argv)
+    if args.samples is not None and args.samples < 1:
+        parser.error("--samples 必须大于等于 1")
+
+    if args.check_drawn:
+        today = datetime.now(BEIJING_TZ).strftime("%Y-%m-%d")
+        lottery = prerender.load_json(LOTTERY_HISTORY_FILE)
+        if draw_done(lottery, prerender.load_json(AI_PREDICTIONS_FILE), gap.get_roster()[1], today):
+            print(f"✅ {today} 的开奖 {lottery['data'][0]['period']} 已获取，下期预测已齐全")
+            return 0
+        print(f"ℹ️  {today} 的开奖尚未处理完毕")
+        return 1
+
+    metrics = PipelineTelemetry()
+    try:
+        ok = run_pipeline(metrics, args.skip_fetch, args.skip_predict, args.force, args.samples)
+    finally:
+        metrics.write_jsonl(args.metrics_file)
+        metrics.print_summary()
+        print(f"📈 运行指标已追加到: {args.metrics_file}\n")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+AI 预测数据验证与修复
+单次遍历检查每组号码的范围、补零、重复、排序和 group_id 连续性，返回带错误码的问题列表；
+对可恢复的问题（排序、补零、去重补号、重新编号、字段回填）进行确定性修复，
+避免因为个别格式问题丢弃整个模型的输出或重新调用 API
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple, NamedTuple
+
+GROUP_COUNT = 5
+RED_COUNT = 6
+RED_RANGE = (1, 33)
+BLUE_RANGE = (1, 16)
+REQUIRED_FIELDS = ["prediction_date", "target_period", "model_id", "model_name", "predictions"]
+
+# 规范格式：两位数字字符串
+RED_PATTERN = re.compile(r"^(0[1-9]|[12][0-9]|3[0-3])$")
+BLUE_PATTERN = re.compile(r"^(0[1-9]|1[0-6])$")
+NUMBER_PATTERN = re.compile(r"^\s*0*(\d{1,2})\s*$")
+
+# 错误码
+MISSING_FIELD = "MISSING_FIELD"        # 缺少必需字段
+FIELD_MISMATCH = "FIELD_MISMATCH"      # 期号/模型等字段与本次任务不一致
+GROUP_COUNT_ERROR = "GROUP_COUNT"      # 预测组数量不是 5
+GROUP_FORMAT = "GROUP_FORMAT"          # 预测组结构错误
+GROUP_ID = "GROUP_ID"                  # group_id 不是从 1 开始连续编号
+RED_COUNT_ERROR = "RED_COUNT"          # 红球数量不是 6
+RED_FORMAT = "RED_FORMAT"              # 红球不是数字
+RED_PADDING = "RED_PADDING"            # 红球未补零（如 "5"）
+RED_RANGE_ERROR = "RED_RANGE"          # 红球超出 01-33
+RED_DUPLICATE = "RED_DUPLICATE"        # 红球重复
+RED_UNSORTED = "RED_UNSORTED"          # 红球未排序
+BLUE_MISSING = "BLUE_MISSING"          # 蓝球为空
+BLUE_FORMAT = "BLUE_FORMAT"            # 蓝球不是数字
+BLUE_PADDING = "BLUE_PADDING"          # 蓝球未补零
+BLUE_RANGE_ERROR = "BLUE_RANGE"        # 蓝球超出 01-16
+
+
+class Issue(NamedTuple):
+    """验证问题"""
+    code: str
+    group: Optional[int]
+    message: str
+
+    def __str__(self):
+        where = f"第 {self.group} 组 " if self.group is not None else ""
+        return f"[{self.code}] {where}{self.message}"
+
+
+def parse_number(value: Any) -> Optional[int]:
+    """将 5 / "5" / "05" / " 05 " 解析为整数，无法解析返回 None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        match = NUMBER_PATTERN.match(value)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def _check_ball(value: Any, pattern, number_range, codes, group, issues) -> Optional[int]:
+    """检查单个号码，返回解析后的整数（无效时为 None）"""
+    format_code, padding_code, range_code = codes
+    if isinstance(value, str) and pattern.match(value):
+        return int(value)
+
+    number = parse_number(value)
+    if number is None:
+        issues.append(Issue(format_code, group, f"号码格式错误: {value!r}"))
+    elif not number_range[0] <= number <= number_range[1]:
+        issues.append(Issue(range_code, group, f"号码超出范围 {number_range[0]:02d}-{number_range[1]:02d}: {value!r}"))
+        return None
+    else:
+        issues.append(Issue(padding_code, group, f"号码应为两位数字字符串: {value!r}"))
+    return number
+
+
+def validate(prediction: Dict[str, Any], expected: Optional[Dict[str, str]] = None) -> List[Issue]:
+    """
+    验证预测数据，返回全部问题（空列表表示通过）
+
+    Args:
+        prediction: 单个模型的预测数据
+        expected: 本次任务的期望字段值（target_period、model_id 等），不传则只检查存在性
+    """
+    issues: List[Issue] = []
+    if not isinstance(prediction, dict):
+        return [Issue(GROUP_FORMAT, None, "预测数据不是 JSON 对象")]
+
+    for field in REQUIRED_FIELDS:
+        if field not in prediction:
+            issues.append(Issue(MISSING_FIELD, None, f"缺少字段: {field}"))
+    for field, value in (expected or {}).items():
+        if field in prediction and prediction[field] != value:
+            issues.append(Issue(FIELD_MISMATCH, None, f"{field} 应为 {value!r}，实际为 {prediction[field]!r}"))
+
+    groups = prediction.get("predictions")
+    if not isinstance(groups, list):
+        if "predictions" in prediction:
+            issues.append(Issue(GROUP_FORMAT, None, "predictions 不是列表"))
+        return issues
+    if len(groups) != GROUP_COUNT:
+        issues.append(Issue(GROUP_COUNT_ERROR, None, f"预测组数量不正确: {len(groups)}"))
+
+    red_codes = (RED_FORMAT, RED_PADDING, RED_RANGE_ERROR)
+    blue_codes = (BLUE_FORMAT, BLUE_PADDING, BLUE_RANGE_ERROR)
+    for index, group in enumerate(groups, start=1):
+        if not isinstance(group, dict) or not isinstance(group.get("red_balls"), list):
+            issues.append(Issue(GROUP_FORMAT, index, "缺少 red_balls 列表"))
+            continue
+        if group.get("group_id") != index:
+            issues.append(Issue(GROUP_ID, index, f"group_id 应为 {index}，实际为 {group.get('group_id')!r}"))
+
+        reds = group["red_balls"]
+        if len(reds) != RED_COUNT:
+            issues.append(Issue(RED_COUNT_ERROR, index, f"红球数量不正确: {len(reds)}"))
+
+        # 单次遍历：格式、范围、补零、重复、排序
+        seen = set()
+        previous = 0
+        unsorted = False
+        for value in reds:
+            number = _check_ball(value, RED_PATTERN, RED_RANGE, red_codes, index, issues)
+            if number is None:
+                continue
+            if number in seen:
+                issues.append(Issue(RED_DUPLICATE, index, f"红球重复: {number:02d}"))
+            seen.add(number)
+            if number < previous:
+                unsorted = True
+            previous = max(previous, number)
+        if unsorted:
+            issues.append(Issue(RED_UNSORTED, index, f"红球未排序: {reds}"))
+
+        blue = group.get("blue_ball")
+        if blue in (None, ""):
+            issues.append(Issue(BLUE_MISSING, index, "蓝球为空"))
+        else:
+            _check_ball(blue, BLUE_PATTERN, BLUE_RANGE, blue_codes, index, issues)
+
+    return issues
+
+
+def _candidate_ranking(groups: List[Any], key: str, number_range: Tuple[int, int]) -> List[int]:
+    """
+    模型自身的候选得分：号码在该模型全部预测组中出现的次数
+    按 (次数降序, 号码升序) 排列，保证修复结果确定
+    """
+    counts: Counter = Counter()
+    for group in groups:
+        if not isinstance(group, dict):
+            continue
+        values = group.get(key)
+        values = values if isinstance(values, list) else [values]
+        for value in values:
+            number = parse_number(value)
+            if number is not None and number_range[0] <= number <= number_range[1]:
+                counts[number] += 1
+    return sorted(counts, key=lambda n: (-counts[n], n))
+
+
+def repair(prediction: Dict[str, Any], expected: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, Any], List[str], List[Issue]]:
+    """
+    确定性修复预测数据
+
+    - 字段缺失或不一致：用 expected 回填
+    - 预测组多于 5 组：保留前 5 组；group_id 重新编号
+    - 号码补零、排序；去掉重复和超范围的红球，再按模型自身候选得分补足 6 个
+    - 红球多于 6 个：保留候选得分最高的 6 个
+    - 蓝球缺失或无效：使用该模型最常选的有效蓝球
+
+    Returns:
+        (修复后的副本, 已应用的修复错误码列表, 修复后仍存在的问题)
+    """
+    issues = validate(prediction, expected)
+    if not issues or not isinstance(prediction, dict):
+        return prediction, [], issues
+
+    repaired = dict(prediction)
+    fixed_codes = {issue.code for issue in issues}
+
+    for field, value in (expected or {}).items():
+        repaired[field] = value
+
+    groups = prediction.get("predictions")
+    if isinstance(groups, list):
+        red_ranking = _candidate_ranking(groups, "red_balls", RED_RANGE)
+        blue_ranking = _candidate_ranking(groups, "blue_ball", BLUE_RANGE)
+        red_rank = {n: i for i, n in enumerate(red_ranking)}
+
+        new_groups = []
+        for index, group in enumerate(groups[:GROUP_COUNT], start=1):
+            if not isinstance(group, dict) or not isinstance(group.get("red_balls"), list):
+                new_groups.append(group)
+                continue
+            group = dict(group)
+            group["group_id"] = index
+
+            reds = []
+            for value in group["red_balls"]:
+                number = parse_number(value)
+                if number is not None and RED_RANGE[0] <= number <= RED_RANGE[1] and number not in reds:
+                    reds.append(number)
+            if len(reds) > RED_COUNT:
+                reds = sorted(reds, key=lambda n: red_rank.get(n, len(red_rank)))[:RED_COUNT]
+            for number in red_ranking:
+                if len(reds) >= RED_COUNT:
+                    break
+                if number not in reds:
+                    reds.append(number)
+            group["red_balls"] = [f"{n:02d}" for n in sorted(reds)]
+
+            blue = parse_number(group.get("blue_ball"))
+            if blue is None or not BLUE_RANGE[0] <= blue <= BLUE_RANGE[1]:
+                blue = blue_ranking[0] if blue_ranking else None
+            if blue is not None:
+                group["blue_ball"] = f"{blue:02d}"
+
+            new_groups.append(group)
+        repaired["predictions"] = new_groups
+
+    remaining = validate(repaired, expected)
+    remaining_codes = {issue.code for issue in remaining}
+    return repaired, sorted(fixed_codes - remaining_codes), remaining
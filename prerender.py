@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+首屏预渲染
+构建时把当期 Hero Banner、上期开奖和各模型预测卡片渲染为静态 HTML 写入 index.html，
+首屏不再依赖 JSON 下载和脚本渲染；前端加载数据后只在预渲染内容过期时重新渲染，
+历史预测（predictions_history.json）在切换到历史回溯标签时才加载
+
+实现：
+- index.html 中的预渲染区域用 <!-- prerender:名称 --> ... <!-- /prerender:名称 --> 标记，每次整体替换，可重复运行
+- Hero Banner 中带 id 的文本元素（期号、日期等）直接替换文本；倒计时随日期变化，只写入固定占位文字，
+  由 app.js 按浏览器当天日期计算，页面内容只随数据变化，定时任务不会因为日期变化而提交
+- 卡片结构与 js/components.js 的 createModelCard 一致（预测期号已开奖时同样标出命中号码和最佳组）
+- <script id="prerenderState"> 记录渲染时的期号、预测日期和模型，前端据此判断预渲染内容是否仍然有效
+- <body class="prerendered"> 让 CSS 直接显示主界面，不显示加载屏幕
+
+使用方法：
+    python3 prerender.py             # 生成预测或更新开奖数据后运行
+    python3 prerender.py --check     # 检查 index.html 是否为最新，过期时以非零状态退出
+    python3 prerender.py --clear     # 清除预渲染内容，恢复为纯前端渲染
+"""
+
+import argparse
+import json
+import os
+import re
+from html import escape
+from typing import Dict, Any, List, Optional
+
+import prize_engine
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE = os.path.join(SCRIPT_DIR, "index.html")
+LOTTERY_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "lottery_history.json")
+AI_PREDICTIONS_FILE = os.path.join(SCRIPT_DIR, "data", "ai_predictions.json")
+
+# 倒计时的固定占位文字（天数由 app.js 加载后计算）
+COUNTDOWN_PLACEHOLDER = "开奖倒计时"
+
+BRAIN_ICON = ('<path d="M12 5a3 3 0 1 0-5.997.125 4 4 0 0 0-2.526 5.77 4 4 0 0 0 .556 6.588A4 4 0 1 0 12 18Z"/>'
+              '<path d="M12 5a3 3 0 1 1 5.997.125 4 4 0 0 1 2.526 5.77 4 4 0 0 1-.556 6.588A4 4 0 1 1 12 18Z"/>'
+              '<path d="M15 13a4.5 4.5 0 0 1-3-4 4.5 4.5 0 0 1-3 4"/><path d="M17.599 6.5a3 3 0 0 0 .399-1.375"/>'
+              '<path d="M6.003 5.125A3 3 0 0 0 6.401 6.5"/><path d="M3.477 10.896a4 4 0 0 1 .585-.396"/>'
+              '<path d="M19.938 10.5a4 4 0 0 1 .585.396"/><path d="M6 18a4 4 0 0 1-1.967-.516"/>'
+              '<path d="M19.967 17.484A4 4 0 0 1 18 18"/>')
+TICKET_ICON = ('<path d="M2 9a3 3 0 0 1 0 6v2a2 2 0 0 0 2 2h16a2 2 0 0 0 2-2v-2a3 3 0 0 1 0-6V7a2 2 0 0 0-2-2H4a2 2 0 0 0-2 2Z"/>'
+               '<path d="M13 5v2"/><path d="M13 17v2"/><path d="M13 11v2"/>')
+STAR_ICON = ('<polygon points="12 2 15.09 8.26 22 9.27 17 14.14 18.18 21.02 12 17.77 5.82 21.02 7 14.14 2 9.27 '
+             '8.91 8.26 12 2"></polygon>')
+CHECK_ICON = '<path d="M22 11.08V12a10 10 0 1 1-5.93-9.14"/><polyline points="22 4 12 14.01 9 11.01"/>'
+TROPHY_ICON = ('<path d="M6 9H4.5a2.5 2.5 0 0 1 0-5H6"/><path d="M18 9h1.5a2.5 2.5 0 0 0 0-5H18"/><path d="M4 22h16"/>'
+               '<path d="M18 2H6v7a6 6 0 0 0 12 0V2Z"/>')
+
+
+def load_json(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_numbers(group: Dict[str, Any], actual: Dict[str, Any]) -> Dict[str, Any]:
+    """与 Components.compareNumbers 相同的命中计算（含奖级）"""
+    red_hits = [ball for ball in group["red_balls"] if ball in actual["red_balls"]]
+    blue_hit = group["blue_ball"] == actual["blue_ball"]
+    return {"red_hits": red_hits, "blue_hit": blue_hit, "total_hits": len(red_hits) + (1 if blue_hit else 0),
+            "prize_level": prize_engine.prize_level(len(red_hits), blue_hit)}
+
+
+def header_class(model_name: str) -> str:
+    """与 Components.getModelHeaderClass 相同"""
+    for keyword, css in (("GPT", "gpt"), ("Claude", "claude"), ("DeepSeek", "deepseek"), ("Gemini", "gemini")):
+        if keyword in model_name:
+            return f"model-header-{css}"
+    return "model-header-gpt"
+
+
+def render_ball(number: str, color: str, hit: bool = False) -> str:
+    return f'<div class="lottery-ball {color} size-md{" hit" if hit else ""}"><span>{escape(number)}</span></div>'
+
+
+def render_strategy_row(group: Dict[str, Any], is_last: bool, actual: Optional[Dict[str, Any]], is_best: bool) -> str:
+    hit = compare_numbers(group, actual) if actual else None
+    stats = ""
+    if hit:
+        stats = (f'<div class="strategy-hit-stats"><span class="hit-stat red">{len(hit["red_hits"])}红</span>'
+                 f'<span class="hit-stat {"blue" if hit["blue_hit"] else "miss"}">{1 if hit["blue_hit"] else 0}蓝</span></div>')
+    balls = "".join(render_ball(ball, "red", bool(hit) and ball in hit["red_hits"]) for ball in group["red_balls"])
+    balls += '<div class="ball-divider"></div>' + render_ball(group["blue_ball"], "blue", bool(hit) and hit["blue_hit"])
+    separator = "" if is_last else '<div class="strategy-separator"></div>'
+    return (
+        '<div class="strategy-row">'
+        '<div class="strategy-header"><div class="strategy-label-row">'
+        f'<div class="strategy-group-badge{" best" if is_best else ""}">{"★ " if is_best else ""}G-{group["group_id"]}</div>'
+        f'<span class="strategy-name">{escape(str(group.get("strategy", "")))}</span>{stats}'
+        '</div></div>'
+        f'<div class="strategy-balls">{balls}</div>'
+        f'<p class="strategy-description">{escape(str(group.get("description", "")))}</p>'
+        f'{separator}'
+        '</div>'
+    )
+
+
+def render_model_card(model: Dict[str, Any], actual: Optional[Dict[str, Any]] = None) -> str:
+    """单个模型的预测卡片"""
+    best_hits, best_group, best_rank = 0, None, None
+    if actual:
+        # 与归档的 best_group 相同的规则：命中数相同时奖级高者优先
+        for group in model["predictions"]:
+            hit = compare_numbers(group, actual)
+            rank = prize_engine.best_group_rank(hit)
+            if hit["total_hits"] and (best_rank is None or rank > best_rank):
+                best_hits, best_group, best_rank = hit["total_hits"], group["group_id"], rank
+
+    badge = ""
+    if actual and best_hits > 0:
+        badge = (f'<div class="model-best-hit-badge"><svg viewBox="0 0 24 24" fill="currentColor">{STAR_ICON}</svg>'
+                 f'<span>最佳 {best_hits} 中</span></div>')
+    groups = model["predictions"]
+    rows = "".join(render_strategy_row(group, i == len(groups) - 1, actual, bool(actual) and group["group_id"] == best_group)
+                   for i, group in enumerate(groups))
+    safe_id = re.sub(r"[^a-zA-Z0-9-_]", "-", model["model_id"])
+    return (
+        '<div class="model-card">'
+        f'<div class="model-card-header {header_class(model["model_name"])}">'
+        '<div class="model-card-header-left">'
+        f'<div class="model-icon-box"><svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">{BRAIN_ICON}</svg></div>'
+        f'<div class="model-name-wrapper"><h3>{escape(model["model_name"])}</h3>'
+        f'<div class="model-id"><span>ID: {escape(model["model_id"])}</span></div></div>'
+        '</div>'
+        f'<div class="model-card-header-right">{badge}'
+        f'<div class="model-card-ticket-icon"><svg viewBox="0 0 24 24" fill="none" stroke="currentColor">{TICKET_ICON}</svg></div>'
+        '</div></div>'
+        f'<div class="model-card-content"><div class="strategy-group" id="strategies-{safe_id}">{rows}</div></div>'
+        '</div>'
+    )
+
+
+def mini_balls(draw: Dict[str, Any]) -> str:
+    return ("".join(f'<span class="mini-result-ball red">{escape(ball)}</span>' for ball in draw["red_balls"])
+            + f'<span class="mini-result-ball blue">{escape(draw["blue_ball"])}</span>')
+
+
+def render_drawn_banner(actual: Dict[str, Any]) -> str:
+    """预测期号已开奖时模型网格前的状态横幅（与 app.js 的 createDrawnStatusBanner 一致）"""
+    return (
+        '<div class="drawn-status-banner">'
+        f'<div class="drawn-status-icon"><svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">{CHECK_ICON}</svg></div>'
+        f'<div class="drawn-status-content"><h3 class="drawn-status-title">第 {escape(actual["period"])} 期已开奖</h3>'
+        '<p class="drawn-status-subtitle">以下为预测命中情况对比</p></div>'
+        f'<div class="drawn-status-balls">{mini_balls(actual)}</div>'
+        '</div>'
+    )
+
+
+def render_latest_draw(draw: Dict[str, Any]) -> str:
+    """上期开奖横幅（与 app.js 的 createLatestDrawBanner 一致）"""
+    return (
+        '<div class="drawn-status-banner latest-draw-banner">'
+        f'<div class="drawn-status-icon"><svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">{TROPHY_ICON}</svg></div>'
+        f'<div class="drawn-status-content"><h3 class="drawn-status-title">第 {escape(draw["period"])} 期开奖号码</h3>'
+        f'<p class="drawn-status-subtitle">{escape(draw.get("date", ""))}</p></div>'
+        f'<div class="drawn-status-balls">{mini_balls(draw)}</div>'
+        '</div>'
+    )
+
+
+def render_models_grid(predictions: Dict[str, Any], draws: List[Dict[str, Any]]) -> str:
+    """模型网格内容（与 app.js 的 renderModelsGrid 一致）"""
+    target = predictions["target_period"]
+    actual = None
+    if draws and int(target) <= int(draws[0]["period"]):
+        actual = next((draw for draw in draws if draw["period"] == target), None)
+    parts = [render_drawn_banner(actual)] if actual else []
+    parts += [render_model_card(model, actual) for model in predictions.get("models", [])]
+    return "".join(parts)
+
+
+def build_state(lottery: Dict[str, Any], predictions: Dict[str, Any]) -> Dict[str, Any]:
+    """预渲染状态，前端与加载到的数据比较，一致时不重新渲染"""
+    draws = lottery.get("data", [])
+    return {
+        "next_period": lottery["next_draw"]["next_period"],
+        "next_date": lottery["next_draw"]["next_date"],
+        "latest_period": draws[0]["period"] if draws else None,
+        "target_period": predictions["target_period"],
+        "prediction_date": predictions["prediction_date"],
+        "model_ids": [model["model_id"] for model in predictions.get("models", [])]
+    }
+
+
+def replace_region(html: str, name: str, content: str) -> str:
+    """替换 <!-- prerender:name --> 与 <!-- /prerender:name --> 之间的内容"""
+    pattern = re.compile(rf"(<!-- prerender:{name} -->).*?(<!-- /prerender:{name} -->)", re.S)
+    if not pattern.search(html):
+        raise ValueError(f"index.html 缺少预渲染标记: prerender:{name}")
+    return pattern.sub(lambda m: m.group(1) + content + m.group(2), html, count=1)
+
+
+def replace_text(html: str, element_id: str, text: str) -> str:
+    """替换带 id 的叶子元素的文本"""
+    pattern = re.compile(rf'(<(\w+)[^>]*\bid="{element_id}"[^>]*>)[^<]*(</\2>)')
+    if not pattern.search(html):
+        raise ValueError(f"index.html 缺少元素: #{element_id}")
+    return pattern.sub(lambda m: m.group(1) + text + m.group(3), html, count=1)
+
+
+def set_prerendered(html: str, enabled: bool) -> str:
+    return re.sub(r"<body[^>]*>", '<body class="prerendered">' if enabled else "<body>", html, count=1)
+
+
+def render_index(html: str, lottery: Dict[str, Any], predictions: Dict[str, Any]) -> str:
+    """把首屏内容渲染进 index.html 文本（结果只取决于数据，与渲染日期无关）"""
+    next_draw = lottery["next_draw"]
+    draws = lottery.get("data", [])
+
+    html = replace_text(html, "heroPeriod", escape(next_draw["next_period"]))
+    html = replace_text(html, "heroDateDisplay", escape(next_draw["next_date_display"]))
+    html = replace_text(html, "heroDrawTime", escape(f"{next_draw['draw_time']} 开奖"))
+    html = replace_text(html, "heroPredictionDate", escape(predictions["prediction_date"]))
+    html = replace_text(html, "heroCountdown", COUNTDOWN_PLACEHOLDER)
+    html = replace_region(html, "latest-draw", render_latest_draw(draws[0]) if draws else "")
+    html = replace_region(html, "models", render_models_grid(predictions, draws))
+    state = json.dumps(build_state(lottery, predictions), ensure_ascii=False).replace("</", "<\\/")
+    html = replace_text(html, "prerenderState", state)
+    return set_prerendered(html, True)
+
+
+def clear_index(html: str) -> str:
+    """清除预渲染内容，恢复为由前端脚本渲染的空白模板"""
+    for element_id in ("heroPeriod", "heroDateDisplay", "heroPredictionDate", "prerenderState"):
+        html = replace_text(html, element_id, "-" if element_id != "prerenderState" else "")
+    html = replace_region(html, "latest-draw", "")
+    html = replace_region(html, "models", "")
+    return set_prerendered(html, False)
+
+
+def write_if_changed(path: str, html: str) -> bool:
+    with open(path, 'r', encoding='utf-8') as f:
+        if f.read() == html:
+            return False
+    tmp_file = path + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+    os.replace(tmp_file, path)
+    return True
+
+
+def prerender(index_file: str = INDEX_FILE, lottery_file: str = LOTTERY_HISTORY_FILE,
+              predictions_file: str = AI_PREDICTIONS_FILE,
+              lottery: Optional[Dict[str, Any]] = None, predictions: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    预渲染 index.html
+
+    Args:
+        lottery / predictions: 已在内存中的数据（流水线传入），None 时从对应文件加载
+
+    Returns:
+        index.html 是否有变化；缺少数据文件时不修改并返回 False
+    """
+    lottery = lottery or load_json(lottery_file)
+    predictions = predictions or load_json(predictions_file)
+    if not lottery or not predictions:
+        print("⚠️  缺少开奖数据或预测数据，跳过预渲染")
+        return False
+    with open(index_file, 'r', encoding='utf-8') as f:
+        html = render_index(f.read(), lottery, predictions)
+    return write_if_changed(index_file, html)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把首屏内容预渲染到 index.html")
+    parser.add_argument("--index", default=INDEX_FILE, help="页面文件")
+    parser.add_argument("--lottery", default=LOTTERY_HISTORY_FILE, help="开奖数据文件")
+    parser.add_argument("--predictions", default=AI_PREDICTIONS_FILE, help="预测数据文件")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--check", action="store_true", help="只检查是否为最新")
+    group.add_argument("--clear", action="store_true", help="清除预渲染内容")
+    args = parser.parse_args(argv)
+
+    with open(args.index, 'r', encoding='utf-8') as f:
+        current = f.read()
+
+    if args.clear:
+        changed = write_if_changed(args.index, clear_index(current))
+        print("✅ 已清除预渲染内容" if changed else "ℹ️  没有预渲染内容")
+        return 0
+
+    if args.check:
+        lottery, predictions = load_json(args.lottery), load_json(args.predictions)
+        if not lottery or not predictions:
+            print("❌ 缺少开奖数据或预测数据")
+            return 1
+        if render_index(current, lottery, predictions) != current:
+            print("❌ index.html 的预渲染内容已过期，运行 python3 prerender.py 更新")
+            return 1
+        print("✅ index.html 的预渲染内容为最新")
+        return 0
+
+    changed = prerender(args.index, args.lottery, args.predictions)
+    state = "已更新" if changed else "无变化"
+    print(f"✅ 首屏预渲染{state}: {args.index}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
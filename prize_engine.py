@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+双色球奖级计算引擎
+将 (红球命中数, 蓝球是否命中) 映射为一等奖~六等奖，并对任意投注组合精确计算各奖级概率与期望奖金
+
+实现：
+- 奖级查表 PRIZE_TABLE[红球命中数][蓝球命中] -> 奖级（0 表示未中奖）
+- 单注概率按组合数精确计算：C(6,k)·C(27,6-k)/C(33,6) × 蓝球 1/16 或 15/16
+- 多注组合的"最高奖级"分布：只枚举开奖红球与所有投注红球并集 U 的交集 S（|S| ≤ 6），
+  每个 S 对应 C(33-|U|, 6-|S|) 种开奖红球；蓝球只区分投注中出现过的号码，其余蓝球合并计算。
+  全部以整数计数累加，最后除以总组合数 C(33,6)×16，结果为精确分数，无需模拟
+- 期望奖金按期望的线性性逐注相加（每注独立兑奖）
+- 历史批量评分：红球预先转为 33 位掩码，命中数为 (a & b).bit_count()，再查表得到奖级
+- 命中结果：score_models 为同一期的多个模型批量生成 hit_result 和最佳组，开奖号码每期只处理一次，
+  归档、回测、重新计分和批量导入共用这一份计分逻辑
+
+使用方法：
+    python3 prize_engine.py                    # 单注理论概率 + 历史预测奖级汇总
+    python3 prize_engine.py --tickets          # 当期各模型 5 组预测的中奖概率与期望奖金
+"""
+
+import argparse
+import json
+import os
+from fractions import Fraction
+from itertools import combinations
+from math import comb
+from typing import Dict, Any, List, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+AI_PREDICTIONS_FILE = os.path.join(SCRIPT_DIR, "data", "ai_predictions.json")
+PREDICTIONS_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "predictions_history.json")
+
+RED_TOTAL = 33
+RED_PICK = 6
+BLUE_TOTAL = 16
+TICKET_PRICE = 2
+TOTAL_OUTCOMES = comb(RED_TOTAL, RED_PICK) * BLUE_TOTAL
+
+# 奖级 -> (名称, 奖金)；一、二等奖为浮动奖，按估算值计入期望奖金
+PRIZE_TIERS = {
+    1: ("一等奖", 5000000),
+    2: ("二等奖", 150000),
+    3: ("三等奖", 3000),
+    4: ("四等奖", 200),
+    5: ("五等奖", 10),
+    6: ("六等奖", 5)
+}
+FLOATING_TIERS = {1, 2}
+NO_PRIZE_NAME = "未中奖"
+
+# PRIZE_TABLE[红球命中数][蓝球命中 0/1] -> 奖级
+PRIZE_TABLE = [[0, 6], [0, 6], [0, 6], [0, 5], [5, 4], [4, 3], [2, 1]]
+
+
+def prize_level(red_hit_count: int, blue_hit: bool) -> int:
+    """奖级（1~6），未中奖返回 0"""
+    return PRIZE_TABLE[red_hit_count][1 if blue_hit else 0]
+
+
+def prize_info(red_hit_count: int, blue_hit: bool) -> Dict[str, Any]:
+    """奖级、名称和奖金，用于写入 hit_result"""
+    level = prize_level(red_hit_count, blue_hit)
+    name, amount = PRIZE_TIERS.get(level, (NO_PRIZE_NAME, 0))
+    return {"prize_level": level, "prize_name": name, "prize_amount": amount}
+
+
+def best_group_rank(hit: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    最佳组排序键：命中数多者优先，命中数相同时奖级高者优先（如 2+1 六等奖优于 3+0 未中奖）
+
+    归档的 best_group、页面卡片和预渲染的「最佳」标记都按此规则选择，并列时取靠前的组
+    """
+    return hit["total_hits"], -(hit["prize_level"] or len(PRIZE_TIERS) + 1)
+
+
+def hit_result(group: Dict[str, Any], actual_reds, actual_blue: str) -> Dict[str, Any]:
+    """
+    计算单组预测的命中结果（含奖级）
+
+    Args:
+        group: 预测组（red_balls、blue_ball）
+        actual_reds: 开奖红球（列表或集合，批量计分时由调用方复用同一个集合）
+        actual_blue: 开奖蓝球
+    """
+    red_hits = [ball for ball in group["red_balls"] if ball in actual_reds]
+    blue_hit = group["blue_ball"] == actual_blue
+    return {
+        "red_hits": red_hits,
+        "red_hit_count": len(red_hits),
+        "blue_hit": blue_hit,
+        "total_hits": len(red_hits) + (1 if blue_hit else 0),
+        **prize_info(len(red_hits), blue_hit)
+    }
+
+
+def score_models(models: List[Dict[str, Any]], actual_result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    为同一期的多个模型计算每组的命中结果和最佳组
+
+    Args:
+        models: 模型预测数据（model_id、model_name、predictions）
+        actual_result: 该期开奖结果
+
+    Returns:
+        历史记录中的模型条目列表，顺序与 models 相同
+    """
+    actual_reds = set(actual_result["red_balls"])
+    actual_blue = actual_result["blue_ball"]
+
+    entries = []
+    for model_data in models:
+        groups = [{**group, "hit_result": hit_result(group, actual_reds, actual_blue)}
+                  for group in model_data.get("predictions", [])]
+
+        best = max(groups, key=lambda g: best_group_rank(g["hit_result"]))
+        entries.append({
+            "model_id": model_data.get("model_id"),
+            "model_name": model_data.get("model_name"),
+            "predictions": groups,
+            "best_group": best.get("group_id"),
+            "best_hit_count": best["hit_result"]["total_hits"]
+        })
+    return entries
+
+
+def to_mask(balls) -> int:
+    """红球列表 -> 位掩码（bit n-1 表示号码 n）"""
+    mask = 0
+    for ball in balls:
+        mask |= 1 << (int(ball) - 1)
+    return mask
+
+
+def single_ticket_distribution() -> Dict[int, Fraction]:
+    """单注各奖级的精确概率（0 为未中奖）"""
+    red_ways = comb(RED_TOTAL, RED_PICK)
+    probabilities = {level: Fraction(0) for level in range(7)}
+    for k in range(RED_PICK + 1):
+        p_red = Fraction(comb(RED_PICK, k) * comb(RED_TOTAL - RED_PICK, RED_PICK - k), red_ways)
+        probabilities[prize_level(k, True)] += p_red * Fraction(1, BLUE_TOTAL)
+        probabilities[prize_level(k, False)] += p_red * Fraction(BLUE_TOTAL - 1, BLUE_TOTAL)
+    return probabilities
+
+
+def expected_value(distribution: Dict[int, Fraction]) -> Fraction:
+    """按奖级分布计算期望奖金"""
+    return sum((p * PRIZE_TIERS[level][1] for level, p in distribution.items() if level), Fraction(0))
+
+
+def ticket_set_distribution(tickets: List[Tuple[Any, Any]]) -> Dict[str, Any]:
+    """
+    精确计算一组投注的奖级分布
+
+    Args:
+        tickets: [(红球列表, 蓝球)]
+
+    Returns:
+        best_tier: 最高奖级的概率分布 {0..6: Fraction}（0 为全部未中奖），总和为 1
+        expected_counts: 各奖级的期望中奖注数
+        expected_value: 期望奖金（元）
+        cost: 投注成本（元）
+    """
+    parsed = [(to_mask(reds), int(blue)) for reds, blue in tickets]
+    union = 0
+    for mask, _ in parsed:
+        union |= mask
+    union_bits = [1 << i for i in range(RED_TOTAL) if union >> i & 1]
+    outside = RED_TOTAL - len(union_bits)
+
+    ticket_blues = sorted({blue for _, blue in parsed})
+    other_blues = BLUE_TOTAL - len(ticket_blues)
+    best_counts = [0] * 7
+    # 不同的 S 常产生相同的各注红球命中数，按命中向量缓存其在各蓝球下的最高奖级
+    levels_by_hits: Dict[Tuple[int, ...], List[int]] = {}
+
+    for size in range(min(RED_PICK, len(union_bits)) + 1):
+        ways = comb(outside, RED_PICK - size)
+        if not ways:
+            continue
+        for subset in combinations(union_bits, size):
+            drawn = sum(subset)
+            red_hits = tuple((mask & drawn).bit_count() for mask, _ in parsed)
+            levels = levels_by_hits.get(red_hits)
+            if levels is None:
+                # 第一项为蓝球未被任何投注选中的情况，只看红球
+                levels = [_best_level(red_hits, parsed, blue) for blue in [None] + ticket_blues]
+                levels_by_hits[red_hits] = levels
+            best_counts[levels[0]] += ways * other_blues
+            for level in levels[1:]:
+                best_counts[level] += ways
+
+    best_tier = {level: Fraction(count, TOTAL_OUTCOMES) for level, count in enumerate(best_counts)}
+    single = single_ticket_distribution()
+    expected_counts = {level: single[level] * len(parsed) for level in PRIZE_TIERS}
+    return {
+        "best_tier": best_tier,
+        "expected_counts": expected_counts,
+        "expected_value": expected_value(single) * len(parsed),
+        "cost": TICKET_PRICE * len(parsed)
+    }
+
+
+def _best_level(red_hits: Tuple[int, ...], parsed: List[Tuple[int, int]], drawn_blue) -> int:
+    """一组投注在给定开奖下的最高奖级（1 最高，0 未中奖）"""
+    best = 0
+    for hits, (_, blue) in zip(red_hits, parsed):
+        level = PRIZE_TABLE[hits][blue == drawn_blue]
+        if level and (not best or level < best):
+            best = level
+    return best
+
+
+def score_history(history_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    批量计算历史预测的奖级并按模型汇总
+
+    所有预测组先转为掩码，每期开奖只转换一次，逐组只做一次按位与和一次查表
+
+    Returns:
+        模型名称 -> {tickets, periods, tier_counts, winnings, cost}
+    """
+    summary: Dict[str, Dict[str, Any]] = {}
+    for record in history_data.get("predictions_history", []):
+        actual = record.get("actual_result")
+        if not actual:
+            continue
+        actual_mask = to_mask(actual["red_balls"])
+        actual_blue = actual["blue_ball"]
+        for model in record.get("models", []):
+            stats = summary.setdefault(model.get("model_name"), {
+                "tickets": 0, "periods": 0, "tier_counts": [0] * 7, "winnings": 0, "cost": 0
+            })
+            stats["periods"] += 1
+            for group in model.get("predictions", []):
+                hits = (to_mask(group["red_balls"]) & actual_mask).bit_count()
+                level = PRIZE_TABLE[hits][group["blue_ball"] == actual_blue]
+                stats["tickets"] += 1
+                stats["tier_counts"][level] += 1
+                stats["cost"] += TICKET_PRICE
+                if level:
+                    stats["winnings"] += PRIZE_TIERS[level][1]
+    return summary
+
+
+def print_single_ticket_table():
+    distribution = single_ticket_distribution()
+    print("🎲 单注理论概率:")
+    for level, (name, amount) in PRIZE_TIERS.items():
+        p = distribution[level]
+        note = "（浮动，估算）" if level in FLOATING_TIERS else ""
+        print(f"    {name}: 1/{float(1 / p):,.0f}  奖金 {amount:,} 元{note}")
+    ev = expected_value(distribution)
+    print(f"    任意奖级: 1/{float(1 / (1 - distribution[0])):.2f}，期望奖金 {float(ev):.3f} 元/注（成本 {TICKET_PRICE} 元）\n")
+
+
+def print_history_summary(summary: Dict[str, Dict[str, Any]]):
+    single = single_ticket_distribution()
+    random_rate = float(1 - single[0])
+    print("📋 历史预测奖级汇总:")
+    header = f"  {'模型':<16}{'期数':>6}{'注数':>6}" + "".join(f"{PRIZE_TIERS[l][0][:1]:>5}" for l in PRIZE_TIERS) + \
+             f"{'中奖率':>8}{'随机':>8}{'奖金':>8}{'成本':>8}"
+    print(header)
+    for name, stats in summary.items():
+        counts = stats["tier_counts"]
+        win_rate = (stats["tickets"] - counts[0]) / stats["tickets"] if stats["tickets"] else 0.0
+        print(f"  {name:<16}{stats['periods']:>6}{stats['tickets']:>6}" +
+              "".join(f"{counts[l]:>5}" for l in PRIZE_TIERS) +
+              f"{win_rate:>8.1%}{random_rate:>8.1%}{stats['winnings']:>8}{stats['cost']:>8}")
+    print()
+
+
+def print_ticket_sets(predictions_data: Dict[str, Any]):
+    print(f"🎯 期号 {predictions_data.get('target_period')} 各模型投注组合:")
+    for model in predictions_data.get("models", []):
+        tickets = [(g["red_balls"], g["blue_ball"]) for g in model.get("predictions", [])]
+        if not tickets:
+            continue
+        result = ticket_set_distribution(tickets)
+        best = result["best_tier"]
+        top_tiers = "，".join(f"{PRIZE_TIERS[l][0]} 1/{float(1 / best[l]):,.0f}" for l in (3, 4, 5) if best[l])
+        print(f"    {model.get('model_name')}: {len(tickets)} 注，至少中奖 {float(1 - best[0]):.2%}，"
+              f"期望奖金 {float(result['expected_value']):.2f}/{result['cost']} 元")
+        print(f"      最高奖级: {top_tiers}")
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="双色球奖级与期望奖金计算")
+    parser.add_argument("--history", default=PREDICTIONS_HISTORY_FILE, help="历史预测文件")
+    parser.add_argument("--tickets", nargs="?", const=AI_PREDICTIONS_FILE,
+                        help="计算预测文件中各模型投注组合的精确中奖概率（默认 data/ai_predictions.json）")
+    args = parser.parse_args(argv)
+
+    print_single_ticket_table()
+    if args.tickets:
+        with open(args.tickets, 'r', encoding='utf-8') as f:
+            print_ticket_sets(json.load(f))
+        return
+
+    with open(args.history, 'r', encoding='utf-8') as f:
+        print_history_summary(score_history(json.load(f)))
+
+
+if __name__ == "__main__":
+    main()
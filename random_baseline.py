@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+随机投注基线（蒙特卡洛显著性检验）
+为每个已归档期号模拟大量随机投注者（每期 5 注随机号码），用真实开奖结果计分，
+再把各模型的成绩放进随机投注者的分布中，给出百分位和 p 值
+
+实现：
+- 随机投注用 NumPy 向量化生成：一次抽取 6 个 0~32 的整数并合成 33 位掩码，
+  有重复号码的行（位数不足 6）重新抽取，得到均匀分布的 6 码组合
+- 命中数 = popcount(随机掩码 & 开奖掩码)，蓝球独立均匀抽取，奖级按 prize_engine 查表
+- 按 (期号, 分片) 切分任务交给进程池执行；每个分片的随机种子由 (种子, 期号, 分片序号) 派生，
+  结果与进程数无关，可复现
+- 每期只保存每个随机投注者的当期得分（int32），各模型只汇总其参与的期号
+
+指标：
+- hits：每注平均命中数（红球 + 蓝球），与页面展示的 total_hits 一致
+- prize：每注平均奖金（元），一、二等奖按估算值
+
+p 值 = (随机投注者中成绩不低于模型的人数 + 1) / (模拟人数 + 1)
+
+使用方法：
+    python3 random_baseline.py
+    python3 random_baseline.py --players 400000 --workers 8 --seed 7 --json baseline.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Tuple
+
+from prize_engine import PRIZE_TABLE, PRIZE_TIERS, RED_PICK, RED_TOTAL, BLUE_TOTAL, to_mask
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PREDICTIONS_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "predictions_history.json")
+
+TICKETS_PER_PERIOD = 5
+DEFAULT_PLAYERS = 200000
+SHARD_PLAYERS = 50000
+METRICS = ("hits", "prize")
+
+
+def random_red_masks(rng, count: int):
+    """生成 count 个均匀分布的 6 码红球掩码（uint64）"""
+    import numpy as np
+
+    masks = np.empty(count, dtype=np.uint64)
+    pending = np.arange(count)
+    while pending.size:
+        numbers = rng.integers(0, RED_TOTAL, size=(pending.size, RED_PICK), dtype=np.uint64)
+        candidate = np.bitwise_or.reduce(np.left_shift(np.uint64(1), numbers), axis=1)
+        valid = popcount(candidate) == RED_PICK
+        masks[pending[valid]] = candidate[valid]
+        pending = pending[~valid]
+    return masks
+
+
+def popcount(values):
+    """uint64 数组逐元素统计置位数"""
+    import numpy as np
+
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    bytes_view = values.view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(bytes_view, axis=1).sum(axis=1)
+
+
+def simulate_shard(red_mask: int, blue: int, players: int, seed: Tuple[int, ...]) -> Dict[str, Any]:
+    """
+    模拟一个分片：players 个随机投注者各买 TICKETS_PER_PERIOD 注
+
+    Returns:
+        各指标下每个投注者当期的总得分（hits 为命中数之和，prize 为奖金之和）
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(np.random.SeedSequence(list(seed)))
+    tickets = players * TICKETS_PER_PERIOD
+    red_hits = popcount(random_red_masks(rng, tickets) & np.uint64(red_mask)).astype(np.int64)
+    blue_hits = (rng.integers(1, BLUE_TOTAL + 1, size=tickets) == blue).astype(np.int64)
+
+    amounts = np.zeros(len(PRIZE_TABLE) * 2, dtype=np.int64)
+    for hits, levels in enumerate(PRIZE_TABLE):
+        for blue_hit, level in enumerate(levels):
+            if level:
+                amounts[hits * 2 + blue_hit] = PRIZE_TIERS[level][1]
+    prize = amounts[red_hits * 2 + blue_hits]
+
+    return {
+        "hits": (red_hits + blue_hits).reshape(players, TICKETS_PER_PERIOD).sum(axis=1).astype(np.int32),
+        "prize": prize.reshape(players, TICKETS_PER_PERIOD).sum(axis=1).astype(np.int32)
+    }
+
+
+def _run_shard(task):
+    period, chunk, red_mask, blue, players, seed = task
+    return period, chunk, simulate_shard(red_mask, blue, players, seed)
+
+
+def collect_model_scores(history_data: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    按真实开奖计算各模型在每期的得分
+
+    Returns:
+        (期号 -> 开奖结果, 模型名称 -> {periods, tickets, hits, prize})
+    """
+    draws = {}
+    models: Dict[str, Dict[str, Any]] = {}
+    for record in history_data.get("predictions_history", []):
+        actual = record.get("actual_result")
+        if not actual:
+            continue
+        period = record["target_period"]
+        draws[period] = actual
+        actual_mask = to_mask(actual["red_balls"])
+        for model in record.get("models", []):
+            stats = models.setdefault(model.get("model_name"), {"periods": [], "tickets": 0, "hits": 0, "prize": 0})
+            stats["periods"].append(period)
+            for group in model.get("predictions", []):
+                red_hits = (to_mask(group["red_balls"]) & actual_mask).bit_count()
+                blue_hit = group["blue_ball"] == actual["blue_ball"]
+                level = PRIZE_TABLE[red_hits][1 if blue_hit else 0]
+                stats["tickets"] += 1
+                stats["hits"] += red_hits + (1 if blue_hit else 0)
+                stats["prize"] += PRIZE_TIERS[level][1] if level else 0
+    return draws, models
+
+
+def simulate(draws: Dict[str, Dict[str, Any]], players: int, seed: int, workers: int) -> Dict[str, Dict[str, Any]]:
+    """
+    对每期模拟 players 个随机投注者
+
+    Returns:
+        期号 -> {指标: 长度为 players 的 int32 数组}
+    """
+    import numpy as np
+
+    tasks = []
+    for period, actual in draws.items():
+        red_mask = to_mask(actual["red_balls"])
+        blue = int(actual["blue_ball"])
+        for chunk, start in enumerate(range(0, players, SHARD_PLAYERS)):
+            size = min(SHARD_PLAYERS, players - start)
+            tasks.append((period, chunk, red_mask, blue, size, (seed, int(period), chunk)))
+
+    shards: Dict[str, Dict[int, Dict[str, Any]]] = {}
+    if workers <= 1:
+        results = map(_run_shard, tasks)
+        for period, chunk, scores in results:
+            shards.setdefault(period, {})[chunk] = scores
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for period, chunk, scores in executor.map(_run_shard, tasks, chunksize=4):
+                shards.setdefault(period, {})[chunk] = scores
+
+    return {
+        period: {metric: np.concatenate([chunks[i][metric] for i in sorted(chunks)]) for metric in METRICS}
+        for period, chunks in shards.items()
+    }
+
+
+def compare_models(models: Dict[str, Dict[str, Any]], random_scores: Dict[str, Dict[str, Any]],
+                   players: int) -> List[Dict[str, Any]]:
+    """计算各模型每注平均成绩在随机投注者中的百分位和 p 值"""
+    import numpy as np
+
+    rows = []
+    for name, stats in models.items():
+        if not stats["tickets"]:
+            continue
+        row = {"model_name": name, "periods": len(stats["periods"]), "tickets": stats["tickets"]}
+        random_tickets = TICKETS_PER_PERIOD * len(stats["periods"])
+        for metric in METRICS:
+            totals = np.zeros(players, dtype=np.int64)
+            for period in stats["periods"]:
+                totals += random_scores[period][metric]
+            # 模型与随机投注者都换算为每注平均，避免个别期预测组数不足 5 组时不可比
+            random_mean = totals / random_tickets
+            model_mean = stats[metric] / stats["tickets"]
+            above = int(np.count_nonzero(random_mean > model_mean + 1e-12))
+            below = int(np.count_nonzero(random_mean < model_mean - 1e-12))
+            ties = players - above - below
+            row[metric] = {
+                "model": model_mean,
+                "random_mean": float(random_mean.mean()),
+                "percentile": 100.0 * (below + 0.5 * ties) / players,
+                "p_value": (above + ties + 1) / (players + 1)
+            }
+        rows.append(row)
+    return rows
+
+
+def print_report(rows: List[Dict[str, Any]], players: int, periods: int, elapsed: float):
+    print(f"\n🎲 随机投注基线：{periods} 期 × {players:,} 名随机投注者 × {TICKETS_PER_PERIOD} 注，耗时 {elapsed:.1f} 秒\n")
+    header = (f"  {'模型':<16}{'期数':>5}  {'命中/注':>8}{'随机':>8}{'百分位':>8}{'p值':>8}"
+              f"  {'奖金/注':>8}{'随机':>8}{'百分位':>8}{'p值':>8}")
+    print(header)
+    for row in rows:
+        hits, prize = row["hits"], row["prize"]
+        print(f"  {row['model_name']:<16}{row['periods']:>5}  {hits['model']:>8.3f}{hits['random_mean']:>8.3f}"
+              f"{hits['percentile']:>7.1f}%{hits['p_value']:>8.3f}"
+              f"  {prize['model']:>8.2f}{prize['random_mean']:>8.2f}{prize['percentile']:>7.1f}%{prize['p_value']:>8.3f}")
+    print("\n💡 p 值越小表示模型成绩越难用随机投注解释；期数较少时结论不可靠\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="随机投注基线与模型显著性检验")
+    parser.add_argument("--file", default=PREDICTIONS_HISTORY_FILE, help="历史预测文件")
+    parser.add_argument("--players", type=int, default=DEFAULT_PLAYERS, help="每期模拟的随机投注者人数")
+    parser.add_argument("--seed", type=int, default=20251021, help="随机种子")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="进程数（1 为单进程）")
+    parser.add_argument("--json", dest="json_output", help="将结果保存为 JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("❌ 随机投注基线需要 numpy，请先运行: pip install numpy")
+        return 1
+
+    with open(args.file, 'r', encoding='utf-8') as f:
+        draws, models = collect_model_scores(json.load(f))
+    if not draws:
+        print("❌ 历史预测文件中没有已开奖的记录")
+        return 1
+
+    start = time.perf_counter()
+    random_scores = simulate(draws, args.players, args.seed, args.workers)
+    rows = compare_models(models, random_scores, args.players)
+    elapsed = time.perf_counter() - start
+    print_report(rows, args.players, len(draws), elapsed)
+
+    if args.json_output:
+        result = {"players": args.players, "seed": args.seed, "tickets_per_period": TICKETS_PER_PERIOD, "models": rows}
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"💾 结果已保存到: {args.json_output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+按服务商限流的请求调度器
+每个服务商一个令牌桶 + 并发上限，根据 429 和限流响应头自适应调整速率，
+让大量模型以可持续的最高吞吐并发调用而不触发服务商限流
+
+实现：
+- 令牌桶：速率 = 每秒请求数，容量 = 最大并发数，可暂停到指定时刻（Retry-After / 限流重置）
+- 收到 429：速率减半（不低于配置速率的 MIN_RATE_FRACTION），按 Retry-After 或重置时间暂停整个服务商
+- 请求成功：速率每次回升配置速率的 RECOVERY_STEP，直到配置上限（AIMD）
+- 限流响应头：x-ratelimit-limit-requests 下调速率上限，remaining / reset 预测剩余额度，
+  额度耗尽时暂停到重置时刻（同时识别 anthropic-ratelimit-requests-* 头）
+
+使用方法：
+    scheduler = RateLimitScheduler(providers)
+    limiter = scheduler.limiter("aihubmix")
+    with limiter.slot():
+        response = ...
+    limiter.on_success(headers)      # 或 limiter.on_rate_limited(headers)
+"""
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Callable, List, Optional
+
+# 429 后速率下限（相对配置速率）与每次成功后的回升步长
+MIN_RATE_FRACTION = 0.1
+RECOVERY_STEP = 0.1
+# 429 没有附带 Retry-After 时的默认暂停时间（秒）
+DEFAULT_BACKOFF = 2.0
+# 暂停时间上限，防止异常的响应头让调用卡住太久
+MAX_PAUSE = 120.0
+# 未配置限流时使用的速率（每分钟），相当于不限速，但仍会遵守 429 的 Retry-After
+UNLIMITED_RPM = 1e6
+
+REMAINING_HEADERS = ("x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining")
+RESET_HEADERS = ("x-ratelimit-reset-requests", "anthropic-ratelimit-requests-reset")
+LIMIT_HEADERS = ("x-ratelimit-limit-requests", "anthropic-ratelimit-requests-limit")
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _header(headers, names) -> Optional[str]:
+    """大小写无关地读取第一个存在的响应头"""
+    if not headers:
+        return None
+    for name in names:
+        value = headers.get(name)
+        if value is None and hasattr(headers, "items"):
+            value = next((v for k, v in headers.items() if k.lower() == name), None)
+        if value is not None:
+            return str(value).strip()
+    return None
+
+
+def parse_seconds(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    解析时长或时刻为距现在的秒数
+
+    支持 "1.5"（秒）、"6m0s" / "20ms"（OpenAI 格式）、RFC 3339 时刻（Anthropic 格式）和 HTTP 日期
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = DURATION_PATTERN.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            moment = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(0.0, moment.timestamp() - now)
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """429 响应的建议等待时间（retry-after-ms 优先）"""
+    value = _header(headers, ("retry-after-ms",))
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    return parse_seconds(_header(headers, ("retry-after",)))
+
+
+class TokenBucket:
+    """线程安全的令牌桶，支持运行中调整速率和暂停"""
+
+    def __init__(self, rate: float, capacity: float,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.paused_until = 0.0
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """取一个令牌，必要时等待；返回等待的秒数"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            self.sleep(delay)
+            waited += delay
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill(self.clock())
+            self.rate = rate
+
+    def pause(self, seconds: float):
+        """在 seconds 秒内不发放令牌，并清空已积累的令牌（恢复后不会突发）"""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self.paused_until = max(self.paused_until, now + min(seconds, MAX_PAUSE))
+            self.tokens = 0.0
+
+
+class ProviderLimiter:
+    """单个服务商的并发上限 + 自适应速率"""
+
+    def __init__(self, name: str, max_concurrency: int, requests_per_minute: float,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.name = name
+        self.max_concurrency = int(max_concurrency)
+        self.max_rate = requests_per_minute / 60
+        self.min_rate = self.max_rate * MIN_RATE_FRACTION
+        self.bucket = TokenBucket(self.max_rate, max(1, self.max_concurrency), clock, sleep)
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "rate_limited": 0, "wait_s": 0.0}
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    @contextmanager
+    def slot(self):
+        """占用一个并发名额并取得令牌，产出等待的秒数"""
+        with self._semaphore:
+            waited = self.bucket.acquire()
+            with self._lock:
+                self.stats["requests"] += 1
+                self.stats["wait_s"] += waited
+            yield waited
+
+    def _apply_headers(self, headers):
+        """根据限流响应头收紧速率上限，额度耗尽时暂停到重置时刻"""
+        limit = _header(headers, LIMIT_HEADERS)
+        if limit:
+            try:
+                # 请求数上限按每分钟计
+                self.max_rate = min(self.max_rate, float(limit) / 60)
+                self.min_rate = min(self.min_rate, self.max_rate)
+            except ValueError:
+                pass
+
+        remaining = _header(headers, REMAINING_HEADERS)
+        reset = parse_seconds(_header(headers, RESET_HEADERS))
+        try:
+            remaining = float(remaining) if remaining is not None else None
+        except ValueError:
+            remaining = None
+        if remaining is None or not reset:
+            return
+        if remaining < 1:
+            self.bucket.pause(reset)
+        else:
+            # 在重置前把剩余额度均匀用完
+            self.bucket.set_rate(max(self.min_rate, min(self.bucket.rate, remaining / reset)))
+
+    def on_success(self, headers=None):
+        """请求成功：速率线性回升，再按响应头修正"""
+        with self._lock:
+            rate = min(self.max_rate, self.bucket.rate + self.max_rate * RECOVERY_STEP)
+            self.bucket.set_rate(rate)
+            self._apply_headers(headers)
+
+    def on_rate_limited(self, headers=None):
+        """收到 429：速率减半并暂停整个服务商"""
+        with self._lock:
+            self.stats["rate_limited"] += 1
+            self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+            self._apply_headers(headers)
+            pause = retry_after_seconds(headers)
+            self.bucket.pause(DEFAULT_BACKOFF if pause is None else pause)
+
+
+class RateLimitScheduler:
+    """按服务商管理限流器"""
+
+    def __init__(self, providers: Dict[str, Dict[str, Any]],
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.limiters = {
+            name: ProviderLimiter(name, provider["max_concurrency"], provider["requests_per_minute"], clock, sleep)
+            for name, provider in providers.items()
+        }
+
+    def limiter(self, provider: str) -> ProviderLimiter:
+        return self.limiters[provider]
+
+    def limiter_for(self, model_config: Dict[str, Any]) -> ProviderLimiter:
+        """模型所属服务商的限流器"""
+        return self.limiters[model_config["provider"]]
+
+    def total_concurrency(self, providers: Optional[List[str]] = None) -> int:
+        """指定服务商（默认全部）的并发上限之和，作为线程池大小"""
+        names = self.limiters if providers is None else set(providers)
+        return sum(self.limiters[name].max_concurrency for name in names) or 1
+
+    def print_summary(self):
+        """打印各服务商的请求数、429 次数、限流等待时间和当前速率"""
+        used = [limiter for limiter in self.limiters.values() if limiter.stats["requests"]]
+        if not used:
+            return
+        print("🚦 限流调度:")
+        for limiter in used:
+            stats = limiter.stats
+            print(f"    - {limiter.name}: 请求 {stats['requests']} 次，429 {stats['rate_limited']} 次，"
+                  f"等待 {stats['wait_s']:.1f} 秒，当前速率 {limiter.rate * 60:.0f}/分钟")
+        print()
@@ -19,10 +19,11 @@ echo √ 启动本地服务器...
 echo.
 echo 📡 服务器地址: http://localhost:8000
 echo 🌐 请在浏览器中打开上述地址
+echo 🔌 API: /api/draws  /api/predictions/{period}  /api/history  /api/leaderboard
 echo.
 echo 💡 提示: 按 Ctrl+C 停止服务器
 echo ==========================================
 echo.
 
-REM 启动 Python HTTP 服务器
-python -m http.server 8000
+REM 启动本地服务器（静态页面 + /api 接口）
+python api_server.py --port 8000
@@ -24,10 +24,11 @@ echo "✓ 启动本地服务器..."
 echo ""
 echo "📡 服务器地址: http://localhost:8000"
 echo "🌐 请在浏览器中打开上述地址"
+echo "🔌 API: /api/draws?from=&to=  /api/predictions/{period}  /api/history  /api/leaderboard"
 echo ""
 echo "💡 提示: 按 Ctrl+C 停止服务器"
 echo "=========================================="
 echo ""
 
-# 启动 Python HTTP 服务器
-python3 -m http.server 8000
+# 启动本地服务器（静态页面 + /api 接口）
+python3 api_server.py --port 8000
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+预测流水线运行指标采集
+记录各阶段的耗时、token 用量、重试次数与失败原因，追加写入 JSONL 指标文件，
+并在运行结束时打印汇总表，便于跨多次运行追踪耗时和费用的变化
+"""
+
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+# 需要在汇总表中累加的数值字段
+SUMMED_FIELDS = ["prompt_tokens", "cached_tokens", "completion_tokens", "retries"]
+
+
+class PipelineTelemetry:
+    """单次运行的指标收集器"""
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.events: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, **fields):
+        """
+        记录一个阶段的墙钟耗时
+
+        阶段内可以向 yield 出的事件字典写入额外字段（token 数、重试次数等），
+        也可以把 status 设为 "failed" 表示业务失败；抛出的异常会记录为 "error"
+
+        Args:
+            name: 阶段名称（load/archive/prompt_build/model_call/extract/validate/save）
+            **fields: 附加字段，如 model
+        """
+        event = {"stage": name, **fields}
+        start = time.perf_counter()
+        try:
+            yield event
+        except Exception as e:
+            event["status"] = "error"
+            event.setdefault("error", f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            event["wall_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            event.setdefault("status", "ok")
+            self.record(event)
+
+    def record(self, event: Dict[str, Any]):
+        """记录一条事件"""
+        self.events.append({
+            "run_id": self.run_id,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            **event
+        })
+
+    def elapsed_ms(self) -> float:
+        """本次运行至今的总耗时（毫秒）"""
+        return round((time.perf_counter() - self._started) * 1000, 2)
+
+    def write_jsonl(self, path: str):
+        """将本次运行的所有事件追加写入 JSONL 文件"""
+        if not self.events:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            for event in self.events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def summarize(self) -> List[Dict[str, Any]]:
+        """按阶段汇总：次数、失败数、耗时与 token 合计"""
+        summary: Dict[str, Dict[str, Any]] = {}
+        for event in self.events:
+            row = summary.setdefault(event["stage"], {
+                "stage": event["stage"],
+                "count": 0,
+                "failed": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                **{field: 0 for field in SUMMED_FIELDS}
+            })
+            row["count"] += 1
+            if event.get("status") != "ok":
+                row["failed"] += 1
+            row["total_ms"] += event.get("wall_ms", 0)
+            row["max_ms"] = max(row["max_ms"], event.get("wall_ms", 0))
+            for field in SUMMED_FIELDS:
+                row[field] += event.get(field, 0) or 0
+
+        for row in summary.values():
+            row["avg_ms"] = row["total_ms"] / row["count"]
+        return list(summary.values())
+
+    def print_summary(self):
+        """打印各阶段汇总表和失败原因"""
+        rows = self.summarize()
+        if not rows:
+            return
+
+        print("📈 运行指标汇总:")
+        header = f"  {'stage':<14}{'count':>6}{'failed':>8}{'total_ms':>12}{'avg_ms':>10}{'max_ms':>10}{'prompt':>9}{'cached':>9}{'output':>9}{'retries':>9}"
+        print(header)
+        print("  " + "-" * (len(header) - 2))
+        for row in rows:
+            print(f"  {row['stage']:<14}{row['count']:>6}{row['failed']:>8}"
+                  f"{row['total_ms']:>12.1f}{row['avg_ms']:>10.1f}{row['max_ms']:>10.1f}"
+                  f"{row['prompt_tokens']:>9}{row['cached_tokens']:>9}{row['completion_tokens']:>9}{row['retries']:>9}")
+        print(f"  总耗时: {self.elapsed_ms() / 1000:.2f} 秒")
+
+        failures = [e for e in self.events if e.get("status") != "ok"]
+        if failures:
+            print("  失败原因:")
+            for event in failures:
+                target = f" [{event['model']}]" if event.get("model") else ""
+                print(f"    - {event['stage']}{target}: {event.get('error', event.get('status'))}")
+        print()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试本地 API 服务器"""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+import api_server
+
+
+def start_server(data_dir):
+    store = api_server.DataStore(os.path.join(data_dir, "lottery_history.json"),
+                                 os.path.join(data_dir, "ai_predictions.json"),
+                                 os.path.join(data_dir, "predictions_history.json"))
+    server = api_server.start_api_server("127.0.0.1", 0, store)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def fetch(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def copy_data():
+    data_dir = tempfile.mkdtemp()
+    for name in ("lottery_history.json", "ai_predictions.json", "predictions_history.json"):
+        shutil.copy2(os.path.join("data", name), data_dir)
+    return data_dir
+
+
+def test_endpoints():
+    """范围查询、单期预测、排行榜和错误响应"""
+    server, base = start_server(copy_data())
+    try:
+        status, _, body = fetch(f"{base}/api/draws?from=26015&to=26018")
+        draws = json.loads(body)
+        assert status == 200
+        assert [d["period"] for d in draws["data"]] == ["26018", "26017", "26016", "26015"]
+
+        status, _, body = fetch(f"{base}/api/predictions/26021")
+        assert status == 200 and json.loads(body)["actual_result"]["period"] == "26021"
+
+        with open(os.path.join("data", "predictions_history.json"), "r", encoding="utf-8") as f:
+            history = json.load(f)["predictions_history"]
+        status, _, body = fetch(f"{base}/api/history?offset=2&limit=3")
+        page = json.loads(body)
+        assert status == 200 and page["total"] == len(history) and page["offset"] == 2
+        assert page["predictions_history"] == history[2:5] and page["count"] == 3
+        assert json.loads(fetch(f"{base}/api/history")[2])["count"] == min(len(history), api_server.HISTORY_PAGE_SIZE)
+
+        status, _, body = fetch(f"{base}/api/leaderboard")
+        models = json.loads(body)["models"]
+        assert [m["rank"] for m in models] == list(range(1, len(models) + 1))
+
+        assert fetch(f"{base}/api/predictions/10001")[0] == 404
+        assert fetch(f"{base}/api/draws?limit=abc")[0] == 400
+        assert fetch(f"{base}/api/history?offset=abc")[0] == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_etag_gzip_and_reload():
+    """ETag 命中返回 304，支持 gzip，文件变化后重新加载"""
+    data_dir = copy_data()
+    server, base = start_server(data_dir)
+    try:
+        status, headers, body = fetch(f"{base}/api/draws", {"Accept-Encoding": "gzip"})
+        assert status == 200 and headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(body))["count"] == 82
+
+        assert fetch(f"{base}/api/draws", {"If-None-Match": headers["ETag"]})[0] == 304
+
+        path = os.path.join(data_dir, "lottery_history.json")
+        with open(path, "r", encoding="utf-8") as f:
+            lottery = json.load(f)
+        lottery["data"] = lottery["data"][:10]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(lottery, f, ensure_ascii=False)
+        server.RequestHandlerClass.store._checked_at = 0.0
+
+        status, new_headers, body = fetch(f"{base}/api/draws")
+        assert status == 200 and json.loads(body)["count"] == 10
+        assert new_headers["ETag"] != headers["ETag"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_endpoints()
+    test_etag_gzip_and_reload()
+    print("✅ 所有测试通过！")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试批量回测：走步历史窗口、断点续跑、逐期保存和响应缓存（FakeClient 和 fake_ai 夹具见 conftest.py）"""
+
+import json
+import os
+import re
+import sys
+
+import pytest
+
+import batch_predict
+import generate_ai_prediction as gap
+
+sys.path.insert(0, os.path.join(gap.SCRIPT_DIR, "benchmarks"))
+from mock_ai_server import parse_task
+
+with open(os.path.join("data", "lottery_history.json"), "r", encoding="utf-8") as f:
+    DRAWS = json.load(f)["data"]
+PERIOD_PATTERN = re.compile(r'"period": "(\d+)"')
+
+
+class Crash(BaseException):
+    """模拟进程中途被中断（不被逐任务的异常处理捕获）"""
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    """响应缓存写入临时目录"""
+    monkeypatch.setattr(batch_predict, "CACHE_DIR", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def output_file(tmp_path):
+    return str(tmp_path / "backtest.json")
+
+
+def run_batch(output_file, use_cache=True, window=5, concurrency=2):
+    """回测 26019-26021 的前两个模型"""
+    models = gap.get_roster()[1][:2]
+    return batch_predict.run_batch("26019", "26021", models, concurrency=concurrency, window=window,
+                                   output_file=output_file, use_cache=use_cache)
+
+
+def test_build_period_jobs_walk_forward():
+    """每期历史只包含该期之前的 window 期开奖，最早一期没有历史时跳过"""
+    ordered = sorted(DRAWS, key=lambda d: d["period"])
+    jobs = batch_predict.build_period_jobs(list(reversed(DRAWS)), ordered[0]["period"], ordered[3]["period"], 2)
+    assert [job["actual_result"]["period"] for job in jobs] == [d["period"] for d in ordered[1:4]]
+    for job in jobs:
+        position = ordered.index(job["actual_result"])
+        assert job["history"] == list(reversed(ordered[max(0, position - 2):position]))
+
+
+def test_prompts_contain_only_earlier_draws(fake_ai, output_file):
+    """每个 Prompt 中的开奖数据恰好是目标期之前的 window 期"""
+    records = run_batch(output_file, use_cache=False)
+
+    assert sorted(records) == ["26019", "26020", "26021"]
+    assert len(fake_ai.prompts) == 6
+    periods = [d["period"] for d in DRAWS]
+    for prompt, task in zip(fake_ai.prompts, fake_ai.tasks):
+        position = periods.index(task["target_period"])
+        assert PERIOD_PATTERN.findall(prompt) == periods[position + 1:position + 6]
+
+
+def test_resume_and_cache_skip_completed_jobs(fake_ai, output_file):
+    """输出文件中已有的期号不再调用；输出文件删除后命中响应缓存，结果相同"""
+    first = run_batch(output_file)
+    assert len(fake_ai.requests) == 6
+
+    # 断点续跑：全部 (期号, 模型) 已在输出文件中
+    fake_ai.requests.clear()
+    assert run_batch(output_file) == first
+    assert fake_ai.requests == []
+
+    # 删除输出文件后从缓存读取，不调用模型
+    os.remove(output_file)
+    assert run_batch(output_file) == first
+    assert fake_ai.requests == []
+
+    # --no-cache 时重新调用
+    os.remove(output_file)
+    run_batch(output_file, use_cache=False)
+    assert len(fake_ai.requests) == 6
+
+
+def test_completed_periods_saved_before_crash(fake_ai, output_file):
+    """中途中断时已完成的期号已写入输出文件，重新运行只补跑剩余期号"""
+    def crash_on_last_period(prompt):
+        if parse_task(prompt)["target_period"] == "26021":
+            raise Crash()
+        return default_reply(prompt)
+
+    default_reply = fake_ai.reply
+    fake_ai.reply = crash_on_last_period
+    with pytest.raises(Crash):
+        run_batch(output_file, use_cache=False, concurrency=1)
+    assert sorted(batch_predict.load_backtest_records(output_file)) == ["26019", "26020"]
+
+    fake_ai.reply = default_reply
+    fake_ai.requests.clear()
+    records = run_batch(output_file, use_cache=False)
+    assert [task["target_period"] for task in fake_ai.tasks] == ["26021", "26021"]
+    assert sorted(records) == ["26019", "26020", "26021"]
+    assert batch_predict.load_backtest_records(output_file) == records
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
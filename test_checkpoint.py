@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试预测检查点：续跑只补调缺失的模型，--force 忽略检查点（fake_ai 夹具见 conftest.py）"""
+
+import json
+import os
+
+import pytest
+
+import generate_ai_prediction as gap
+
+with open(os.path.join("data", "ai_predictions.json"), "r", encoding="utf-8") as f:
+    PREDICTIONS = json.load(f)
+with open(os.path.join("data", "lottery_history.json"), "r", encoding="utf-8") as f:
+    LOTTERY = json.load(f)
+TARGET = LOTTERY["next_draw"]["next_period"]
+
+
+@pytest.fixture(autouse=True)
+def workspace(monkeypatch, tmp_path):
+    """让检查点和预测文件读写临时目录"""
+    monkeypatch.setattr(gap, "CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+    monkeypatch.setattr(gap, "AI_PREDICTIONS_FILE", str(tmp_path / "ai_predictions.json"))
+
+
+def generate(force=False):
+    """用 fake_ai 的假客户端生成预测（不归档）"""
+    return gap.generate_predictions(force=force, lottery_data=LOTTERY, archive=False)
+
+
+def called_models(client):
+    return [task["model_id"] for task in client.tasks]
+
+
+def partial_checkpoint():
+    """前两个模型成功、第三个失败、第四个未记录的检查点"""
+    models = gap.get_roster()[1]
+    checkpoint = {"target_period": TARGET, "prediction_date": "2026-03-01", "models": {}}
+    for model_config in models[:2]:
+        prediction = {**PREDICTIONS["models"][0], "model_id": model_config["model_id"],
+                      "model_name": model_config["name"], "target_period": TARGET}
+        checkpoint["models"][model_config["model_id"]] = {"status": "ok", "prediction": prediction}
+    checkpoint["models"][models[2]["model_id"]] = {"status": "failed", "error": "超时"}
+    gap.save_checkpoint(checkpoint)
+    return models, checkpoint
+
+
+def test_resume_calls_only_missing_models(fake_ai):
+    """续跑只调用失败和未记录的模型，结果按配置顺序合并全部模型"""
+    models, checkpoint = partial_checkpoint()
+    result = generate()
+
+    assert sorted(called_models(fake_ai)) == sorted(m["model_id"] for m in models[2:])
+    assert [m["model_id"] for m in result["models"]] == [m["model_id"] for m in models]
+    assert result["models"][0] == checkpoint["models"][models[0]["model_id"]]["prediction"]
+    assert result["prediction_date"] == checkpoint["prediction_date"]
+
+    # 检查点已全部完成，再次运行不调用任何模型
+    fake_ai.requests.clear()
+    assert generate() == result
+    assert fake_ai.requests == []
+
+
+def test_force_ignores_checkpoint(fake_ai):
+    """--force 重新调用全部模型"""
+    models, _ = partial_checkpoint()
+    result = generate(force=True)
+
+    assert sorted(called_models(fake_ai)) == sorted(m["model_id"] for m in models)
+    assert len(result["models"]) == len(models)
+    assert result["prediction_date"] == LOTTERY["next_draw"]["next_date"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试统一命令行入口：离线子命令不依赖模型配置"""
+
+import os
+import subprocess
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_cli(*args):
+    """在缺少模型配置文件的环境中运行 cli.py"""
+    env = {**os.environ, "AI_MODELS_CONFIG": os.path.join(SCRIPT_DIR, "nonexistent_models.json")}
+    return subprocess.run([sys.executable, os.path.join(SCRIPT_DIR, "cli.py"), *args],
+                          cwd=SCRIPT_DIR, env=env, capture_output=True, text=True)
+
+
+def test_offline_commands_without_roster():
+    """validate、export 不调用模型，缺少 models.json 时照常运行"""
+    result = run_cli("validate")
+    assert result.returncode == 0, result.stderr
+    assert "验证通过" in result.stdout
+
+    result = run_cli("export", "draws")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith("period,date,")
+
+
+def test_roster_loaded_on_demand():
+    """导入预测模块不读取配置，首次调用 get_roster 时才报告缺少的文件"""
+    code = ("import generate_ai_prediction as gap\n"
+            "try:\n"
+            "    gap.get_roster()\n"
+            "except FileNotFoundError:\n"
+            "    print('missing')\n")
+    env = {**os.environ, "AI_MODELS_CONFIG": os.path.join(SCRIPT_DIR, "nonexistent_models.json")}
+    result = subprocess.run([sys.executable, "-c", code], cwd=SCRIPT_DIR, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "missing"
+
+
+if __name__ == "__main__":
+    test_offline_commands_without_roster()
+    test_roster_loaded_on_demand()
+    print("✅ 所有测试通过！")
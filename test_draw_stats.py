@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试开奖统计增量状态"""
+
+import json
+import os
+import tempfile
+
+import draw_stats
+
+with open(os.path.join("data", "lottery_history.json"), "r", encoding="utf-8") as f:
+    DRAWS = json.load(f)["data"]
+
+
+def copy_state(state):
+    return json.loads(json.dumps(state))
+
+
+def test_incremental_matches_rebuild():
+    """逐期增量更新与全量构建结果一致"""
+    state, mode, applied = draw_stats.update_stats(draw_stats.build_stats(DRAWS[10:]), DRAWS)
+    assert (mode, applied) == ("incremental", 10)
+    assert state == draw_stats.build_stats(DRAWS)
+
+    window = state["windows"]["5"]
+    assert sum(window["red"]) == 30 and sum(window["blue"]) == 5
+    latest = [int(ball) - 1 for ball in DRAWS[0]["red_balls"]]
+    assert all(state["omission"]["red"][i] == 0 for i in latest)
+    assert sum(state["histograms"]["sum"].values()) == len(DRAWS)
+
+    assert draw_stats.update_stats(state, DRAWS)[1] == "unchanged"
+
+
+def test_rebuild_when_history_changes():
+    """补录旧期号或修改最新一期时全量重建"""
+    backfilled = draw_stats.build_stats(DRAWS[:40] + DRAWS[41:])
+    assert draw_stats.update_stats(backfilled, DRAWS)[1] == "rebuild"
+
+    changed = copy_state(DRAWS)
+    changed[0]["blue_ball"] = "16" if changed[0]["blue_ball"] != "16" else "15"
+    assert draw_stats.update_stats(draw_stats.build_stats(changed), DRAWS)[1] == "rebuild"
+    assert draw_stats.update_stats(None, DRAWS)[1] == "rebuild"
+
+
+def test_save_and_verify():
+    """状态文件可读回，verify 能发现不一致"""
+    path = os.path.join(tempfile.mkdtemp(), "draw_stats.json")
+    assert draw_stats.update_stats_file(DRAWS[1:], path) == ("rebuild", len(DRAWS) - 1)
+    assert draw_stats.update_stats_file(DRAWS, path) == ("incremental", 1)
+    assert draw_stats.load_stats(path) == draw_stats.build_stats(DRAWS)
+    assert draw_stats.verify_stats(DRAWS, path) == []
+    assert "total_draws" in draw_stats.verify_stats(DRAWS[1:], path)
+
+
+if __name__ == "__main__":
+    test_incremental_matches_rebuild()
+    test_rebuild_when_history_changes()
+    test_save_and_verify()
+    print("✅ 所有测试通过！")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试 predictions_history.json 流式读写"""
+
+import json
+import os
+import tempfile
+
+import history_stream
+import ticket_index
+
+with open(os.path.join("data", "predictions_history.json"), "r", encoding="utf-8") as f:
+    HISTORY = json.load(f)
+
+
+def write_history(data):
+    path = os.path.join(tempfile.mkdtemp(), "predictions_history.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def dumped(data):
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def test_iter_and_find():
+    """逐条读取与 json.load 一致（小块读取跨越记录边界）"""
+    path = write_history(HISTORY)
+    records = list(history_stream.iter_records(path, chunk_size=97))
+    assert records == HISTORY["predictions_history"]
+
+    target = HISTORY["predictions_history"][3]["target_period"]
+    assert history_stream.find_record(path, target, newest_first=True)["target_period"] == target
+    assert history_stream.find_record(path, "10001", newest_first=True) is None
+    assert list(history_stream.iter_records(path + ".missing")) == []
+
+
+def test_prepend_matches_json_dump():
+    """插入到最前的结果与整体 json.dump 逐字节相同，包括空数组和文件不存在的情况"""
+    first, rest = HISTORY["predictions_history"][0], HISTORY["predictions_history"][1:]
+    path = write_history({**HISTORY, "predictions_history": rest})
+    history_stream.prepend_record(path, first, chunk_size=101)
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == dumped(HISTORY)
+
+    path = write_history({"predictions_history": []})
+    history_stream.prepend_record(path, first)
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == dumped({"predictions_history": [first]})
+
+    os.remove(path)
+    history_stream.prepend_record(path, first)
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == dumped({"predictions_history": [first]})
+
+
+def test_update_record():
+    """只改写目标记录，未修改时不重写文件"""
+    path = write_history(HISTORY)
+    target = HISTORY["predictions_history"][2]["target_period"]
+
+    def add_model(record):
+        record["models"].append({"model_id": "TEST", "model_name": "TEST", "predictions": []})
+        return True
+
+    assert history_stream.update_record(path, target, add_model, chunk_size=89)
+    expected = json.loads(dumped(HISTORY))
+    add_model(expected["predictions_history"][2])
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == dumped(expected)
+
+    mtime = os.path.getmtime(path)
+    assert not history_stream.update_record(path, target, lambda record: False)
+    assert not history_stream.update_record(path, "10001", add_model)
+    assert os.path.getmtime(path) == mtime
+
+
+def test_merge_records():
+    """一次写入：新期号按降序插入到中间和末尾，已有期号原地修改"""
+    records = HISTORY["predictions_history"]
+    removed = [records[0], records[4], records[-1]]
+    path = write_history({**HISTORY, "predictions_history": [r for r in records if r not in removed]})
+    modified = json.loads(dumped(records[2]))
+    modified["models"] = modified["models"][:1]
+
+    def replace_models(existing, incoming):
+        existing["models"] = incoming["models"]
+        return True
+
+    assert history_stream.merge_records(path, removed + [modified], replace_models, chunk_size=97) == (3, 1)
+    expected = json.loads(dumped(HISTORY))
+    expected["predictions_history"][2] = modified
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == dumped(expected)
+
+    mtime = os.path.getmtime(path)
+    assert history_stream.merge_records(path, [records[1]], lambda existing, incoming: False) == (0, 0)
+    assert os.path.getmtime(path) == mtime
+
+
+def test_ticket_index_append():
+    """流式追加的索引与全量构建一致"""
+    records = HISTORY["predictions_history"]
+    path = os.path.join(tempfile.mkdtemp(), "ticket_index.json")
+    ticket_index.update_index(records[2:], path)
+    added = ticket_index.append_records(records[:2], path, chunk_size=113)
+    assert added > 0 and ticket_index.append_records(records[:2], path) == 0
+
+    appended, full = ticket_index.load_index(path), ticket_index.build_index(records)
+    assert appended.periods == full.periods
+    assert sorted(appended.entries) == sorted(full.entries)
+
+
+if __name__ == "__main__":
+    test_iter_and_find()
+    test_prepend_matches_json_dump()
+    test_update_record()
+    test_merge_records()
+    test_ticket_index_append()
+    print("✅ 所有测试通过！")
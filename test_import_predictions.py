@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试批量导入外部预测"""
+
+import copy
+import json
+import os
+import tempfile
+
+import history_stream
+import import_predictions
+import ticket_index
+
+with open(os.path.join("data", "predictions_history.json"), "r", encoding="utf-8") as f:
+    HISTORY = json.load(f)
+
+
+def dumped(data):
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def setup_files(records):
+    """写入临时历史文件并为其建立索引，返回 (历史文件, 索引文件)"""
+    directory = tempfile.mkdtemp()
+    history_file = os.path.join(directory, "predictions_history.json")
+    index_file = os.path.join(directory, "ticket_index.json")
+    with open(history_file, "w", encoding="utf-8") as f:
+        f.write(dumped({**HISTORY, "predictions_history": records}))
+    ticket_index.save_index(ticket_index.build_index(records), index_file)
+    return history_file, index_file
+
+
+def to_input(record, model):
+    """历史记录中的模型条目 -> 外部预测（去掉命中结果）"""
+    return {
+        "prediction_date": record["prediction_date"],
+        "target_period": record["target_period"],
+        "model_id": model["model_id"],
+        "model_name": model["model_name"],
+        "predictions": [{k: v for k, v in g.items() if k != "hit_result"} for g in model["predictions"]]
+    }
+
+
+def test_import_restores_history():
+    """删掉的期号和模型重新导入后，历史文件与原文件逐字节相同，索引与全量构建一致"""
+    records = HISTORY["predictions_history"]
+    trimmed = copy.deepcopy(records)
+    removed = trimmed.pop(3)
+    partial = trimmed[5]
+    model = partial["models"].pop()
+
+    history_file, index_file = setup_files(trimmed)
+    jsonl = os.path.join(tempfile.mkdtemp(), "predictions.jsonl")
+    with open(jsonl, "w", encoding="utf-8") as f:
+        for m in removed["models"]:
+            f.write(json.dumps(to_input(removed, m), ensure_ascii=False) + "\n")
+        f.write(json.dumps(to_input(partial, model), ensure_ascii=False) + "\n")
+
+    assert import_predictions.main([jsonl, "--history", history_file, "--index", index_file]) == 0
+    with open(history_file, "r", encoding="utf-8") as f:
+        assert f.read() == dumped(HISTORY)
+    assert sorted(ticket_index.load_index(index_file).entries) == sorted(ticket_index.build_index(records).entries)
+
+    # 再次导入时已有模型全部跳过，文件不变
+    mtime = os.path.getmtime(history_file)
+    assert import_predictions.main([jsonl, "--history", history_file, "--index", index_file]) == 0
+    assert os.path.getmtime(history_file) == mtime
+
+
+def test_invalid_input_writes_nothing():
+    """任何一条预测无效时整批不写入；--repair 修复后可以导入"""
+    record = HISTORY["predictions_history"][0]
+    history_file, index_file = setup_files(HISTORY["predictions_history"][1:])
+    good = {"target_period": record["target_period"], "prediction_date": record["prediction_date"],
+            "models": [to_input(record, m) for m in record["models"]]}
+    bad = copy.deepcopy(good["models"][0])
+    bad["predictions"][0]["red_balls"] = list(reversed(bad["predictions"][0]["red_balls"]))
+    good["models"][0] = bad
+
+    path = os.path.join(tempfile.mkdtemp(), "predictions.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(good, f, ensure_ascii=False)
+
+    mtime = os.path.getmtime(history_file)
+    assert import_predictions.main([path, "--history", history_file, "--index", index_file]) == 1
+    assert os.path.getmtime(history_file) == mtime
+
+    assert import_predictions.main([path, "--repair", "--history", history_file, "--index", index_file]) == 0
+    assert history_stream.find_record(history_file, record["target_period"]) == record
+
+
+def test_unknown_period_skipped():
+    """尚未开奖的期号跳过，不写入"""
+    record = HISTORY["predictions_history"][0]
+    history_file, index_file = setup_files(HISTORY["predictions_history"])
+    future = {**to_input(record, record["models"][0]), "target_period": "99001"}
+    path = os.path.join(tempfile.mkdtemp(), "future.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([future], f, ensure_ascii=False)
+
+    mtime = os.path.getmtime(history_file)
+    assert import_predictions.main([path, "--history", history_file, "--index", index_file]) == 0
+    assert os.path.getmtime(history_file) == mtime
+
+
+if __name__ == "__main__":
+    test_import_restores_history()
+    test_invalid_input_writes_nothing()
+    test_unknown_period_skipped()
+    print("✅ 所有测试通过！")
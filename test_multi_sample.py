@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试多候选采样：n 参数、并行补足和最佳候选选择（FakeClient 见 conftest.py）"""
+
+import json
+
+import pytest
+
+import generate_ai_prediction as gap
+
+with open("data/ai_predictions.json", "r", encoding="utf-8") as f:
+    PREDICTIONS = json.load(f)
+MODEL = PREDICTIONS["models"][0]
+EXPECTED = {"prediction_date": PREDICTIONS["prediction_date"], "target_period": PREDICTIONS["target_period"],
+            "model_id": MODEL["model_id"], "model_name": MODEL["model_name"]}
+MODEL_CONFIG = {"id": "mock", "name": MODEL["model_name"], "model_id": MODEL["model_id"], "provider": "test"}
+
+
+def preset(contents):
+    """按顺序返回预设内容的 reply 函数"""
+    queue = list(contents)
+    return lambda prompt: queue.pop(0)
+
+
+def sample_counts(client):
+    """每次请求的 n 参数（未发送时为 None）"""
+    return [request.get("n") for request in client.requests]
+
+
+def contents():
+    """四种候选：畸形 JSON、需要修复（蓝球未补零）、通过验证、无法修复（没有预测组）"""
+    repairable = json.loads(json.dumps(MODEL))
+    repairable["predictions"][0]["blue_ball"] = str(int(repairable["predictions"][0]["blue_ball"]))
+    empty = {**MODEL, "predictions": []}
+    return ['{"model_id": "', json.dumps(repairable), json.dumps(MODEL), json.dumps(empty)]
+
+
+def test_best_candidate_with_n(make_client):
+    """一次请求取回全部候选，通过验证的候选优先于可修复的候选"""
+    client = make_client(preset(contents()))
+    candidates = []
+    prediction, _ = gap.call_ai_model(client, MODEL_CONFIG, "prompt", samples=4, expected=EXPECTED,
+                                      candidates=candidates)
+    assert sample_counts(client) == [4]
+    assert prediction == MODEL
+    assert [c["status"] for c in candidates] == ["unparsable", "repairable", "valid", "invalid"]
+    assert [c["selected"] for c in candidates] == [False, False, True, False]
+
+
+def test_parallel_top_up(make_client):
+    """网关忽略 n 时用并行请求补足候选"""
+    client = make_client(preset(contents()[:2]), max_choices=1)
+    candidates = []
+    prediction, _ = gap.call_ai_model(client, MODEL_CONFIG, "prompt", samples=2, expected=EXPECTED,
+                                      candidates=candidates)
+    assert sample_counts(client) == [2, None]
+    assert len(candidates) == 2 and candidates[1]["selected"]
+    assert prediction["predictions"][0]["blue_ball"] != MODEL["predictions"][0]["blue_ball"]
+
+
+def test_single_sample_unchanged(make_client):
+    """samples=1 时不发送 n 参数，JSON 无法解析时仍抛出 JSONDecodeError"""
+    client = make_client(preset(['{"model_id": ']))
+    try:
+        gap.call_ai_model(client, MODEL_CONFIG, "prompt")
+    except json.JSONDecodeError:
+        pass
+    else:
+        raise AssertionError("应当抛出 JSONDecodeError")
+    assert sample_counts(client) == [None]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试流水线各阶段的跳过条件和失败处理"""
+
+import json
+import os
+import sys
+import tempfile
+
+import generate_ai_prediction as gap
+import history_stream
+import pipeline
+from telemetry import PipelineTelemetry
+
+sys.path.insert(0, pipeline.FETCH_DIR)
+from fetch_lottery_history import LotteryDataFetcher
+
+with open(os.path.join("data", "lottery_history.json"), "r", encoding="utf-8") as f:
+    LOTTERY = json.load(f)
+with open(os.path.join("data", "ai_predictions.json"), "r", encoding="utf-8") as f:
+    PREDICTIONS = json.load(f)
+with open(os.path.join("data", "predictions_history.json"), "r", encoding="utf-8") as f:
+    HISTORY = json.load(f)
+MODELS = [{"model_id": model["model_id"]} for model in PREDICTIONS["models"]]
+
+
+def test_predictions_current():
+    """下期期号一致且覆盖全部模型时跳过预测；新开奖或缺少模型时需要预测"""
+    assert pipeline.predictions_current(PREDICTIONS, LOTTERY, MODELS)
+
+    next_draw = {**LOTTERY["next_draw"], "next_period": str(int(LOTTERY["next_draw"]["next_period"]) + 1)}
+    assert not pipeline.predictions_current(PREDICTIONS, {**LOTTERY, "next_draw": next_draw}, MODELS)
+    assert not pipeline.predictions_current(PREDICTIONS, LOTTERY, MODELS + [{"model_id": "NEW"}])
+    assert not pipeline.predictions_current(None, LOTTERY, MODELS)
+    assert not pipeline.predictions_current(PREDICTIONS, None, MODELS)
+
+
+def test_draw_done():
+    """最新开奖是今天且下期预测齐全时停止轮询；今天的开奖未获取或预测缺少模型时继续"""
+    today = LOTTERY["data"][0]["date"]
+    assert pipeline.draw_done(LOTTERY, PREDICTIONS, MODELS, today)
+    assert not pipeline.draw_done(LOTTERY, PREDICTIONS, MODELS, LOTTERY["next_draw"]["next_date"])
+    assert not pipeline.draw_done(LOTTERY, PREDICTIONS, MODELS + [{"model_id": "NEW"}], today)
+    assert not pipeline.draw_done(None, PREDICTIONS, MODELS, today)
+
+
+def test_fetch_merge_detects_new_draws():
+    """抓取结果与现有数据相同时合并结果不变（不写文件）；新开奖插入最前"""
+    fetcher = LotteryDataFetcher()
+    existing = LOTTERY["data"]
+    merged, new_count = fetcher.merge_data(existing, existing[:50])
+    assert merged == existing and new_count == 0
+
+    merged, new_count = fetcher.merge_data(existing[1:], existing[:50])
+    assert merged == existing and new_count == 1
+
+
+def drawn_predictions():
+    """最近一条历史记录还原成归档前的当期预测（期号已开奖）"""
+    record = HISTORY["predictions_history"][0]
+    models = [{"model_id": m["model_id"], "model_name": m["model_name"],
+               "predictions": [{k: v for k, v in g.items() if k != "hit_result"} for g in m["predictions"]]}
+              for m in record["models"]]
+    return {"prediction_date": record["prediction_date"], "target_period": record["target_period"], "models": models}
+
+
+def test_failed_archive_keeps_predictions():
+    """归档出错时阶段记为失败，predict 不覆盖尚未归档的已开奖预测（--force 也不覆盖）"""
+    directory = tempfile.mkdtemp()
+    history_file = os.path.join(directory, "predictions_history.json")
+    with open(history_file, "w", encoding="utf-8") as f:
+        json.dump({**HISTORY, "predictions_history": HISTORY["predictions_history"][1:]}, f, ensure_ascii=False, indent=2)
+    predictions = drawn_predictions()
+
+    saved = (gap.PREDICTIONS_HISTORY_FILE, gap.TICKET_INDEX_FILE, gap.AI_PREDICTIONS_FILE, history_stream.prepend_record)
+    gap.PREDICTIONS_HISTORY_FILE = history_file
+    gap.TICKET_INDEX_FILE = os.path.join(directory, "ticket_index.json")
+    gap.AI_PREDICTIONS_FILE = os.path.join(directory, "ai_predictions.json")
+
+    def failing_prepend(*args, **kwargs):
+        raise OSError("磁盘已满")
+
+    try:
+        assert pipeline.archive_pending(LOTTERY, PREDICTIONS) is None
+        assert pipeline.archive_pending(LOTTERY, predictions) == predictions["target_period"]
+
+        metrics = PipelineTelemetry()
+        history_stream.prepend_record = failing_prepend
+        try:
+            pipeline.archive_stage(LOTTERY, predictions, metrics)
+            assert False, "归档失败应抛出异常"
+        except OSError:
+            pass
+        assert metrics.events[-1]["stage"] == "archive" and metrics.events[-1]["status"] == "error"
+
+        assert pipeline.predict_stage(LOTTERY, predictions, metrics, force=True) is predictions
+        assert metrics.events[-1]["stage"] == "predict" and metrics.events[-1]["status"] == "failed"
+        assert not os.path.exists(gap.AI_PREDICTIONS_FILE)
+
+        # 恢复后归档成功，不再有待归档的预测
+        history_stream.prepend_record = saved[3]
+        pipeline.archive_stage(LOTTERY, predictions, metrics)
+        assert metrics.events[-1]["status"] == "ok" and metrics.events[-1]["period"] == predictions["target_period"]
+        assert pipeline.archive_pending(LOTTERY, predictions) is None
+    finally:
+        gap.PREDICTIONS_HISTORY_FILE, gap.TICKET_INDEX_FILE, gap.AI_PREDICTIONS_FILE, history_stream.prepend_record = saved
+
+
+if __name__ == "__main__":
+    test_predictions_current()
+    test_draw_done()
+    test_fetch_merge_detects_new_draws()
+    test_failed_archive_keeps_predictions()
+    print("✅ 所有测试通过！")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试预测数据验证与修复"""
+
+import prediction_validator as pv
+
+EXPECTED = {
+    "prediction_date": "2026-03-01",
+    "target_period": "26022",
+    "model_id": "SSB-Team-001",
+    "model_name": "GPT-5"
+}
+
+# 固定的合法样本（不读取 data/ai_predictions.json，流水线每期都会改写该文件）
+VALID_GROUPS = [
+    (["05", "09", "13", "22", "27", "30"], "07"),
+    (["04", "10", "16", "18", "23", "31"], "06"),
+    (["06", "12", "19", "25", "29", "33"], "10"),
+    (["08", "13", "17", "30", "32", "33"], "04"),
+    (["09", "11", "15", "20", "26", "32"], "02")
+]
+
+
+def load_valid_prediction():
+    """构造与 EXPECTED 一致的合法预测"""
+    groups = [{"group_id": i, "strategy": f"策略{i}", "red_balls": list(red), "blue_ball": blue, "description": "测试样本"}
+              for i, (red, blue) in enumerate(VALID_GROUPS, 1)]
+    return {**EXPECTED, "predictions": groups}
+
+
+def codes(issues):
+    return {issue.code for issue in issues}
+
+
+def test_valid_prediction_passes():
+    """合法数据没有任何问题"""
+    prediction = load_valid_prediction()
+    assert pv.validate(prediction) == []
+    assert pv.validate(prediction, EXPECTED) == []
+
+
+def test_detects_range_padding_duplicate_and_group_id():
+    """范围、补零、重复、排序和 group_id 问题都有对应错误码"""
+    prediction = load_valid_prediction()
+    groups = prediction["predictions"]
+    groups[0]["red_balls"] = ["5", "09", "13", "22", "27", "30"]
+    groups[1]["red_balls"] = ["04", "10", "16", "18", "23", "34"]
+    groups[2]["red_balls"] = ["06", "12", "12", "25", "29", "33"]
+    groups[3]["red_balls"] = ["33", "08", "13", "17", "30", "32"]
+    groups[4]["blue_ball"] = "17"
+    groups[4]["group_id"] = 7
+
+    found = codes(pv.validate(prediction))
+    assert {pv.RED_PADDING, pv.RED_RANGE_ERROR, pv.RED_DUPLICATE,
+            pv.RED_UNSORTED, pv.BLUE_RANGE_ERROR, pv.GROUP_ID} <= found
+
+
+def test_repair_fixes_recoverable_output():
+    """可恢复的问题修复后重新验证通过，且结果确定"""
+    prediction = load_valid_prediction()
+    groups = prediction["predictions"]
+    groups[0]["red_balls"] = [30, "5", "09", "13", "22", "27"]
+    groups[2]["red_balls"] = ["06", "12", "12", "25", "29", "33"]
+    groups[4]["blue_ball"] = ""
+    del prediction["model_name"]
+
+    repaired, fixes, remaining = pv.repair(prediction, EXPECTED)
+    assert remaining == []
+    assert pv.validate(repaired, EXPECTED) == []
+    assert {pv.RED_PADDING, pv.RED_UNSORTED, pv.RED_DUPLICATE, pv.BLUE_MISSING, pv.MISSING_FIELD} <= set(fixes)
+    assert repaired["predictions"][0]["red_balls"] == ["05", "09", "13", "22", "27", "30"]
+    assert len(set(repaired["predictions"][2]["red_balls"])) == 6
+
+    again, _, _ = pv.repair(prediction, EXPECTED)
+    assert again == repaired
+
+
+def test_repair_rejects_too_few_groups():
+    """预测组不足 5 组无法修复"""
+    prediction = load_valid_prediction()
+    prediction["predictions"] = prediction["predictions"][:3]
+    _, _, remaining = pv.repair(prediction, EXPECTED)
+    assert pv.GROUP_COUNT_ERROR in codes(remaining)
+
+
+if __name__ == "__main__":
+    test_valid_prediction_passes()
+    test_detects_range_padding_duplicate_and_group_id()
+    test_repair_fixes_recoverable_output()
+    test_repair_rejects_too_few_groups()
+    print("✅ 所有测试通过！")
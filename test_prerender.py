@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试首屏预渲染"""
+
+import json
+import os
+import re
+
+import prerender
+
+with open("index.html", "r", encoding="utf-8") as f:
+    INDEX = f.read()
+with open(os.path.join("data", "lottery_history.json"), "r", encoding="utf-8") as f:
+    LOTTERY = json.load(f)
+with open(os.path.join("data", "ai_predictions.json"), "r", encoding="utf-8") as f:
+    PREDICTIONS = json.load(f)
+
+
+def test_render_is_idempotent_and_clearable():
+    """重复渲染结果不变，清除后回到空白模板，再次渲染与第一次相同"""
+    rendered = prerender.render_index(INDEX, LOTTERY, PREDICTIONS)
+    assert prerender.render_index(rendered, LOTTERY, PREDICTIONS) == rendered
+    assert '<body class="prerendered">' in rendered
+    assert rendered.count('class="model-card"') == len(PREDICTIONS["models"])
+    assert f'id="heroPeriod">{LOTTERY["next_draw"]["next_period"]}<' in rendered
+    # 倒计时不随渲染日期变化，只写入占位文字
+    assert f'id="heroCountdown">{prerender.COUNTDOWN_PLACEHOLDER}<' in rendered
+    assert "距离开奖仅剩" not in rendered
+
+    state = re.search(r'id="prerenderState">(.*?)</script>', rendered).group(1)
+    assert json.loads(state) == prerender.build_state(LOTTERY, PREDICTIONS)
+
+    cleared = prerender.clear_index(rendered)
+    assert "<body>" in cleared and 'class="model-card"' not in cleared
+    assert prerender.render_index(cleared, LOTTERY, PREDICTIONS) == rendered
+
+
+def test_drawn_target_marks_hits():
+    """预测期号已开奖时显示开奖横幅，并标出命中号码和最佳组"""
+    model = PREDICTIONS["models"][0]
+    group = model["predictions"][2]
+    actual = {"period": PREDICTIONS["target_period"], "date": "2026-03-01",
+              "red_balls": group["red_balls"], "blue_ball": group["blue_ball"]}
+    html = prerender.render_models_grid({**PREDICTIONS, "models": [model]}, [actual] + LOTTERY["data"])
+
+    assert "drawn-status-banner" in html and "最佳 7 中" in html
+    assert f'★ G-{group["group_id"]}' in html
+    assert html.count("lottery-ball red size-md hit") >= 6
+
+
+def test_best_group_matches_archive_rule():
+    """命中数相同时按奖级选最佳组（2+1 六等奖优于 3+0），与归档的 best_group 一致"""
+    actual = {"period": PREDICTIONS["target_period"], "date": "2026-03-01",
+              "red_balls": ["01", "02", "03", "04", "05", "06"], "blue_ball": "16"}
+    groups = [
+        {"group_id": 1, "strategy": "三红", "red_balls": ["01", "02", "03", "20", "21", "22"], "blue_ball": "09", "description": ""},
+        {"group_id": 2, "strategy": "二红一蓝", "red_balls": ["01", "02", "20", "21", "22", "23"], "blue_ball": "16", "description": ""}
+    ]
+    model = {"model_id": "tie", "model_name": "GPT-5", "predictions": groups}
+
+    archived = prerender.prize_engine.score_models([model], actual)[0]
+    assert archived["best_group"] == 2
+    html = prerender.render_model_card(model, actual)
+    assert "★ G-2" in html and "★ G-1" not in html and "最佳 3 中" in html
+
+
+if __name__ == "__main__":
+    test_render_is_idempotent_and_clearable()
+    test_drawn_target_marks_hits()
+    test_best_group_matches_archive_rule()
+    print("✅ 所有测试通过！")
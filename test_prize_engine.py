@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试奖级计算引擎"""
+
+from fractions import Fraction
+from itertools import combinations
+
+import prize_engine as pe
+from generate_ai_prediction import calculate_hit_result
+
+
+def test_prize_level_mapping():
+    """奖级与官方规则一致"""
+    assert pe.prize_level(6, True) == 1
+    assert pe.prize_level(6, False) == 2
+    assert pe.prize_level(5, True) == 3
+    assert pe.prize_level(5, False) == pe.prize_level(4, True) == 4
+    assert pe.prize_level(4, False) == pe.prize_level(3, True) == 5
+    assert pe.prize_level(2, True) == pe.prize_level(0, True) == 6
+    assert pe.prize_level(3, False) == 0
+
+
+def test_single_ticket_distribution():
+    """单注概率总和为 1，一等奖为 1/17721088"""
+    distribution = pe.single_ticket_distribution()
+    assert sum(distribution.values()) == 1
+    assert distribution[1] == Fraction(1, 17721088)
+    assert distribution[6] == Fraction(1, 16) * (1 - Fraction(pe.comb(6, 3) * pe.comb(27, 3)
+                                                                + pe.comb(6, 4) * pe.comb(27, 2)
+                                                                + pe.comb(6, 5) * 27 + 1, pe.comb(33, 6)))
+
+
+def test_ticket_set_matches_brute_force():
+    """多注分布与逐一枚举全部开奖红球组合的结果一致"""
+    tickets = [(["01", "02", "03", "04", "05", "06"], "01"),
+               (["04", "05", "06", "07", "08", "09"], "02")]
+    result = pe.ticket_set_distribution(tickets)
+    assert sum(result["best_tier"].values()) == 1
+    assert result["best_tier"][1] == Fraction(2, pe.TOTAL_OUTCOMES)
+
+    # 单注时最高奖级分布即单注分布
+    single = pe.ticket_set_distribution(tickets[:1])["best_tier"]
+    assert single == pe.single_ticket_distribution()
+
+    # 两注至少中六等奖：蓝球命中任一注（2/16），或红球命中达到五等奖及以上
+    masks = [pe.to_mask(reds) for reds, _ in tickets]
+    no_prize = 0
+    for drawn in combinations(range(1, 34), 6):
+        hits = [(m & pe.to_mask(drawn)).bit_count() for m in masks]
+        if max(hits) < 4:
+            no_prize += 14
+    assert result["best_tier"][0] == Fraction(no_prize, pe.TOTAL_OUTCOMES)
+
+
+def test_hit_result_includes_prize():
+    """hit_result 中包含奖级字段"""
+    actual = {"red_balls": ["01", "02", "03", "04", "05", "06"], "blue_ball": "07"}
+    group = {"red_balls": ["01", "02", "10", "11", "12", "13"], "blue_ball": "07"}
+    hit = calculate_hit_result(group, actual)
+    assert hit["total_hits"] == 3
+    assert (hit["prize_level"], hit["prize_name"], hit["prize_amount"]) == (6, "六等奖", 5)
+    # 单组计分与批量计分（复用红球集合）结果一致
+    assert pe.hit_result(group, set(actual["red_balls"]), actual["blue_ball"]) == hit
+    assert pe.score_models([{"predictions": [group]}], actual)[0]["predictions"][0]["hit_result"] == hit
+
+
+if __name__ == "__main__":
+    test_prize_level_mapping()
+    test_single_ticket_distribution()
+    test_ticket_set_matches_brute_force()
+    test_hit_result_includes_prize()
+    print("✅ 所有测试通过！")
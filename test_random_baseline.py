@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试随机投注基线：分片汇总可复现，百分位和 p 值计算正确（需要 numpy）"""
+
+from functools import wraps
+
+import random_baseline
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DRAWS = {
+    "26001": {"red_balls": ["03", "08", "15", "21", "27", "33"], "blue_ball": "06"},
+    "26002": {"red_balls": ["01", "02", "10", "19", "24", "30"], "blue_ball": "12"}
+}
+
+
+def requires_numpy(test):
+    """未安装 numpy 时跳过"""
+    @wraps(test)
+    def run():
+        if np is None:
+            import pytest
+            pytest.skip("需要 numpy")
+        test()
+    return run
+
+
+@requires_numpy
+def test_simulate_shard_seeded():
+    """相同种子结果相同，不同种子结果不同；得分在合理范围内"""
+    red_mask = random_baseline.to_mask(DRAWS["26001"]["red_balls"])
+    first = random_baseline.simulate_shard(red_mask, 6, 500, (7, 26001, 0))
+    again = random_baseline.simulate_shard(red_mask, 6, 500, (7, 26001, 0))
+    other = random_baseline.simulate_shard(red_mask, 6, 500, (8, 26001, 0))
+
+    for metric in random_baseline.METRICS:
+        assert first[metric].shape == (500,) and first[metric].dtype == np.int32
+        assert np.array_equal(first[metric], again[metric])
+    assert not np.array_equal(first["hits"], other["hits"])
+    assert first["hits"].min() >= 0 and first["hits"].max() <= 7 * random_baseline.TICKETS_PER_PERIOD
+    assert first["prize"].min() >= 0
+
+
+@requires_numpy
+def test_simulate_aggregation_deterministic():
+    """各分片按序号拼接，结果与进程数无关，且等于逐个分片单独模拟"""
+    saved = random_baseline.SHARD_PLAYERS
+    random_baseline.SHARD_PLAYERS = 7
+    try:
+        serial = random_baseline.simulate(DRAWS, 20, 3, workers=1)
+        parallel = random_baseline.simulate(DRAWS, 20, 3, workers=2)
+    finally:
+        random_baseline.SHARD_PLAYERS = saved
+
+    assert sorted(serial) == sorted(DRAWS)
+    for period, actual in DRAWS.items():
+        red_mask = random_baseline.to_mask(actual["red_balls"])
+        shards = [random_baseline.simulate_shard(red_mask, int(actual["blue_ball"]), size, (3, int(period), chunk))
+                  for chunk, size in enumerate([7, 7, 6])]
+        for metric in random_baseline.METRICS:
+            assert np.array_equal(serial[period][metric], parallel[period][metric])
+            assert np.array_equal(serial[period][metric], np.concatenate([s[metric] for s in shards]))
+
+
+@requires_numpy
+def test_compare_models_percentile_and_p_value():
+    """已知输入下按每注平均比较：百分位计一半平局，p 值含 +1 修正；没有预测的模型不输出"""
+    random_scores = {
+        "26001": {"hits": np.array([0, 5, 5, 10], dtype=np.int32), "prize": np.zeros(4, dtype=np.int32)},
+        "26002": {"hits": np.array([5, 0, 0, 10], dtype=np.int32), "prize": np.zeros(4, dtype=np.int32)}
+    }
+    models = {
+        # 每注 1 个命中；随机每注 [0, 1, 1, 2]：高于 1 人、低于 1 人、平 2 人
+        "A": {"periods": ["26001"], "tickets": 5, "hits": 5, "prize": 0},
+        # 只有 8 注仍按每注 1 个命中比较；随机每注 [0.5, 0.5, 0.5, 2]
+        "B": {"periods": ["26001", "26002"], "tickets": 8, "hits": 8, "prize": 0},
+        "C": {"periods": [], "tickets": 0, "hits": 0, "prize": 0}
+    }
+    rows = {row["model_name"]: row for row in random_baseline.compare_models(models, random_scores, 4)}
+
+    assert sorted(rows) == ["A", "B"]
+    assert rows["A"]["hits"]["model"] == 1.0 and rows["A"]["hits"]["random_mean"] == 1.0
+    assert rows["A"]["hits"]["percentile"] == 50.0
+    assert rows["A"]["hits"]["p_value"] == (1 + 2 + 1) / 5
+    assert rows["B"]["periods"] == 2 and rows["B"]["tickets"] == 8
+    assert rows["B"]["hits"]["percentile"] == 75.0
+    assert rows["B"]["hits"]["p_value"] == (1 + 0 + 1) / 5
+    # 全部平局
+    assert rows["A"]["prize"]["percentile"] == 50.0 and rows["A"]["prize"]["p_value"] == 1.0
+
+
+if __name__ == "__main__":
+    if np is None:
+        print("⏭️  未安装 numpy，跳过随机投注基线测试")
+    else:
+        test_simulate_shard_seeded()
+        test_simulate_aggregation_deterministic()
+        test_compare_models_percentile_and_p_value()
+        print("✅ 所有测试通过！")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试按服务商限流的调度器和模型配置加载"""
+
+import model_roster
+import rate_limiter
+
+
+class FakeClock:
+    """可控时钟：sleep 只推进时间"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket():
+    """突发容量用完后按速率发放令牌，暂停期间不发放"""
+    clock = FakeClock()
+    bucket = rate_limiter.TokenBucket(rate=2.0, capacity=2, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0 and bucket.acquire() == 0
+    assert abs(bucket.acquire() - 0.5) < 1e-9
+
+    bucket.pause(3)
+    bucket.acquire()
+    assert clock.now >= 3.5
+
+
+def test_adaptive_rate():
+    """429 速率减半并按 Retry-After 暂停，成功后逐步回升，额度耗尽时暂停到重置时刻"""
+    clock = FakeClock()
+    limiter = rate_limiter.ProviderLimiter("test", 2, 120, clock, clock.sleep)
+    assert limiter.rate == 2.0
+
+    limiter.on_rate_limited({"Retry-After": "5"})
+    assert limiter.rate == 1.0 and limiter.stats["rate_limited"] == 1
+    with limiter.slot() as waited:
+        assert waited >= 5
+
+    for _ in range(20):
+        limiter.on_success({})
+    assert limiter.rate == 2.0
+
+    limiter.on_success({"x-ratelimit-limit-requests": "60", "x-ratelimit-remaining-requests": "0",
+                        "x-ratelimit-reset-requests": "6m0s"})
+    assert limiter.max_rate == 1.0
+    start = clock.now
+    limiter.bucket.acquire()
+    assert clock.now - start >= min(360, rate_limiter.MAX_PAUSE)
+
+
+def test_parse_seconds():
+    assert rate_limiter.parse_seconds("1.5") == 1.5
+    assert abs(rate_limiter.parse_seconds("1m30.5s") - 90.5) < 1e-9
+    assert abs(rate_limiter.parse_seconds("20ms") - 0.02) < 1e-9
+    assert rate_limiter.parse_seconds("2025-01-01T00:00:10Z", now=1735689600) == 10
+    assert rate_limiter.parse_seconds("soon") is None
+    assert rate_limiter.retry_after_seconds({"retry-after-ms": "250", "retry-after": "3"}) == 0.25
+
+
+def test_roster():
+    """单一服务商时可省略 provider，引用未定义服务商或 model_id 重复时报错"""
+    providers, models = model_roster.load_roster(model_roster.MODELS_CONFIG_FILE)
+    assert models and all(m["provider"] in providers for m in models)
+
+    config = {"providers": {"p": {"base_url": "http://localhost/v1"}},
+              "models": [{"id": "m", "name": "M", "model_id": "M1"}]}
+    providers, models = model_roster.parse_roster(config)
+    assert models[0]["provider"] == "p" and providers["p"]["max_concurrency"] == 4
+
+    for bad_models in ([{"id": "m", "name": "M", "model_id": "M1", "provider": "q"}],
+                       [{"id": "m", "name": "M", "model_id": "M1"}, {"id": "n", "name": "N", "model_id": "M1"}]):
+        try:
+            model_roster.parse_roster({**config, "models": bad_models})
+        except ValueError:
+            continue
+        raise AssertionError("应当报错")
+
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_adaptive_rate()
+    test_parse_seconds()
+    test_roster()
+    print("✅ 所有测试通过！")
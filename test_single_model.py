@@ -5,6 +5,7 @@ import json
 import os
 import sys
 from openai import OpenAI
+from generate_ai_prediction import split_prompt_template, build_prompt_prefix, build_prompt
 
 # API 配置（通过环境变量设置）
 BASE_URL = os.environ.get("AI_BASE_URL") or "https://aihubmix.com/v1"
@@ -40,10 +41,12 @@ print(f"📅 开奖日期: {target_date}\n")
 
 # 构建 prompt
 print("🔧 构建 Prompt...")
-prompt = prompt_template.format(
+prefix_template, suffix_template = split_prompt_template(prompt_template)
+prompt = build_prompt(
+    build_prompt_prefix(prefix_template, history_json),
+    suffix_template,
     target_period=target_period,
     target_date=target_date,
-    lottery_history=history_json,
     prediction_date="2025-11-18",
     model_id="SSB-Team-001",
     model_name="GPT-5"
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试运行指标采集：阶段状态、异常记录和 JSONL 追加写入"""
+
+import json
+import os
+import tempfile
+
+from telemetry import PipelineTelemetry
+
+
+def test_ok_stage_records_fields():
+    """正常结束的阶段记为 ok，带上附加字段、阶段内写入的字段和耗时"""
+    metrics = PipelineTelemetry(run_id="run-1")
+    with metrics.stage("model_call", model="DeepSeek") as event:
+        event["prompt_tokens"] = 120
+        event["retries"] = 1
+
+    assert len(metrics.events) == 1
+    event = metrics.events[0]
+    assert event["run_id"] == "run-1" and event["timestamp"]
+    assert event["stage"] == "model_call" and event["model"] == "DeepSeek"
+    assert event["status"] == "ok" and "error" not in event
+    assert event["prompt_tokens"] == 120 and event["wall_ms"] >= 0
+
+    row = metrics.summarize()[0]
+    assert row["count"] == 1 and row["failed"] == 0
+    assert row["prompt_tokens"] == 120 and row["retries"] == 1
+
+
+def test_raising_stage_records_error_and_reraises():
+    """阶段内抛出的异常记为 error 并继续抛出；业务失败保留设置的状态"""
+    metrics = PipelineTelemetry()
+    try:
+        with metrics.stage("save"):
+            raise ValueError("写入失败")
+        assert False, "异常应继续抛出"
+    except ValueError:
+        pass
+    with metrics.stage("save") as event:
+        event["status"] = "failed"
+        event["error"] = "没有成功生成任何预测"
+
+    error, failed = metrics.events
+    assert error["status"] == "error" and error["error"] == "ValueError: 写入失败"
+    assert "wall_ms" in error
+    assert failed["status"] == "failed" and failed["error"] == "没有成功生成任何预测"
+    assert metrics.summarize()[0]["failed"] == 2
+
+
+def test_write_jsonl_appends():
+    """每个事件写一行 JSON，多次运行追加到同一文件；没有事件时不创建文件"""
+    path = os.path.join(tempfile.mkdtemp(), "logs", "metrics.jsonl")
+    PipelineTelemetry().write_jsonl(path)
+    assert not os.path.exists(path)
+
+    first = PipelineTelemetry(run_id="first")
+    with first.stage("load"):
+        pass
+    with first.stage("validate", model="通义千问"):
+        pass
+    first.write_jsonl(path)
+
+    second = PipelineTelemetry(run_id="second")
+    with second.stage("export"):
+        pass
+    second.write_jsonl(path)
+
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert "通义千问" in lines[1]
+    events = [json.loads(line) for line in lines]
+    assert [(e["run_id"], e["stage"]) for e in events] == [("first", "load"), ("first", "validate"), ("second", "export")]
+    assert events == first.events + second.events
+
+
+if __name__ == "__main__":
+    test_ok_stage_records_fields()
+    test_raising_stage_records_error_and_reraises()
+    test_write_jsonl_appends()
+    print("✅ 所有测试通过！")
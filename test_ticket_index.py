@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试投注指纹索引"""
+
+import json
+import os
+import tempfile
+
+import ticket_index as ti
+
+
+def load_history():
+    with open("data/predictions_history.json", "r", encoding="utf-8") as f:
+        return json.load(f)["predictions_history"]
+
+
+def test_fingerprint_and_distance():
+    """指纹可还原，距离为不同红球数 + 蓝球是否不同"""
+    a = ti.fingerprint(["01", "02", "03", "04", "05", "06"], "16")
+    b = ti.fingerprint(["01", "02", "03", "04", "05", "33"], "01")
+    assert ti.split_fingerprint(a) == (0b111111, 16)
+    assert ti.distance(a, a) == 0
+    assert ti.distance(a, b) == 2
+
+
+def test_near_matches_linear_scan():
+    """近邻枚举与线性扫描结果一致"""
+    index = ti.build_index(load_history())
+    query = index.entries[0][0]
+    for max_distance in range(3):
+        expected = sorted((e[1], e[3], e[4]) for e in index.entries if ti.distance(query, e[0]) <= max_distance)
+        found = sorted((e[1], e[3], e[4]) for e, _ in index.near(query, max_distance))
+        assert found == expected
+
+
+def test_incremental_update():
+    """增量更新只追加新期号，结果与全量构建一致"""
+    records = load_history()
+    path = os.path.join(tempfile.mkdtemp(), "ticket_index.json")
+    assert ti.update_index(records[1:], path) > 0
+    assert ti.update_index(records, path) == sum(len(m["predictions"]) for m in records[0]["models"])
+    assert ti.update_index(records, path) == 0
+
+    full = ti.build_index(records)
+    loaded = ti.load_index(path)
+    assert loaded.periods == full.periods
+    assert sorted(loaded.entries) == sorted(full.entries)
+    assert len(loaded.repeats(within=10, max_distance=1)) == len(full.repeats(within=10, max_distance=1))
+
+
+def test_repeats_gap_counts_draws():
+    """期数间隔按实际开奖计算：26007 与 26019 之间隔 12 期开奖，而不是相邻的两个已归档期号"""
+    group = {"group_id": 1, "red_balls": ["01", "02", "03", "04", "05", "06"], "blue_ball": "07"}
+    model = {"model_id": "M1", "model_name": "Model", "predictions": [group]}
+    index = ti.build_index([{"target_period": "26019", "models": [model]},
+                            {"target_period": "26007", "models": [model]}])
+    draws = [f"260{n:02d}" for n in range(1, 22)]
+
+    assert index.repeats(within=10, draw_periods=draws) == []
+    assert len(index.repeats(within=12, draw_periods=draws)) == 1
+    # 没有开奖数据时按已归档期数计算
+    assert len(index.repeats(within=1)) == 1
+
+    # 跨年期号相邻
+    index = ti.build_index([{"target_period": "26001", "models": [model]},
+                            {"target_period": "25151", "models": [model]}])
+    assert len(index.repeats(within=1, draw_periods=["25150", "25151", "26001"])) == 1
+
+
+if __name__ == "__main__":
+    test_fingerprint_and_distance()
+    test_near_matches_linear_scan()
+    test_incremental_update()
+    test_repeats_gap_counts_draws()
+    print("✅ 所有测试通过！")
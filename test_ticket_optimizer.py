@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试投注组合优化器"""
+
+import random
+import time
+from math import comb
+
+import ticket_optimizer as to
+
+POOL_REDS = 15
+
+
+def synthetic_pool(reds=33, models=8, groups=5, seed=26001):
+    """
+    固定种子生成的预测：红球只取 1-reds，第一个模型另有几组连续号码保证每个号码都出现过，
+    因此 pool_size=reds 时候选注恰好是这些号码的全部 6 码组合
+    """
+    rng = random.Random(seed)
+    cover = [range(start, start + 6) for start in list(range(1, reds - 5, 6)) + [reds - 5]]
+    data = {"models": []}
+    for m in range(models):
+        red_groups = [rng.sample(range(1, reds + 1), 6) for _ in range(groups)] + (cover if m == 0 else [])
+        predictions = [{"group_id": g + 1, "red_balls": [f"{n:02d}" for n in sorted(balls)],
+                        "blue_ball": f"{rng.randint(1, 16):02d}"} for g, balls in enumerate(red_groups)]
+        data["models"].append({"model_name": f"模型{m + 1}", "predictions": predictions})
+    return to.pool_candidates(data)
+
+
+def test_mask_round_trip():
+    """位掩码与号码列表互相转换"""
+    balls = ["01", "09", "16", "25", "32", "33"]
+    mask = to.to_mask(balls)
+    assert mask.bit_count() == 6
+    assert to.from_mask(mask) == balls
+
+
+def test_budget_and_overlap_respected():
+    """注数不超过预算，任意两注重叠不超过限制"""
+    result = to.optimize_tickets(synthetic_pool(), budget=8, pool_size=14, max_overlap=2)
+    tickets = result["tickets"]
+    assert len(tickets) == 8
+    masks = [to.to_mask(t["red_balls"]) for t in tickets]
+    assert len(set(masks)) == len(masks)
+    for i in range(len(masks)):
+        assert len(tickets[i]["red_balls"]) == 6
+        for j in range(i + 1, len(masks)):
+            assert (masks[i] & masks[j]).bit_count() <= 2
+    assert result["max_overlap"] <= 2
+    assert 0 < result["covered_weight"] <= result["total_weight"]
+
+
+def test_thousands_of_candidates_under_one_second():
+    """C(15, 6) = 5005 注候选在 1 秒内完成"""
+    pool = synthetic_pool(reds=POOL_REDS, models=1)
+    start = time.perf_counter()
+    result = to.optimize_tickets(pool, budget=10, pool_size=POOL_REDS)
+    assert result["candidate_count"] == comb(POOL_REDS, 6)
+    assert time.perf_counter() - start < 1.0
+
+
+if __name__ == "__main__":
+    test_mask_round_trip()
+    test_budget_and_overlap_respected()
+    test_thousands_of_candidates_under_one_second()
+    print("✅ 所有测试通过！")
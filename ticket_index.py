@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投注指纹索引
+为历史预测中的每组号码建立指纹（红球 33 位掩码 + 蓝球），用于查找跨期、跨模型的重复和近似重复投注
+
+实现：
+- 指纹 = 红球掩码 << 4 | (蓝球 - 1)，一个整数即可表示一注
+- 距离 = 不同的红球个数 ((a ^ b).bit_count() // 2) + 蓝球是否不同，0 表示完全相同
+- 精确查询：指纹 -> 条目 的字典
+- 近邻查询：按红球掩码建索引，枚举距离不超过 d 的全部红球掩码（换掉 k 个号码共 C(6,k)·C(27,k) 种）
+  逐个查字典；枚举数量超过条目数时改为线性扫描
+- 期号间隔按开奖数据（data/lottery_history.json）中的开奖顺序计算，跨年期号（25151 -> 26001）也只相差 1 期，
+  未归档的期号同样计入；缺少开奖数据时退回按已索引期号的排序位置计算
+- 归档时只追加尚未索引的期号（只改写头部期号列表，已有条目按块复制），
+  索引文件缺失时自动从历史记录全量重建
+
+使用方法：
+    python3 ticket_index.py build
+    python3 ticket_index.py repeats --model GPT-5 --within 10
+    python3 ticket_index.py repeats --within 10 --distance 1 --cross-model
+    python3 ticket_index.py lookup 03 09 13 19 25 32 + 10 --distance 2
+"""
+
+import argparse
+import json
+import os
+from bisect import bisect_left
+from itertools import combinations
+from math import comb
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PREDICTIONS_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "predictions_history.json")
+LOTTERY_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "lottery_history.json")
+INDEX_FILE = os.path.join(SCRIPT_DIR, "data", "ticket_index.json")
+
+RED_TOTAL = 33
+RED_PICK = 6
+BLUE_BITS = 4
+INDEX_VERSION = 1
+
+# 条目：(指纹, 期号, model_id, model_name, group_id)
+Entry = Tuple[int, str, str, str, int]
+
+
+def to_mask(balls) -> int:
+    """红球列表 -> 位掩码（bit n-1 表示号码 n）"""
+    mask = 0
+    for ball in balls:
+        mask |= 1 << (int(ball) - 1)
+    return mask
+
+
+def fingerprint(red_balls, blue_ball) -> int:
+    """一注号码的指纹"""
+    return to_mask(red_balls) << BLUE_BITS | (int(blue_ball) - 1)
+
+
+def split_fingerprint(fp: int) -> Tuple[int, int]:
+    """指纹 -> (红球掩码, 蓝球号码)"""
+    return fp >> BLUE_BITS, (fp & ((1 << BLUE_BITS) - 1)) + 1
+
+
+def distance(a: int, b: int) -> int:
+    """两注之间的距离：不同红球数 + 蓝球是否不同"""
+    red_a, blue_a = split_fingerprint(a)
+    red_b, blue_b = split_fingerprint(b)
+    return (red_a ^ red_b).bit_count() // 2 + (blue_a != blue_b)
+
+
+def red_neighbors(mask: int, red_distance: int) -> Iterable[Tuple[int, int]]:
+    """枚举恰好换掉 k 个红球（k ≤ red_distance）得到的掩码，返回 (掩码, k)"""
+    inside = [1 << i for i in range(RED_TOTAL) if mask >> i & 1]
+    outside = [1 << i for i in range(RED_TOTAL) if not mask >> i & 1]
+    for k in range(red_distance + 1):
+        for removed in combinations(inside, k):
+            base = mask ^ sum(removed)
+            for added in combinations(outside, k):
+                yield base | sum(added), k
+
+
+class TicketIndex:
+    """历史预测组的指纹索引"""
+
+    def __init__(self):
+        self.entries: List[Entry] = []
+        self.by_fingerprint: Dict[int, List[int]] = {}
+        self.by_red: Dict[int, List[int]] = {}
+        self.periods: List[str] = []
+
+    def add_record(self, record: Dict[str, Any]) -> int:
+        """索引一期历史记录，已索引的期号跳过，返回新增条目数"""
+        period = record["target_period"]
+        position = bisect_left(self.periods, period)
+        if position < len(self.periods) and self.periods[position] == period:
+            return 0
+        self.periods.insert(position, period)
+
+        added = 0
+        for model in record.get("models", []):
+            for group in model.get("predictions", []):
+                try:
+                    fp = fingerprint(group["red_balls"], group["blue_ball"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self._add((fp, period, model.get("model_id"), model.get("model_name"), group.get("group_id")))
+                added += 1
+        return added
+
+    def _add(self, entry: Entry):
+        index = len(self.entries)
+        self.entries.append(entry)
+        self.by_fingerprint.setdefault(entry[0], []).append(index)
+        self.by_red.setdefault(entry[0] >> BLUE_BITS, []).append(index)
+
+    def period_ranks(self, draw_periods: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        期号 -> 开奖顺序位置（按期号升序）
+
+        Args:
+            draw_periods: 全部开奖期号；None 时只按已索引期号排序（间隔按已归档期数计算）
+        """
+        timeline = sorted(set(draw_periods or []) | set(self.periods))
+        return {period: rank for rank, period in enumerate(timeline)}
+
+    def lookup(self, red_balls, blue_ball) -> List[Entry]:
+        """完全相同的历史投注"""
+        return [self.entries[i] for i in self.by_fingerprint.get(fingerprint(red_balls, blue_ball), [])]
+
+    def near(self, fp: int, max_distance: int) -> List[Tuple[Entry, int]]:
+        """距离不超过 max_distance 的历史投注，返回 (条目, 距离)，按距离排序"""
+        if max_distance == 0:
+            return [(self.entries[i], 0) for i in self.by_fingerprint.get(fp, [])]
+
+        red, blue = split_fingerprint(fp)
+        red_distance = min(max_distance, RED_PICK)
+        neighbor_count = sum(comb(RED_PICK, k) * comb(RED_TOTAL - RED_PICK, k) for k in range(red_distance + 1))
+
+        results = []
+        if neighbor_count < len(self.entries):
+            for mask, k in red_neighbors(red, red_distance):
+                for i in self.by_red.get(mask, []):
+                    d = k + (split_fingerprint(self.entries[i][0])[1] != blue)
+                    if d <= max_distance:
+                        results.append((self.entries[i], d))
+        else:
+            for entry in self.entries:
+                d = distance(fp, entry[0])
+                if d <= max_distance:
+                    results.append((entry, d))
+        results.sort(key=lambda item: (item[1], item[0][1]))
+        return results
+
+    def repeats(self, model: Optional[str] = None, within: int = 10, max_distance: int = 0,
+                cross_model: bool = False, draw_periods: Optional[Iterable[str]] = None) -> List[Tuple[Entry, Entry, int]]:
+        """
+        查找在之前 within 期内出现过相同（或距离不超过 max_distance）投注的预测组
+
+        Args:
+            model: 只统计该模型（显示名称或 model_id），None 表示全部模型
+            within: 向前查找的开奖期数
+            max_distance: 允许的最大距离，0 为完全相同
+            cross_model: 为 True 时与任意模型比较，否则只与同一模型比较
+            draw_periods: 全部开奖期号，用于按实际开奖计算间隔；None 时按已归档期数计算
+
+        Returns:
+            [(当前条目, 之前最近的匹配条目, 距离)]
+        """
+        ranks = self.period_ranks(draw_periods)
+        found = []
+        for entry in self.entries:
+            if model and model not in (entry[2], entry[3]):
+                continue
+            rank = ranks[entry[1]]
+            best = None
+            for other, d in self.near(entry[0], max_distance):
+                if other is entry:
+                    continue
+                gap = rank - ranks[other[1]]
+                if not 0 < gap <= within:
+                    continue
+                if not cross_model and other[3] != entry[3]:
+                    continue
+                if best is None or (gap, d) < best[0]:
+                    best = ((gap, d), other, d)
+            if best:
+                found.append((entry, best[1], best[2]))
+        return found
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": INDEX_VERSION, "periods": self.periods, "entries": [list(e) for e in self.entries]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TicketIndex":
+        index = cls()
+        if data.get("version") != INDEX_VERSION:
+            return index
+        index.periods = sorted(data.get("periods", []))
+        for entry in data.get("entries", []):
+            index._add(tuple(entry))
+        return index
+
+
+def build_index(records: Iterable[Dict[str, Any]]) -> TicketIndex:
+    """从历史记录全量构建索引"""
+    index = TicketIndex()
+    for record in records:
+        index.add_record(record)
+    return index
+
+
+def load_index(path: str = INDEX_FILE) -> TicketIndex:
+    """加载索引文件，不存在或版本不符时返回空索引"""
+    if not os.path.exists(path):
+        return TicketIndex()
+    with open(path, 'r', encoding='utf-8') as f:
+        return TicketIndex.from_dict(json.load(f))
+
+
+def save_index(index: TicketIndex, path: str = INDEX_FILE):
+    """原子写入索引文件（每个条目一行，便于查看差异）"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_file = path + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write('{\n')
+        f.write(f'  "version": {INDEX_VERSION},\n')
+        f.write(f'  "periods": {json.dumps(index.periods)},\n')
+        f.write('  "entries": [\n')
+        f.write(",\n".join("    " + json.dumps(list(e), ensure_ascii=False) for e in index.entries))
+        f.write('\n  ]\n}\n')
+    os.replace(tmp_file, path)
+
+
+def update_index(records: Iterable[Dict[str, Any]], path: str = INDEX_FILE) -> int:
+    """增量更新：只索引尚未索引的期号，返回新增条目数"""
+    index = load_index(path)
+    added = sum(index.add_record(record) for record in records)
+    if added or not os.path.exists(path):
+        save_index(index, path)
+    return added
+
+
+def append_records(records: Iterable[Dict[str, Any]], path: str = INDEX_FILE, chunk_size: int = 1 << 20) -> int:
+    """
+    流式追加：只解析索引头部的期号列表，已有条目按块原样复制，内存占用与索引大小无关
+
+    索引文件不存在或不是 save_index 写出的格式时，退回 update_index（加载全部条目）
+    """
+    records = list(records)
+    if not os.path.exists(path):
+        return update_index(records, path)
+
+    suffix = b"\n  ]\n}\n"
+    with open(path, 'rb') as f:
+        header = [f.readline() for _ in range(4)]
+        body_start = f.tell()
+        f.seek(0, os.SEEK_END)
+        body_end = f.tell() - len(suffix)
+        f.seek(body_end)
+        if (header[0] != b"{\n" or header[1] != f'  "version": {INDEX_VERSION},\n'.encode()
+                or not header[2].startswith(b'  "periods": ') or header[3] != b'  "entries": [\n'
+                or body_end < body_start or f.read() != suffix):
+            return update_index(records, path)
+
+        new_index = TicketIndex()
+        new_index.periods = json.loads(header[2][len(b'  "periods": '):].rstrip().rstrip(b","))
+        added = sum(new_index.add_record(record) for record in records)
+        if not added:
+            return 0
+
+        def write(out):
+            out.write(header[0] + header[1])
+            out.write(f'  "periods": {json.dumps(new_index.periods)},\n'.encode("utf-8"))
+            out.write(header[3])
+            f.seek(body_start)
+            remaining = body_end - body_start
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                out.write(chunk)
+                remaining -= len(chunk)
+            lines = ",\n".join("    " + json.dumps(list(e), ensure_ascii=False) for e in new_index.entries)
+            out.write(((",\n" if body_end > body_start else "") + lines).encode("utf-8") + suffix)
+
+        tmp_file = path + ".tmp"
+        with open(tmp_file, 'wb') as out:
+            write(out)
+    os.replace(tmp_file, path)
+    return added
+
+
+def load_draw_periods(path: str = LOTTERY_HISTORY_FILE) -> Optional[List[str]]:
+    """开奖数据中的全部期号，文件不存在或无法解析时返回 None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [draw["period"] for draw in json.load(f).get("data", [])]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def format_entry(entry: Entry) -> str:
+    red, blue = split_fingerprint(entry[0])
+    reds = " ".join(f"{i + 1:02d}" for i in range(RED_TOTAL) if red >> i & 1)
+    return f"{entry[1]} {entry[3]} 第{entry[4]}组: {reds} + {blue:02d}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="历史预测投注指纹索引")
+    parser.add_argument("--history", default=PREDICTIONS_HISTORY_FILE, help="历史预测文件")
+    parser.add_argument("--index", default=INDEX_FILE, help="索引文件")
+    parser.add_argument("--lottery", default=LOTTERY_HISTORY_FILE, help="开奖数据文件（repeats 按开奖顺序计算期数间隔）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("build", help="从历史预测全量重建索引")
+
+    p = subparsers.add_parser("repeats", help="统计在之前若干期内重复出现的投注")
+    p.add_argument("--model", help="只统计该模型（显示名称或 model_id）")
+    p.add_argument("--within", type=int, default=10, help="向前查找的开奖期数（含未归档预测的期号）")
+    p.add_argument("--distance", type=int, default=0, help="最大距离（不同红球数 + 蓝球是否不同）")
+    p.add_argument("--cross-model", action="store_true", help="与所有模型比较，而不只是同一模型")
+    p.add_argument("--show", type=int, default=10, help="列出的示例数")
+
+    p = subparsers.add_parser("lookup", help="查找与给定号码相同或相近的历史投注")
+    p.add_argument("numbers", nargs="+", help="6 个红球 + 蓝球，如 03 09 13 19 25 32 + 10")
+    p.add_argument("--distance", type=int, default=0, help="最大距离")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        with open(args.history, 'r', encoding='utf-8') as f:
+            index = build_index(json.load(f).get("predictions_history", []))
+        save_index(index, args.index)
+        print(f"✅ 已索引 {len(index.periods)} 期，{len(index.entries)} 组预测，保存到: {args.index}")
+        return 0
+
+    index = load_index(args.index)
+    if not index.entries:
+        print("❌ 索引为空，请先运行: python3 ticket_index.py build")
+        return 1
+
+    if args.command == "lookup":
+        numbers = [n for n in args.numbers if n != "+"]
+        if len(numbers) != RED_PICK + 1:
+            parser.error("需要 6 个红球和 1 个蓝球")
+        matches = index.near(fingerprint(numbers[:RED_PICK], numbers[RED_PICK]), args.distance)
+        print(f"🔍 找到 {len(matches)} 组距离 ≤ {args.distance} 的历史投注")
+        for entry, d in matches:
+            print(f"    [{d}] {format_entry(entry)}")
+        return 0
+
+    draw_periods = load_draw_periods(args.lottery)
+    if draw_periods is None:
+        print(f"⚠️  无法读取开奖数据 {args.lottery}，期数间隔按已归档期数计算")
+    found = index.repeats(args.model, args.within, args.distance, args.cross_model, draw_periods)
+    scope = "所有模型" if args.cross_model else "同一模型"
+    total = sum(1 for e in index.entries if not args.model or args.model in (e[2], e[3]))
+    unit = "期开奖" if draw_periods is not None else "个已归档期号"
+    print(f"🔁 {args.model or '全部模型'}: {total} 组预测中有 {len(found)} 组在之前 {args.within} {unit}内"
+          f"与{scope}的投注距离 ≤ {args.distance}")
+    by_model: Dict[str, int] = {}
+    for entry, _, _ in found:
+        by_model[entry[3]] = by_model.get(entry[3], 0) + 1
+    for name, count in sorted(by_model.items(), key=lambda item: -item[1]):
+        print(f"    - {name}: {count}")
+    for entry, other, d in found[:args.show]:
+        print(f"    {format_entry(entry)}")
+        print(f"      ↳ [{d}] {format_entry(other)}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
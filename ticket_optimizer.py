@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投注组合优化器
+将各模型的预测汇总为候选号码池，在给定注数预算内挑选一组投注，
+使其对模型共同看好的红球两两组合、三三组合的加权覆盖最大，同时限制投注之间的重复号码
+
+实现：
+- 每注红球和每个两两/三三组合都表示为 33 位位掩码，两注重叠数为 (a & b).bit_count()
+- 每注只有 15 个两两组合和 20 个三三组合，预先算出其中有权重的组合掩码，覆盖计数按掩码累加
+- 先用惰性贪心（边际收益只在出堆时重算）选出初始方案，再用交换式局部搜索改进
+- 候选注 = 各模型原始预测组 + 候选池前 N 个红球的全部 6 码组合（N=14 时 3003 注）
+
+使用方法：
+    python3 ticket_optimizer.py --budget 5
+    python3 ticket_optimizer.py --budget 10 --pool 16 --max-overlap 2 --json tickets.json
+"""
+
+import argparse
+import heapq
+import json
+import os
+import time
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Any, List, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+AI_PREDICTIONS_FILE = os.path.join(SCRIPT_DIR, "data", "ai_predictions.json")
+
+RED_COUNT = 6
+PAIR_WEIGHT = 1.0
+TRIPLE_WEIGHT = 2.0
+
+
+def to_mask(balls) -> int:
+    """红球列表 -> 位掩码（bit n-1 表示号码 n）"""
+    mask = 0
+    for ball in balls:
+        mask |= 1 << (int(ball) - 1)
+    return mask
+
+
+def from_mask(mask: int) -> List[str]:
+    """位掩码 -> 排好序的两位数字符串列表"""
+    balls = []
+    number = 1
+    while mask:
+        if mask & 1:
+            balls.append(f"{number:02d}")
+        mask >>= 1
+        number += 1
+    return balls
+
+
+def mask_numbers(mask: int) -> List[int]:
+    """位掩码中的号码（升序）"""
+    return [int(b) for b in from_mask(mask)]
+
+
+def pool_candidates(predictions_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    汇总所有模型的预测组
+
+    Returns:
+        groups: [(红球掩码, 蓝球, 来源说明)]
+        red_weights / blue_weights: 号码在所有预测组中的出现次数
+        combo_weights: 红球两两/三三组合掩码 -> 权重（出现的组数 × 组合权重）
+    """
+    groups = []
+    red_weights: Counter = Counter()
+    blue_weights: Counter = Counter()
+    combo_weights: Dict[int, float] = {}
+
+    for model in predictions_data.get("models", []):
+        for group in model.get("predictions", []):
+            reds = [int(b) for b in group.get("red_balls", [])]
+            groups.append((to_mask(reds), group.get("blue_ball"), f"{model.get('model_name')} 第{group.get('group_id')}组"))
+            red_weights.update(reds)
+            if group.get("blue_ball"):
+                blue_weights[group["blue_ball"]] += 1
+            for size, weight in ((2, PAIR_WEIGHT), (3, TRIPLE_WEIGHT)):
+                for combo in combinations(reds, size):
+                    key = to_mask(combo)
+                    combo_weights[key] = combo_weights.get(key, 0.0) + weight
+
+    return {
+        "groups": groups,
+        "red_weights": red_weights,
+        "blue_weights": blue_weights,
+        "combo_weights": combo_weights
+    }
+
+
+def build_candidates(pool: Dict[str, Any], pool_size: int) -> List[Tuple[int, str]]:
+    """候选注：原始预测组 + 候选池前 pool_size 个红球的全部 6 码组合（按掩码去重）"""
+    candidates = {}
+    for mask, _, source in pool["groups"]:
+        candidates.setdefault(mask, source)
+
+    top_reds = [n for n, _ in sorted(pool["red_weights"].items(), key=lambda item: (-item[1], item[0]))[:pool_size]]
+    for combo in combinations(sorted(top_reds), RED_COUNT):
+        candidates.setdefault(to_mask(combo), "候选池组合")
+    return list(candidates.items())
+
+
+def covered_combos(mask: int, combo_weights: Dict[int, float]) -> List[int]:
+    """一注红球覆盖的所有有权重的两两/三三组合"""
+    numbers = mask_numbers(mask)
+    covered = []
+    for size in (2, 3):
+        for combo in combinations(numbers, size):
+            key = 0
+            for n in combo:
+                key |= 1 << (n - 1)
+            if key in combo_weights:
+                covered.append(key)
+    return covered
+
+
+def optimize_tickets(pool: Dict[str, Any], budget: int = 5, pool_size: int = 14, max_overlap: int = 3,
+                     max_passes: int = 5) -> Dict[str, Any]:
+    """
+    选择投注组合
+
+    Args:
+        pool: pool_candidates 的结果
+        budget: 注数
+        pool_size: 生成组合时使用的候选红球数
+        max_overlap: 任意两注之间允许的最多相同红球数
+        max_passes: 局部搜索最多轮数
+
+    Returns:
+        tickets 与覆盖统计
+    """
+    weights = pool["combo_weights"]
+    candidates = build_candidates(pool, pool_size)
+    masks = [mask for mask, _ in candidates]
+    covers = [covered_combos(mask, weights) for mask in masks]
+    cover_count: Counter = Counter()
+    chosen: List[int] = []
+
+    standalone = [sum(weights[k] for k in cover) for cover in covers]
+    by_standalone = sorted(range(len(masks)), key=lambda i: -standalone[i])
+
+    def gain(index, released=frozenset()):
+        """加入该注的边际收益；released 为假设移除某注后不再被覆盖的组合"""
+        total = 0.0
+        for key in covers[index]:
+            if cover_count[key] == 0 or key in released:
+                total += weights[key]
+        return total
+
+    def overlap_ok(index, others):
+        mask = masks[index]
+        return all((mask & masks[j]).bit_count() <= max_overlap for j in others)
+
+    # 惰性贪心：子模覆盖函数的边际收益只减不增，堆顶重算后仍最大即可直接选中
+    heap = [(-standalone[i], i) for i in range(len(masks))]
+    heapq.heapify(heap)
+    while heap and len(chosen) < budget:
+        _, index = heapq.heappop(heap)
+        if not overlap_ok(index, chosen):
+            continue
+        current = gain(index)
+        if heap and current < -heap[0][0]:
+            heapq.heappush(heap, (-current, index))
+            continue
+        chosen.append(index)
+        cover_count.update(covers[index])
+
+    # 局部搜索：尝试用未选中的候选替换已选注，目标值提高即接受
+    passes = 0
+    improved = True
+    while improved and passes < max_passes:
+        improved = False
+        passes += 1
+        for position, current_index in enumerate(list(chosen)):
+            released = {k for k in covers[current_index] if cover_count[k] == 1}
+            loss = sum(weights[k] for k in released)
+            others = [j for j in chosen if j != current_index]
+            best_index, best_delta = None, 1e-9
+            for index in by_standalone:
+                # 单注总权重是边际收益的上界，按上界降序遍历即可提前终止
+                if standalone[index] - loss <= best_delta:
+                    break
+                if index in chosen or not overlap_ok(index, others):
+                    continue
+                delta = gain(index, released) - loss
+                if delta > best_delta:
+                    best_index, best_delta = index, delta
+            if best_index is not None:
+                cover_count.subtract(covers[current_index])
+                cover_count.update(covers[best_index])
+                chosen[position] = best_index
+                improved = True
+
+    # 蓝球：按出现次数依次分配，注数多于蓝球候选时循环使用
+    blues = [b for b, _ in sorted(pool["blue_weights"].items(), key=lambda item: (-item[1], item[0]))] or ["01"]
+    tickets = []
+    for i, index in enumerate(chosen):
+        tickets.append({
+            "red_balls": from_mask(masks[index]),
+            "blue_ball": blues[i % len(blues)],
+            "source": candidates[index][1],
+            "covered_weight": sum(weights[k] for k in covers[index])
+        })
+
+    covered = {k for k, c in cover_count.items() if c > 0}
+    total_pairs = [k for k in weights if k.bit_count() == 2]
+    total_triples = [k for k in weights if k.bit_count() == 3]
+    overlaps = [(masks[a] & masks[b]).bit_count() for a, b in combinations(chosen, 2)]
+    return {
+        "tickets": tickets,
+        "candidate_count": len(masks),
+        "covered_weight": sum(weights[k] for k in covered),
+        "total_weight": sum(weights.values()),
+        "pair_coverage": sum(1 for k in total_pairs if k in covered) / len(total_pairs) if total_pairs else 0.0,
+        "triple_coverage": sum(1 for k in total_triples if k in covered) / len(total_triples) if total_triples else 0.0,
+        "max_overlap": max(overlaps) if overlaps else 0,
+        "local_search_passes": passes
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="基于模型预测的投注组合优化")
+    parser.add_argument("--file", default=AI_PREDICTIONS_FILE, help="预测文件（默认 data/ai_predictions.json）")
+    parser.add_argument("--budget", type=int, default=5, help="投注注数")
+    parser.add_argument("--pool", type=int, default=14, help="生成候选组合使用的红球数")
+    parser.add_argument("--max-overlap", type=int, default=3, help="任意两注最多相同红球数")
+    parser.add_argument("--json", dest="json_output", help="将结果保存为 JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.file, 'r', encoding='utf-8') as f:
+        predictions_data = json.load(f)
+
+    start = time.perf_counter()
+    pool = pool_candidates(predictions_data)
+    if not pool["groups"]:
+        print("❌ 预测文件中没有预测组")
+        return
+    result = optimize_tickets(pool, args.budget, args.pool, args.max_overlap)
+    elapsed = time.perf_counter() - start
+
+    print(f"🎯 期号 {predictions_data.get('target_period')}：{len(pool['groups'])} 组预测，"
+          f"{result['candidate_count']} 注候选，耗时 {elapsed * 1000:.0f} ms\n")
+    for i, ticket in enumerate(result["tickets"], start=1):
+        print(f"  {i:>2}. {' '.join(ticket['red_balls'])} + {ticket['blue_ball']}  "
+              f"(覆盖权重 {ticket['covered_weight']:.0f}，{ticket['source']})")
+    print(f"\n📊 加权覆盖 {result['covered_weight']:.0f}/{result['total_weight']:.0f}，"
+          f"两两组合覆盖 {result['pair_coverage']:.0%}，三三组合覆盖 {result['triple_coverage']:.0%}，"
+          f"最大重叠 {result['max_overlap']} 个红球\n")
+
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"💾 结果已保存到: {args.json_output}")
+
+
+if __name__ == "__main__":
+    main()